@@ -5,14 +5,22 @@ A professional music bot that brings the spirit of Bulgarian banket culture to D
 """
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import asyncio
+import hashlib
+import json
 import logging
+import signal
 import sys
 import os
+import time
+from typing import Optional, List
 from config import Config
 from utils.music_utils import MusicUtils
 from utils.cleanup import CleanupManager
+from utils.button_handler import MusicButtonHandler
+from utils.extraction_workers import ExtractionWorkers
+from utils.timer_wheel import TimerWheel
 
 # Configure logging
 logging.basicConfig(
@@ -26,33 +34,87 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-class Banketnika(commands.Bot):
+class Banketnika(commands.AutoShardedBot):
     """Main bot class for Banketnika"""
     
-    def __init__(self):
+    def __init__(self, shard_ids: Optional[List[int]] = None, shard_count: Optional[int] = None,
+                 cluster_id: Optional[int] = None, stats_queue=None, cluster_count: int = 1):
         # Configure bot intents
         intents = discord.Intents.default()
-        intents.message_content = True
+        intents.message_content = Config.MESSAGE_CONTENT_INTENT
         intents.voice_states = True
         intents.guilds = True
         
+        lean_options = {}
+        if Config.LEAN_GATEWAY:
+            # A music bot needs guilds, voice states and the members in voice, nothing else
+            intents.guild_typing = False
+            intents.dm_typing = False
+            intents.guild_reactions = False
+            intents.dm_reactions = False
+            intents.invites = False
+            intents.integrations = False
+            intents.webhooks = False
+            intents.expressions = False
+            intents.moderation = False
+            intents.guild_scheduled_events = False
+            intents.auto_moderation_configuration = False
+            intents.auto_moderation_execution = False
+            intents.guild_polls = False
+            intents.dm_polls = False
+            member_cache_flags = discord.MemberCacheFlags.none()
+            member_cache_flags.voice = True
+            lean_options = {
+                'member_cache_flags': member_cache_flags,
+                'chunk_guilds_at_startup': False,
+                'max_messages': Config.LEAN_MESSAGE_CACHE_SIZE or None,
+            }
+        
         super().__init__(
             command_prefix=Config.BOT_PREFIX,
             description=Config.BOT_DESCRIPTION,
             intents=intents,
-            help_command=None  # We'll use custom help command
+            help_command=None,  # We'll use custom help command
+            shard_ids=shard_ids,
+            shard_count=shard_count,
+            **lean_options
         )
         
+        # Set when this process is one cluster of several started by the supervisor in utils/cluster.py
+        self.cluster_id = cluster_id
+        self.cluster_count = cluster_count
+        self.stats_queue = stats_queue
+        self.started_at = time.time()
+        
+        # "Alone in channel" and "queue empty" timeouts of every guild
+        self.timers = TimerWheel()
+        self.alone_rejoins = 0
+        
+        # Resident memory before the gateway fills the caches and once every guild has arrived
+        self.memory_at_start: Optional[float] = MusicUtils.get_memory_usage()
+        self.memory_at_ready: Optional[float] = None
+        
         self.initial_extensions = [
             'cogs.music',
             'cogs.general',
             'cogs.banket'
         ]
     
+    def approximate_user_count(self) -> int:
+        """Users across all guilds from the member counts Discord sends, without caching any users"""
+        return sum(guild.member_count or 0 for guild in self.guilds)
+    
     async def setup_hook(self):
         """Setup hook called when bot is starting"""
         logger.info(f"Starting {Config.BOT_NAME} v{Config.BOT_VERSION}")
         
+        # Start extraction worker processes (if enabled) before the first command needs them
+        await asyncio.to_thread(ExtractionWorkers.shared)
+        
+        # One persistent view serves the controls on every message, including those sent before a restart
+        self.music_controls = MusicButtonHandler(self)
+        self.add_view(self.music_controls)
+        
         # Load extensions
         for extension in self.initial_extensions:
             try:
@@ -60,12 +122,80 @@ class Banketnika(commands.Bot):
                 logger.info(f"Loaded extension: {extension}")
             except Exception as e:
                 logger.error(f"Failed to load extension {extension}: {e}")
+        
+        # Every cluster registers the same commands, one sync is enough
+        if not self.cluster_id:
+            await self.sync_command_tree()
+        
+        if self.stats_queue is not None:
+            self.report_cluster_stats.change_interval(seconds=Config.CLUSTER_STATS_INTERVAL)
+            self.report_cluster_stats.start()
+    
+    @tasks.loop(seconds=30)
+    async def report_cluster_stats(self):
+        """Send this cluster's stats to the supervisor"""
+        music_cog = self.get_cog('Music')
+        players = music_cog.players.values() if music_cog else []
+        self.stats_queue.put({
+            'cluster_id': self.cluster_id,
+            'pid': os.getpid(),
+            'guilds': len(self.guilds),
+            'latency_ms': round(self.latency * 1000) if self.is_ready() else None,
+            'voice_connections': len(self.voice_clients),
+            'playing': sum(1 for player in players if player.is_playing),
+            'uptime': round(time.time() - self.started_at),
+            'rss_mb': MusicUtils.get_memory_usage(),
+            'reported_at': time.time(),
+        })
+    
+    @report_cluster_stats.before_loop
+    async def before_report_cluster_stats(self):
+        """Report only once the shards are connected"""
+        await self.wait_until_ready()
+    
+    async def sync_command_tree(self):
+        """Sync slash commands with Discord, but only when their definitions changed since the last sync"""
+        commands_payload = sorted(
+            (command.to_dict(self.tree) for command in self.tree.get_commands()),
+            key=lambda command: command['name']
+        )
+        digest = hashlib.sha256(
+            json.dumps([self.application_id, commands_payload], sort_keys=True, ensure_ascii=False).encode('utf-8')
+        ).hexdigest()
+        
+        hash_path = os.path.join(Config.DATA_DIR, 'command_tree.sha256')
+        try:
+            with open(hash_path, encoding='utf-8') as f:
+                if f.read().strip() == digest:
+                    logger.info("Slash commands unchanged, skipping sync")
+                    return
+        except OSError:
+            pass
+        
+        try:
+            synced = await self.tree.sync()
+        except discord.HTTPException as e:
+            logger.error(f"Failed to sync slash commands: {e}")
+            return
+        
+        os.makedirs(Config.DATA_DIR, exist_ok=True)
+        with open(hash_path, 'w', encoding='utf-8') as f:
+            f.write(digest)
+        logger.info(f"Synced {len(synced)} slash commands")
     
     async def on_ready(self):
         """Called when bot is ready"""
         logger.info(f"{self.user} has connected to Discord!")
+        if self.cluster_id is not None:
+            logger.info(f"Cluster {self.cluster_id} running shards {self.shard_ids} of {self.shard_count}")
         logger.info(f"Connected to {len(self.guilds)} guilds")
-        logger.info(f"Serving {len(self.users)} users")
+        logger.info(f"Serving ~{self.approximate_user_count()} users")
+        
+        self.memory_at_ready = MusicUtils.get_memory_usage()
+        if self.memory_at_ready is not None and self.memory_at_start is not None:
+            logger.info(f"RSS {self.memory_at_start:.1f} MB at start, {self.memory_at_ready:.1f} MB with "
+                        f"{len(self.guilds)} guilds and {len(self.users)} cached users "
+                        f"({'lean' if Config.LEAN_GATEWAY else 'full'} gateway caches)")
         
         # Print ASCII art
         print("""
@@ -84,7 +214,7 @@ class Banketnika(commands.Bot):
         """)
         
         print(f"🎉 {Config.BOT_NAME} is ready to bring the banket spirit to Discord!")
-        print(f"📊 Connected to {len(self.guilds)} servers with {len(self.users)} users")
+        print(f"📊 Connected to {len(self.guilds)} servers with ~{self.approximate_user_count()} users")
         print(f"🎵 Use {Config.BOT_PREFIX}help to see all commands")
         print(f"🇧🇬 {MusicUtils.get_random_banket_phrase()}")
     
@@ -116,6 +246,14 @@ class Banketnika(commands.Bot):
             )
             await ctx.send(embed=embed)
         
+        elif isinstance(error, commands.NotOwner):
+            embed = MusicUtils.create_music_embed(
+                "❌ Недостатъчни права",
+                "Тази команда е само за собственика на бота.",
+                Config.COLOR_ERROR
+            )
+            await ctx.send(embed=embed)
+        
         elif isinstance(error, commands.BotMissingPermissions):
             embed = MusicUtils.create_music_embed(
                 "❌ Липсват права",
@@ -147,27 +285,58 @@ class Banketnika(commands.Bot):
             await ctx.send(embed=embed)
     
     async def on_voice_state_update(self, member, before, after):
-        """Handle voice state updates"""
-        # Auto-disconnect if bot is alone in voice channel
-        if member == self.user:
+        """Keep the voice connection warm while the bot is alone, leave once the grace period runs out"""
+        if member == self.user and after.channel is None:
+            self.timers.cancel(('alone', member.guild.id))
+            self.timers.cancel(('idle', member.guild.id))
             return
         
-        # Check if bot is in a voice channel
         voice_client = member.guild.voice_client
-        if not voice_client:
+        if not voice_client or not voice_client.channel:
             return
         
-        # Check if bot is alone in the channel
-        if len(voice_client.channel.members) == 1:  # Only the bot
-            logger.info(f"Bot is alone in voice channel {voice_client.channel.name}, disconnecting...")
-            
-            # Clean up using cleanup manager
-            music_cog = self.get_cog('Music')
-            if music_cog and hasattr(music_cog, 'players'):
-                players = getattr(music_cog, 'players', {})
-                if member.guild.id in players:
-                    player = players[member.guild.id]
-                    await CleanupManager.cleanup_music_player(player)
+        # Only joins, leaves and moves involving the bot's channel can change whether it is alone
+        channel = voice_client.channel
+        if member != self.user and before.channel != channel and after.channel != channel:
+            return
+        
+        guild_id = member.guild.id
+        music_cog = self.get_cog('Music')
+        player = music_cog.players.get(guild_id) if music_cog else None
+        
+        if any(not m.bot for m in channel.members):
+            if self.timers.cancel(('alone', guild_id)):
+                self.alone_rejoins += 1
+                logger.info(f"Listener back in {channel.name}, keeping the voice connection")
+                if player and player.auto_paused:
+                    player.resume()
+            return
+        
+        if self.timers.pending(('alone', guild_id)):
+            return
+        logger.info(f"Bot is alone in voice channel {channel.name}, leaving in {Config.VOICE_ALONE_TIMEOUT}s")
+        if player and player.voice_client and player.voice_client.is_playing():
+            player.pause()
+            player.auto_paused = True
+        self.timers.schedule(('alone', guild_id), Config.VOICE_ALONE_TIMEOUT,
+                             lambda: self.leave_if_alone(guild_id))
+    
+    async def leave_if_alone(self, guild_id: int):
+        """Disconnect from a guild's voice channel if nobody came back during the grace period"""
+        guild = self.get_guild(guild_id)
+        voice_client = guild.voice_client if guild else None
+        if not voice_client or not voice_client.channel:
+            return
+        if any(not m.bot for m in voice_client.channel.members):
+            return
+        
+        logger.info(f"Nobody came back to {voice_client.channel.name}, disconnecting...")
+        music_cog = self.get_cog('Music')
+        player = music_cog.players.get(guild_id) if music_cog else None
+        if player:
+            await CleanupManager.cleanup_music_player(player)
+        else:
+            await CleanupManager.cleanup_voice_client(voice_client)
     
     async def close(self):
         """Properly close the bot and clean up resources"""
@@ -180,15 +349,36 @@ class Banketnika(commands.Bot):
         
         # Close the bot connection
         await super().close()
+        
+        # Voice disconnects above can still schedule timers, stop the wheel only after them
+        self.timers.close()
+        
+        # Close shared music state once the cogs are unloaded
+        registry = getattr(self, 'music_registry', None)
+        if registry:
+            registry.close()
+        
+        workers = ExtractionWorkers.shared()
+        if workers:
+            workers.close()
 
-async def main():
-    """Main function to run the bot"""
+async def main(shard_ids: Optional[List[int]] = None, shard_count: Optional[int] = None,
+               cluster_id: Optional[int] = None, stats_queue=None, cluster_count: int = 1):
+    """Main function to run the bot (or one cluster of it)"""
     try:
         # Validate configuration
         Config.validate_config()
         
         # Create and run bot
-        bot = Banketnika()
+        bot = Banketnika(shard_ids, shard_count or Config.SHARD_COUNT, cluster_id, stats_queue, cluster_count)
+        if cluster_id is not None:
+            # The supervisor stops clusters with SIGTERM, leave voice channels cleanly
+            try:
+                asyncio.get_running_loop().add_signal_handler(
+                    signal.SIGTERM, lambda: asyncio.create_task(bot.close())
+                )
+            except NotImplementedError:
+                pass
         if Config.BOT_TOKEN:
             await bot.start(Config.BOT_TOKEN)
         else:
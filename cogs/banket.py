@@ -1,16 +1,18 @@
 import discord
 from discord.ext import commands
 import random
-import asyncio
-from typing import Optional
+from typing import Optional, List
 from config import Config
 from utils.music_utils import MusicUtils
+from utils.triggers import KeywordTriggers, MAX_KEYWORDS
+from utils.cheers_view import CheersView
 
 class BanketCog(commands.Cog):
     """Special Bulgarian Banket Features"""
     
     def __init__(self, bot):
         self.bot = bot
+        self.triggers = KeywordTriggers.shared()
         
         # Traditional Bulgarian folk songs
         self.bulgarian_folk_songs = [
@@ -83,6 +85,26 @@ class BanketCog(commands.Cog):
             "Глория",
             "Софи Маринова"
         ]
+        
+        # Songs for the horo command
+        self.horo_songs = [
+            "Дунавско хоро",
+            "Тракийско хоро", 
+            "Шопско хоро",
+            "Българско хоро",
+            "Хоро на Нестинарките",
+            "Пайдушко хоро",
+            "Елено моме",
+            "Ръченица"
+        ]
+    
+    def canned_queries(self) -> List[str]:
+        """Queries issued by the folksong, horo and artist commands, kept warm in the track cache"""
+        return (
+            [f"{song} българска народна песен" for song in self.bulgarian_folk_songs] +
+            [f"{song} българско хоро" for song in self.horo_songs] +
+            [f"{artist} български песни" for artist in self.bulgarian_artists]
+        )
     
     @commands.command(name='folksong', aliases=['народна'])
     async def folksong(self, ctx):
@@ -100,7 +122,9 @@ class BanketCog(commands.Cog):
         # Try to play the song
         music_cog = self.bot.get_cog('Music')
         if music_cog:
-            await music_cog.play(ctx, query=f"{song} българска народна песен")
+            # Play our own recording when the local library has one
+            query = song if music_cog.find_local(song) else f"{song} българска народна песен"
+            await music_cog.play(ctx, query=query)
     
     @commands.command(name='toast', aliases=['тост'])
     async def toast(self, ctx, *, message: Optional[str] = None):
@@ -126,18 +150,7 @@ class BanketCog(commands.Cog):
     @commands.command(name='horo', aliases=['хоро'])
     async def horo(self, ctx):
         """Start a horo (Bulgarian circle dance) session"""
-        horo_songs = [
-            "Дунавско хоро",
-            "Тракийско хоро", 
-            "Шопско хоро",
-            "Българско хоро",
-            "Хоро на Нестинарките",
-            "Пайдушко хоро",
-            "Елено моме",
-            "Ръченица"
-        ]
-        
-        song = random.choice(horo_songs)
+        song = random.choice(self.horo_songs)
         
         embed = MusicUtils.create_music_embed(
             "💃 Време за хоро!",
@@ -158,7 +171,9 @@ class BanketCog(commands.Cog):
         # Try to play the horo
         music_cog = self.bot.get_cog('Music')
         if music_cog:
-            await music_cog.play(ctx, query=f"{song} българско хоро")
+            # Play our own recording when the local library has one
+            query = song if music_cog.find_local(song) else f"{song} българско хоро"
+            await music_cog.play(ctx, query=query)
     
     @commands.command(name='artist', aliases=['изпълнител'])
     async def artist(self, ctx, *, artist_name: Optional[str] = None):
@@ -190,25 +205,16 @@ class BanketCog(commands.Cog):
         # Select 5 random songs for the mix
         selected_songs = random.sample(self.bulgarian_folk_songs, min(5, len(self.bulgarian_folk_songs)))
         
-        embed = MusicUtils.create_music_embed(
-            "🎉 Банкет микс!",
-            f"Добавям {len(selected_songs)} български песни в опашката:\n\n" +
-            "\n".join([f"🎵 {song}" for song in selected_songs]) +
-            f"\n\n{random.choice(self.banket_expressions)}",
-            Config.COLOR_SECONDARY
-        )
-        
-        await ctx.send(embed=embed)
-        
-        # Add all songs to queue
+        # Resolve all songs together with a single progress message
         music_cog = self.bot.get_cog('Music')
         if music_cog:
-            for song in selected_songs:
-                try:
-                    await music_cog.play(ctx, query=f"{song} българска народна песен")
-                    await asyncio.sleep(1)  # Small delay between requests
-                except Exception as e:
-                    print(f"Error adding song {song}: {e}")
+            await music_cog.enqueue_many(
+                ctx,
+                [f"{song} българска народна песен" for song in selected_songs],
+                title="🎉 Банкет микс!",
+                intro=f"Добавям {len(selected_songs)} български песни в опашката. "
+                      f"{random.choice(self.banket_expressions)}"
+            )
     
     @commands.command(name='tradition', aliases=['традиция'])
     async def tradition(self, ctx):
@@ -257,38 +263,32 @@ class BanketCog(commands.Cog):
         embed = MusicUtils.create_music_embed(
             "🥂 Време за здравица!",
             "Кой иска да чукне с мен?\n\n"
-            "Реагирайте с 🍻 за да се присъедините!",
+            "Натиснете 🍻 за да се присъедините!",
             Config.COLOR_SECONDARY
         )
         
-        message = await ctx.send(embed=embed)
-        await message.add_reaction("🍻")
-        
-        # Wait for reactions
-        def check(reaction, user):
-            return reaction.message.id == message.id and str(reaction.emoji) == "🍻" and not user.bot
+        # A button rather than a reaction, so it also works without the reactions intent (LEAN_GATEWAY)
+        view = CheersView(timeout=30.0)
+        message = await ctx.send(embed=embed, view=view)
+        await view.wait()
         
-        try:
-            reaction, user = await self.bot.wait_for('reaction_add', timeout=30.0, check=check)
-            
+        if view.user is not None:
             # Update embed with cheers
             new_embed = MusicUtils.create_music_embed(
                 "🍻 Наздраве!",
-                f"{user.mention} чукна с мен!\n\n"
+                f"{view.user.mention} чукна с мен!\n\n"
                 f"{random.choice(self.bulgarian_toasts)}\n\n"
                 f"*{random.choice(self.banket_expressions)}*",
                 Config.COLOR_SUCCESS
             )
-            
-            await message.edit(embed=new_embed)
-            
-        except asyncio.TimeoutError:
+            await message.edit(embed=new_embed, view=None)
+        else:
             timeout_embed = MusicUtils.create_music_embed(
                 "😔 Няма чукане",
                 "Никой не иска да чукне... Но пак наздраве! 🍻",
                 Config.COLOR_WARNING
             )
-            await message.edit(embed=timeout_embed)
+            await message.edit(embed=timeout_embed, view=None)
     
     async def _ensure_voice_connection(self, ctx) -> bool:
         """Ensure bot is connected to voice channel"""
@@ -302,24 +302,71 @@ class BanketCog(commands.Cog):
             return False
         return True
     
+    @commands.command(name='keywords', aliases=['думи'])
+    @commands.guild_only()
+    async def keywords(self, ctx, action: Optional[str] = None, *, words: Optional[str] = None):
+        """Show or change the words the bot replies to: add, remove, set (comma-separated), off, reset"""
+        guild_id = ctx.guild.id
+        if action is not None:
+            if not ctx.author.guild_permissions.manage_guild:
+                embed = MusicUtils.create_music_embed(
+                    "❌ Недостатъчни права",
+                    "Само потребители с право `manage_guild` могат да променят ключовите думи.",
+                    Config.COLOR_ERROR
+                )
+                await ctx.send(embed=embed)
+                return
+            action = action.lower()
+            given = [word for word in (words or '').split(',') if word.strip()]
+            current = self.triggers.keywords(guild_id)
+            
+            if action in ('add', 'добави') and given:
+                self.triggers.set_keywords(guild_id, current + given)
+            elif action in ('remove', 'махни') and given:
+                removed = {self.triggers.normalize(word) for word in given}
+                self.triggers.set_keywords(guild_id, [word for word in current if word not in removed])
+            elif action in ('set', 'задай') and given:
+                self.triggers.set_keywords(guild_id, given)
+            elif action in ('off', 'изключи'):
+                self.triggers.set_keywords(guild_id, [])
+            elif action in ('reset', 'нулирай'):
+                self.triggers.reset(guild_id)
+            else:
+                embed = MusicUtils.create_music_embed(
+                    "❌ Грешка",
+                    f"Използване: `{Config.BOT_PREFIX}keywords [add|remove|set] дума1, дума2` "
+                    f"или `{Config.BOT_PREFIX}keywords off|reset`",
+                    Config.COLOR_ERROR
+                )
+                await ctx.send(embed=embed)
+                return
+        
+        keywords = self.triggers.keywords(guild_id)
+        source = "настройки на сървъра" if self.triggers.is_custom(guild_id) else "по подразбиране"
+        embed = MusicUtils.create_music_embed(
+            "💬 Ключови думи",
+            (", ".join(f"`{word}`" for word in keywords) if keywords else "Отговорите на ключови думи са изключени.")
+            + f"\n\n*{source} • до {MAX_KEYWORDS} думи*",
+            Config.COLOR_SECONDARY
+        )
+        await ctx.send(embed=embed)
+    
     @commands.Cog.listener()
     async def on_message(self, message):
         """Listen for banket-related messages"""
-        if message.author.bot:
+        if message.author.bot or not message.content or message.content.startswith(Config.BOT_PREFIX):
             return
         
-        # Respond to banket-related keywords
-        banket_keywords = ['банкет', 'banket', 'наздраве', 'nazdrave', 'хоро', 'horo']
+        # Prefix commands and empty messages are skipped before any matching; guilds can switch triggers off
+        guild_id = message.guild.id if message.guild else None
+        if self.triggers.match(guild_id, message.content) is None:
+            return
         
-        content = message.content.lower()
-        for keyword in banket_keywords:
-            if keyword in content and not content.startswith(Config.BOT_PREFIX):
-                # Random chance to respond (20%)
-                if random.random() < 0.2:
-                    response = random.choice(self.banket_expressions)
-                    await message.add_reaction("🍻")
-                    await message.channel.send(f"🎉 {response}")
-                break
+        # Random chance to respond (20%), limited per channel so busy servers don't get reply bursts
+        if random.random() < 0.2 and self.triggers.allow(message.channel.id):
+            response = random.choice(self.banket_expressions)
+            await message.add_reaction("🍻")
+            await message.channel.send(f"🎉 {response}")
 
 async def setup(bot):
     await bot.add_cog(BanketCog(bot)) 
\ No newline at end of file
@@ -5,6 +5,14 @@ import time
 from typing import Optional
 from config import Config
 from utils.music_utils import MusicUtils
+from utils.scheduler import ExtractionScheduler
+from utils.track_cache import TrackCache
+from utils.negative_cache import NegativeCache
+from utils.track_index import TrackIndex
+from utils.cluster import read_cluster_stats
+from utils.extraction_workers import ExtractionWorkers
+from utils.audio_send_loop import AudioSendLoop
+from utils.triggers import KeywordTriggers
 
 class General(commands.Cog):
     """General commands for Banketnika Bot"""
@@ -107,7 +115,7 @@ class General(commands.Cog):
         embed.add_field(
             name="📊 Статистики",
             value=f"**Сървъри:** {len(self.bot.guilds)}\n"
-                  f"**Потребители:** {len(self.bot.users)}\n"
+                  f"**Потребители:** ~{self.bot.approximate_user_count()}\n"
                   f"**Време онлайн:** {uptime_str}",
             inline=True
         )
@@ -134,7 +142,7 @@ class General(commands.Cog):
         
         await ctx.send(embed=embed)
     
-    @commands.command(name='nazdrave', aliases=['наздраве', 'cheers'])
+    @commands.command(name='nazdrave', aliases=['наздраве'])
     async def nazdrave(self, ctx):
         """Nazdrave command - Bulgarian cheers!"""
         cheers_messages = [
@@ -196,6 +204,170 @@ class General(commands.Cog):
         
         await ctx.send(embed=embed)
 
+    @commands.command(name='reload', aliases=['презареди'])
+    @commands.is_owner()
+    async def reload(self, ctx, extension: str = 'music'):
+        """Reload a cog without dropping voice sessions or queues (owner only)"""
+        name = extension if extension.startswith('cogs.') else f"cogs.{extension}"
+        
+        try:
+            await self.bot.reload_extension(name)
+        except Exception as e:
+            embed = MusicUtils.create_music_embed(
+                "❌ Грешка при презареждане",
+                f"`{name}`: {str(e)}",
+                Config.COLOR_ERROR
+            )
+            await ctx.send(embed=embed)
+            return
+        
+        registry = getattr(self.bot, 'music_registry', None)
+        players = len(registry.players) if registry else 0
+        embed = MusicUtils.create_music_embed(
+            "🔄 Презаредено",
+            f"`{name}` е презареден. Активни плейъри: {players}",
+            Config.COLOR_SUCCESS
+        )
+        await ctx.send(embed=embed)
+    
+    @commands.command(name='diag', aliases=['диагностика'])
+    @commands.is_owner()
+    async def diag(self, ctx):
+        """Show internal queue and scheduler metrics (owner only)"""
+        embed = discord.Embed(
+            title="🩺 Диагностика",
+            color=Config.COLOR_PRIMARY
+        )
+        
+        scheduler_lines = []
+        for name, stats in ExtractionScheduler.shared().stats().items():
+            scheduler_lines.append(
+                f"`{name}` опашка: {stats['queued']} • активни: {stats['running']} • "
+                f"готови: {stats['completed']} • отменени: {stats['cancelled']} • "
+                f"чакане: ср. {stats['avg_wait']:.2f}s / макс. {stats['max_wait']:.2f}s"
+            )
+        embed.add_field(
+            name="⚙️ Извличане (yt-dlp)",
+            value="\n".join(scheduler_lines),
+            inline=False
+        )
+        
+        cache_stats = TrackCache.shared().stats()
+        embed.add_field(
+            name="⚡ Кеш на песни",
+            value=f"Записи: {cache_stats['entries']} • попадения: {cache_stats['hits']} • "
+                  f"пропуски: {cache_stats['misses']} • успеваемост: {cache_stats['hit_rate']:.0%}\n"
+                  f"Индекс на изсвирени песни: {TrackIndex.shared().stats()['tracks']}",
+            inline=False
+        )
+        
+        music_cog = self.bot.get_cog('Music')
+        library = music_cog.library if music_cog else None
+        if library:
+            library_stats = library.stats()
+            embed.add_field(
+                name="📁 Локална библиотека",
+                value=f"Песни: {library_stats['tracks']} • времетраене: "
+                      f"{MusicUtils.format_duration(library_stats['duration'])} • "
+                      f"папки: {library_stats['directories']}",
+                inline=False
+            )
+        
+        if music_cog:
+            edit_stats = music_cog.edits.stats()
+            embed.add_field(
+                name="✏️ Редакции на съобщения",
+                value=f"Чакащи: {edit_stats['pending']} • заявки: {edit_stats['requested']} • "
+                      f"обединени: {edit_stats['coalesced']} • изпратени: {edit_stats['sent']} • "
+                      f"грешки: {edit_stats['failed']}",
+                inline=False
+            )
+        
+        memory_now = MusicUtils.get_memory_usage()
+        if memory_now is not None:
+            def format_memory(value):
+                return f"{value:.0f} MB" if value is not None else "?"
+            embed.add_field(
+                name="🧠 Памет (RSS)",
+                value=f"Сега: {format_memory(memory_now)} • при старт: {format_memory(self.bot.memory_at_start)} • "
+                      f"при готовност: {format_memory(self.bot.memory_at_ready)}\n"
+                      f"Кеширани потребители: {len(self.bot.users)} • съобщения: {len(self.bot.cached_messages)} • "
+                      f"режим: {'икономичен' if Config.LEAN_GATEWAY else 'пълен'}",
+                inline=False
+            )
+        
+        if Config.AUDIO_SEND_LOOP:
+            loop_stats = AudioSendLoop.shared().stats()
+            slowest = sorted(loop_stats['guilds'].items(), key=lambda item: item[1]['max_read_ms'], reverse=True)[:3]
+            slow_guilds = "\n".join(
+                f"`{guild_id}` кадри: {stats['frames']} • празен буфер: {stats['underruns']} • "
+                f"бавни четения: {stats['slow_reads']} • четене: ср. {stats['avg_read_ms']:.2f}ms / макс. {stats['max_read_ms']:.1f}ms"
+                for guild_id, stats in slowest
+            )
+            embed.add_field(
+                name="🔊 Цикъл за изпращане на звук",
+                value=f"Потоци: {loop_stats['streams']} • тактове: {loop_stats['ticks']} • "
+                      f"закъснели: {loop_stats['late_ticks']} • ресинхронизации: {loop_stats['resyncs']}\n"
+                      f"Макс. закъснение: {loop_stats['max_lateness_ms']:.1f}ms • "
+                      f"макс. работа в такт: {loop_stats['max_tick_work_ms']:.1f}ms"
+                      + (f"\n{slow_guilds}" if slow_guilds else ""),
+                inline=False
+            )
+        
+        workers = ExtractionWorkers.shared()
+        if workers:
+            worker_stats = workers.stats()
+            embed.add_field(
+                name="🧵 Процеси за извличане",
+                value=f"Живи: {worker_stats['alive']}/{worker_stats['workers']} • заети: {worker_stats['busy']} • "
+                      f"заявки: {worker_stats['requests']} • сривове: {worker_stats['crashes']}",
+                inline=False
+            )
+        
+        failure_stats = NegativeCache.shared().stats()
+        reasons = ", ".join(f"{reason}: {count}" for reason, count in failure_stats['reasons'].items()) or "няма"
+        embed.add_field(
+            name="🚫 Неуспешни заявки",
+            value=f"Запомнени: {failure_stats['entries']} ({reasons}) • спестени: {failure_stats['hits']}",
+            inline=False
+        )
+        
+        timer_stats = self.bot.timers.stats()
+        embed.add_field(
+            name="⏲️ Таймери за гласови канали",
+            value=f"Чакащи: {timer_stats['pending']} • насрочени: {timer_stats['scheduled']} • "
+                  f"отменени: {timer_stats['cancelled']} • изтекли: {timer_stats['fired']} • "
+                  f"спестени повторни свързвания: {self.bot.alone_rejoins}",
+            inline=False
+        )
+        
+        trigger_stats = KeywordTriggers.shared().stats()
+        embed.add_field(
+            name="💬 Ключови думи",
+            value=f"Съвпадения: {trigger_stats['matches']} • отговори: {trigger_stats['allowed']} • "
+                  f"задържани: {trigger_stats['throttled']} • канали: {trigger_stats['channels']} • "
+                  f"сървъри със собствени думи: {trigger_stats['custom_guilds']}",
+            inline=False
+        )
+        
+        if self.bot.cluster_id is not None:
+            cluster_stats = read_cluster_stats(Config.DATA_DIR)
+            cluster_lines = []
+            for cluster_id, stats in sorted(cluster_stats.get('clusters', {}).items(), key=lambda item: int(item[0])):
+                status = "🟢" if stats['alive'] else "🔴"
+                cluster_lines.append(
+                    f"{status} `#{cluster_id}` шардове {stats['shards'][0]}-{stats['shards'][1]} • "
+                    f"сървъри: {stats.get('guilds', '?')} • свири: {stats.get('playing', '?')} • "
+                    f"пинг: {stats.get('latency_ms', '?')}ms • рестарти: {stats['restarts']}"
+                )
+            embed.add_field(
+                name=f"🧩 Клъстери (този: #{self.bot.cluster_id})",
+                value=MusicUtils.truncate("\n".join(cluster_lines), 1024) or "Няма данни от супервайзора",
+                inline=False
+            )
+        
+        await ctx.send(embed=embed)
+    
     @commands.command(name='dgd')
     async def dgd(self, ctx):
         """ДА ГО ДУХАШ ПАЛЯК АЙ ПАЛИ"""
@@ -212,7 +384,7 @@ class General(commands.Cog):
         """Event when bot is ready"""
         print(f"{Config.BOT_NAME} is ready!")
         print(f"Connected to {len(self.bot.guilds)} servers")
-        print(f"Serving {len(self.bot.users)} users")
+        print(f"Serving ~{self.bot.approximate_user_count()} users")
         
         # Set bot activity
         activity = discord.Activity(
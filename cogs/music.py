@@ -1,21 +1,38 @@
 import discord
-from discord.ext import commands
+from discord import app_commands
+from discord.ext import commands, tasks
 import asyncio
 import random
-from typing import Optional, Dict, Any, List
+import time
+from typing import Optional, Dict, Any, List, Tuple
 from collections import deque
 from config import Config
-from utils.music_utils import MusicUtils, YouTubeDownloader
+from utils.music_utils import MusicUtils, YouTubeDownloader, StageTrace
 from utils.cleanup import CleanupManager
-from utils.alternative_player import SimpleAudioPlayer
-from utils.button_handler import MusicButtonHandler
+from utils.alternative_player import SimpleAudioPlayer, FrameCountingSource
+from utils.audio_send_loop import AudioSendLoop
+from utils.search_view import SearchResultsView
+from utils.queue_view import QueueView
+from utils.journal import QueueJournal
+from utils.play_history import PlayHistory
+from utils.player_registry import PlayerRegistry
+from utils.extraction_jobs import ExtractionJobs, ExtractionCancelled
+from utils.scheduler import Priority
+from utils.canonical import Canonicalizer
+from utils.local_library import LocalLibrary
+from utils.audio_cache import AudioCache
+from utils.saved_playlists import SavedPlaylists
+from utils.edit_coalescer import EditCoalescer
 
 class MusicPlayer:
     """Music player class to handle queue and playback"""
     
-    def __init__(self, bot, guild_id: int):
+    def __init__(self, bot, guild_id: int, journal: Optional[QueueJournal] = None,
+                 history: Optional[PlayHistory] = None):
         self.bot = bot
         self.guild_id = guild_id
+        self.journal = journal
+        self.history = history
         self.queue = deque()
         self.current_song = None
         self.voice_client = None
@@ -26,25 +43,196 @@ class MusicPlayer:
         self.shuffle_mode = False
         self.downloader = YouTubeDownloader()
         self.alternative_player = SimpleAudioPlayer()
+        self.jobs = ExtractionJobs()
         
+        # Frame-counting wrapper of the playing source, the playback clock
+        self._clock: Optional[FrameCountingSource] = None
+        
+        # The guild's live now-playing message, updated through the edit coalescer
+        self.now_playing_message: Optional[discord.Message] = None
+        
+        # FFmpeg source started ahead of playback: (url, task)
+        self._prepared_source = None
+        
+        # Background stream resolution of upcoming entries, by id() of the queue entry
+        self._prefetching: Dict[int, asyncio.Task] = {}
+        
+        # Bumped on every queue change; rendered queue pages are cached until it moves
+        self.queue_version = 0
+        self._queue_pages: Dict[Tuple[int, int], str] = {}
+        self._queue_pages_version = -1
+        self._queue_duration = 0
+        
+        # Paused because everyone left the channel, resumed when someone comes back
+        self.auto_paused = False
+    
+    @classmethod
+    def adopt(cls, player) -> 'MusicPlayer':
+        """Rebind a player created by a previous version of this module to the current class"""
+        if isinstance(player, cls):
+            return player
+        
+        missing = [name for name in ('bot', 'guild_id', 'queue', 'voice_client') if not hasattr(player, name)]
+        if missing:
+            raise TypeError(f"Cannot adopt {type(player).__name__}, missing state: {', '.join(missing)}")
+        
+        # Fill in any state introduced since the player was created, keep everything else
+        fresh = cls(player.bot, player.guild_id, getattr(player, 'journal', None), getattr(player, 'history', None))
+        player.__class__ = cls
+        for name, value in vars(fresh).items():
+            player.__dict__.setdefault(name, value)
+        return player
+    
+    def _journal(self, op: str, payload: Any = None):
+        """Record a queue mutation in the journal, if one is attached"""
+        self.queue_version += 1
+        if not self.journal:
+            return
+        try:
+            self.journal.append(self.guild_id, op, payload)
+        except Exception as e:
+            print(f"Error writing queue journal: {e}")
+    
+    def detach_journal(self):
+        """Write a final checkpoint and stop journaling (used on shutdown so state survives)"""
+        self.checkpoint()
+        self.journal = None
+    
+    def get_position(self) -> float:
+        """Get the playback position of the current song in seconds"""
+        return self._clock.position if self._clock else 0.0
+    
+    def checkpoint(self):
+        """Persist the current song and playback position"""
+        if not self.journal or not self.current_song:
+            return
+        if not self.voice_client or not self.voice_client.is_connected():
+            return
+        try:
+            self.journal.checkpoint(
+                self.guild_id,
+                self.voice_client.channel.id,
+                self.current_song,
+                self.get_position(),
+                self.volume,
+                self.repeat_mode
+            )
+        except Exception as e:
+            print(f"Error writing playback checkpoint: {e}")
+    
+    def _record_play(self, song: Dict[str, Any]):
+        """Count a play for popularity-based cache warming"""
+        video_id = song.get('id') or Canonicalizer.extract_video_id(song.get('original_url') or '')
+        # Local files are always available, there is nothing to warm
+        if not self.history or not video_id or video_id.startswith('local:'):
+            return
+        try:
+            self.history.record_play(video_id, song)
+        except Exception as e:
+            print(f"Error recording play history: {e}")
+    
+    def _clear_checkpoint(self):
+        """Forget the persisted playback position"""
+        if not self.journal:
+            return
+        try:
+            self.journal.clear_playback(self.guild_id)
+        except Exception as e:
+            print(f"Error clearing playback checkpoint: {e}")
+        
+    def prepare_source(self, url: str):
+        """Start creating the audio source for url so stream probing overlaps other work"""
+        self.discard_prepared_source()
+        task = asyncio.create_task(self.alternative_player.create_source(url))
+        self._prepared_source = (url, task)
+    
+    def discard_prepared_source(self):
+        """Drop a prepared source that will not be played"""
+        if not self._prepared_source:
+            return
+        _, task = self._prepared_source
+        self._prepared_source = None
+        
+        def cleanup(done_task):
+            if not done_task.cancelled() and done_task.exception() is None:
+                done_task.result().cleanup()
+        
+        task.add_done_callback(cleanup)
+    
+    async def _take_prepared_source(self, url: str) -> Optional[discord.AudioSource]:
+        """Get the prepared source if it was created for url"""
+        if not self._prepared_source:
+            return None
+        if self._prepared_source[0] != url:
+            self.discard_prepared_source()
+            return None
+        
+        _, task = self._prepared_source
+        self._prepared_source = None
+        try:
+            return await task
+        except Exception as e:
+            print(f"Prepared audio source failed, creating a new one: {e}")
+            return None
+    
+    async def _resolve_song(self, song: Dict[str, Any], priority: Priority = Priority.PREFETCH,
+                            cancel_token=None):
+        """Fill in the stream URL of an entry queued without one, from the track cache when possible"""
+        info = self.downloader.cache.get_track(song['id']) if song.get('id') else None
+        if not info:
+            info = await self.downloader.extract_info(
+                song['original_url'], cancel_token=cancel_token, priority=priority, guild_id=self.guild_id
+            )
+            self.downloader.cache.put(None, info)
+        if not info or not info.get('url'):
+            raise Exception(f"Could not resolve stream URL for {song['title']}")
+        
+        song['url'] = info['url']
+        song.pop('unresolved', None)
+    
+    def prefetch_upcoming(self):
+        """Resolve the stream URLs of the next few unresolved queue entries in the background"""
+        for song in list(self.queue)[:Config.PREFETCH_AHEAD]:
+            key = id(song)
+            if not song.get('unresolved') or key in self._prefetching:
+                continue
+            task = self.jobs.spawn(self._resolve_song, song, Priority.PREFETCH)
+            self._prefetching[key] = task
+            task.add_done_callback(lambda done, key=key: self._prefetch_done(key, done))
+    
+    def _prefetch_done(self, key: int, task: asyncio.Task):
+        """Forget a finished prefetch; a failed one is retried when the entry comes up"""
+        self._prefetching.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Prefetch failed: {task.exception()}")
+    
     async def add_to_queue(self, song_info: Dict[str, Any]):
         """Add a song to the queue"""
         if len(self.queue) >= Config.MAX_QUEUE_SIZE:
             raise Exception(f"Опашката е пълна! Максимум {Config.MAX_QUEUE_SIZE} песни.")
         
         self.queue.append(song_info)
+        self._journal('append', QueueJournal.serialize_song(song_info))
     
-    async def play_next(self):
-        """Play the next song in queue"""
+    async def play_next(self, resume_song: Optional[Dict[str, Any]] = None, start_at: float = 0,
+                        trace: Optional[StageTrace] = None):
+        """Play the next song in queue (or resume a restored song at start_at seconds)"""
         print(f"play_next called - Queue length: {len(self.queue)}, Is playing: {self.is_playing}, Repeat mode: {self.repeat_mode}")  # Debug logging
         
-        if not self.queue and not self.repeat_mode:
+        if resume_song is None and not self.queue and not self.repeat_mode:
             print("No songs in queue and repeat mode off - stopping playback")  # Debug logging
             self.current_song = None
             self.is_playing = False
+            self._clock = None
+            self._clear_checkpoint()
+            self.schedule_idle_disconnect()
             return
         
-        if self.repeat_mode and self.current_song:
+        if resume_song is not None:
+            next_song = resume_song
+            self.current_song = next_song
+            print(f"Resuming restored song at {start_at:.0f}s - {next_song['title']}")  # Debug logging
+        elif self.repeat_mode and self.current_song:
             next_song = self.current_song
             print(f"Repeat mode: Playing current song again - {next_song['title']}")  # Debug logging
         else:
@@ -53,30 +241,57 @@ class MusicPlayer:
                 queue_list = list(self.queue)
                 random.shuffle(queue_list)
                 self.queue = deque(queue_list)
+                self._journal('replace', [QueueJournal.serialize_song(song) for song in self.queue])
                 print("Shuffled queue")  # Debug logging
             
             next_song = self.queue.popleft()
+            self._journal('pop')
             self.current_song = next_song
             print(f"Playing next song from queue: {next_song['title']} - {next_song['url']}")  # Debug logging
         
         try:
+            # Saved playlist entries get their stream URL just before playing, unless prefetched already
+            if next_song.get('unresolved'):
+                pending = self._prefetching.get(id(next_song))
+                if pending:
+                    await asyncio.wait({pending})
+                if next_song.get('unresolved'):
+                    await self.jobs.run(self._resolve_song, next_song, Priority.REFRESH)
+            
             print(f"Getting audio source for: {next_song['url']}")  # Debug logging
             
+            # Restored songs keep their stream URL; only refresh it once it has expired
+            if MusicUtils.is_stream_expired(next_song['url']):
+                print("Stored stream URL expired, refreshing before playback")
+                fresh_info = await self.jobs.run(
+                    self.downloader.extract_info, next_song.get('original_url', next_song['url']),
+                    priority=Priority.REFRESH, guild_id=self.guild_id
+                )
+                if fresh_info and fresh_info.get('url'):
+                    next_song['url'] = fresh_info['url']
+            
+            # Reuse the source started while the voice connection was being set up
+            audio_source = await self._take_prepared_source(next_song['url']) if not start_at else None
+            
             # Try to get audio source using alternative player
             try:
-                audio_source = await self.alternative_player.create_source(next_song['url'])
+                if audio_source is None:
+                    audio_source = await self.alternative_player.create_source(next_song['url'], start_at=start_at)
             except Exception as e:
                 if "expired" in str(e).lower() or "403" in str(e) or "forbidden" in str(e).lower():
                     print(f"Stream URL expired, refreshing from original URL: {next_song.get('original_url', next_song['url'])}")
                     # Get fresh stream URL from original YouTube URL
-                    fresh_info = await self.downloader.search_youtube(next_song.get('original_url', next_song['url']))
+                    fresh_info = await self.jobs.run(
+                        self.downloader.search_youtube, next_song.get('original_url', next_song['url']),
+                        priority=Priority.REFRESH, guild_id=self.guild_id, use_cache=False
+                    )
                     if fresh_info:
                         # Update the song data with fresh URL
                         next_song['url'] = fresh_info['url']
                         self.current_song = next_song  # Update current song with fresh URL
                         print(f"Got fresh stream URL: {fresh_info['url']}")
                         # Use the fresh stream URL with alternative player
-                        audio_source = await self.alternative_player.create_source(fresh_info['url'])
+                        audio_source = await self.alternative_player.create_source(fresh_info['url'], start_at=start_at)
                     else:
                         raise Exception("Could not refresh expired stream URL")
                 else:
@@ -95,15 +310,32 @@ class MusicPlayer:
                     # Schedule the next song
                     CleanupManager.safe_schedule_coroutine(self.play_next(), self.bot.loop)
                 
-                self.voice_client.play(audio_source, after=after_playing)
+                # Count frames actually handed to the voice client for an exact position
+                self._clock = FrameCountingSource(audio_source, start_at)
+                if Config.AUDIO_SEND_LOOP:
+                    # One shared thread sends every guild's frames instead of a thread per connection
+                    AudioSendLoop.shared().play(self.voice_client, self._clock, after=after_playing)
+                else:
+                    self.voice_client.play(self._clock, after=after_playing)
+                if trace:
+                    trace.mark_first_audio()
                 self.is_playing = True
                 self.is_paused = False
+                self.bot.timers.cancel(('idle', self.guild_id))
                 self._retry_count = 0  # Reset retry counter on successful playback
+                self.checkpoint()
+                if resume_song is None:
+                    self._record_play(next_song)
+                self.prefetch_upcoming()
                 print("Playback started successfully")  # Debug logging
             else:
                 print("Voice client not connected, cannot play audio")
                 self.is_playing = False
             
+        except ExtractionCancelled:
+            print("Stream refresh cancelled, not retrying")
+            self.is_playing = False
+        
         except Exception as e:
             print(f"Error playing song: {e}")
             
@@ -130,14 +362,32 @@ class MusicPlayer:
                 self._retry_count = 0
                 self.is_playing = False
     
+    def schedule_idle_disconnect(self):
+        """Leave voice after the idle timeout unless something is queued by then"""
+        if self.current_song or self.queue:
+            return
+        self.bot.timers.schedule(('idle', self.guild_id), Config.VOICE_IDLE_TIMEOUT, self.disconnect_if_idle)
+    
+    async def disconnect_if_idle(self):
+        """Leave voice once nothing was queued for the idle timeout"""
+        if self.queue or not self.voice_client or not self.voice_client.is_connected():
+            return
+        if self.voice_client.is_playing() or self.voice_client.is_paused():
+            return
+        print(f"Queue empty for {Config.VOICE_IDLE_TIMEOUT}s, leaving voice in guild {self.guild_id}")
+        await CleanupManager.cleanup_music_player(self)
+    
     def pause(self):
         """Pause the current song"""
+        self.auto_paused = False
         if self.voice_client and self.voice_client.is_playing():
             self.voice_client.pause()
             self.is_paused = True
+            self.checkpoint()
     
     def resume(self):
         """Resume the current song"""
+        self.auto_paused = False
         if self.voice_client and self.voice_client.is_paused():
             self.voice_client.resume()
             self.is_paused = False
@@ -148,6 +398,9 @@ class MusicPlayer:
             self.voice_client.stop()
             self.is_playing = False
             self.is_paused = False
+        self._clear_checkpoint()
+        self.discard_prepared_source()
+        self.cancel_extractions()
         # Clean up alternative player resources
         self.alternative_player.cleanup()
     
@@ -159,6 +412,14 @@ class MusicPlayer:
     def clear_queue(self):
         """Clear the queue"""
         self.queue.clear()
+        self._journal('clear')
+        self.cancel_extractions()
+    
+    def cancel_extractions(self):
+        """Cancel in-flight searches and extractions started for this guild"""
+        cancelled = self.jobs.cancel_all()
+        if cancelled:
+            print(f"Cancelled {cancelled} extraction jobs for guild {self.guild_id}")
     
     def shuffle_queue(self):
         """Shuffle the queue"""
@@ -166,6 +427,7 @@ class MusicPlayer:
             queue_list = list(self.queue)
             random.shuffle(queue_list)
             self.queue = deque(queue_list)
+            self._journal('replace', [QueueJournal.serialize_song(song) for song in self.queue])
             return True
         return False
     
@@ -190,6 +452,7 @@ class MusicPlayer:
             queue_list = list(self.queue)
             removed_song = queue_list.pop(index - 1)
             self.queue = deque(queue_list)
+            self._journal('remove', index - 1)
             return True
         return False
     
@@ -200,12 +463,33 @@ class MusicPlayer:
             song = queue_list.pop(from_index - 1)
             queue_list.insert(to_index - 1, song)
             self.queue = deque(queue_list)
+            self._journal('move', [from_index - 1, to_index - 1])
             return True
         return False
     
+    def _sync_queue_pages(self):
+        """Drop cached queue pages and totals rendered before the last queue change"""
+        if self._queue_pages_version != self.queue_version:
+            self._queue_pages.clear()
+            self._queue_duration = sum(song.get('duration') or 0 for song in self.queue)
+            self._queue_pages_version = self.queue_version
+    
+    def get_queue_page(self, page: int, per_page: int = 10) -> str:
+        """Rendered text of one queue page (1-based), cached until the queue changes"""
+        self._sync_queue_pages()
+        key = (page, per_page)
+        if key not in self._queue_pages:
+            self._queue_pages[key] = MusicUtils.format_queue_page(self.queue, (page - 1) * per_page, per_page)
+        return self._queue_pages[key]
+    
+    def get_queue_duration(self) -> int:
+        """Total duration of the queued songs, cached until the queue changes"""
+        self._sync_queue_pages()
+        return self._queue_duration
+    
     def get_queue_info(self) -> Dict[str, Any]:
         """Get comprehensive queue information"""
-        total_duration = sum(song.get('duration', 0) for song in self.queue)
+        total_duration = self.get_queue_duration()
         return {
             'total_songs': len(self.queue),
             'total_duration': total_duration,
@@ -220,11 +504,36 @@ class MusicPlayer:
 class Music(commands.Cog):
     """Advanced Music Cog for Banketnika Bot"""
     
+    # Songs picked by !banket
+    BANKET_SONGS = [
+        "Калинка",
+        "Тих бял Дунав",
+        "Малка мома",
+        "Дилмано Дилберо",
+        "Българско хоро",
+        "Мила родино",
+        "Дунавско хоро"
+    ]
+    
     def __init__(self, bot):
         self.bot = bot
-        self.players = {}
         self.downloader = YouTubeDownloader()
         
+        # Players, voice clients and the journal live on the bot so a reload keeps them
+        self.registry = PlayerRegistry.attach(bot)
+        if self.registry.journal is None:
+            self.registry.journal = QueueJournal(Config.DATA_DB_PATH)
+        if self.registry.history is None:
+            self.registry.history = PlayHistory(Config.DATA_DB_PATH)
+        if self.registry.library is None and Config.LOCAL_MUSIC_DIRS:
+            self.registry.library = LocalLibrary(Config.DATA_DB_PATH, Config.LOCAL_MUSIC_DIRS)
+        if self.registry.playlists is None:
+            self.registry.playlists = SavedPlaylists(Config.DATA_DB_PATH)
+        if self.registry.edits is None:
+            self.registry.edits = EditCoalescer(Config.MESSAGE_EDITS_PER_SECOND, Config.NOW_PLAYING_UPDATE_INTERVAL)
+        for guild_id, player in list(self.registry.players.items()):
+            self.registry.players[guild_id] = MusicPlayer.adopt(player)
+        
         # Check if FFmpeg is properly installed
         if not MusicUtils.check_ffmpeg():
             print("⚠️  WARNING: FFmpeg is not properly installed or configured!")
@@ -232,14 +541,278 @@ class Music(commands.Cog):
         else:
             print("✅ FFmpeg is properly installed - using optimized alternative player")
     
+    async def cog_load(self):
+        """Start background persistence tasks"""
+        self.checkpoint_players.change_interval(seconds=Config.JOURNAL_CHECKPOINT_INTERVAL)
+        self.compact_journal.change_interval(seconds=Config.JOURNAL_COMPACT_INTERVAL)
+        # Clusters warm their own caches; together they send what a single process would
+        self.prewarm_repertoire.change_interval(seconds=self.prewarm_interval)
+        self.warm_popular_tracks.change_interval(seconds=Config.POPULAR_WARM_INTERVAL)
+        self.checkpoint_players.start()
+        self.compact_journal.start()
+        self.prewarm_repertoire.start()
+        self.warm_popular_tracks.start()
+        self.refresh_now_playing.change_interval(seconds=Config.NOW_PLAYING_UPDATE_INTERVAL)
+        self.refresh_now_playing.start()
+        if self.library:
+            self.scan_library.change_interval(seconds=Config.LOCAL_LIBRARY_SCAN_INTERVAL)
+            self.scan_library.start()
+    
+    async def cog_unload(self):
+        """Stop background persistence tasks (players stay in the registry)"""
+        self.checkpoint_players.cancel()
+        self.compact_journal.cancel()
+        self.prewarm_repertoire.cancel()
+        self.warm_popular_tracks.cancel()
+        self.scan_library.cancel()
+        self.refresh_now_playing.cancel()
+    
+    @property
+    def players(self) -> Dict[int, MusicPlayer]:
+        """Music players by guild id"""
+        return self.registry.players
+    
+    @property
+    def journal(self) -> QueueJournal:
+        """Shared queue journal"""
+        return self.registry.journal
+    
+    @property
+    def history(self) -> PlayHistory:
+        """Shared play history"""
+        return self.registry.history
+    
+    @property
+    def edits(self) -> EditCoalescer:
+        """Shared pacing queue for live message edits"""
+        return self.registry.edits
+    
+    @property
+    def playlists(self) -> SavedPlaylists:
+        """Saved per-guild playlists"""
+        return self.registry.playlists
+    
+    @property
+    def library(self) -> Optional[LocalLibrary]:
+        """Local music library, if directories are configured"""
+        return self.registry.library
+    
+    @property
+    def prewarm_interval(self) -> int:
+        """Seconds between repertoire warm-ups, stretched by the number of clusters"""
+        return Config.PREWARM_INTERVAL * max(1, getattr(self.bot, 'cluster_count', 1))
+    
+    @property
+    def popular_warm_budget(self) -> int:
+        """This cluster's share of the upstream requests allowed per popularity warm-up"""
+        return max(1, Config.POPULAR_WARM_BUDGET // max(1, getattr(self.bot, 'cluster_count', 1)))
+    
+    def find_local(self, query: str) -> Optional[Dict[str, Any]]:
+        """Best local library match for a query, or None"""
+        if not self.library:
+            return None
+        try:
+            return self.library.find(query, Config.LOCAL_LIBRARY_MIN_CONFIDENCE)
+        except Exception as e:
+            print(f"Error searching local library: {e}")
+            return None
+    
     def get_player(self, guild_id: int) -> MusicPlayer:
         """Get or create a music player for the guild"""
         if guild_id not in self.players:
-            self.players[guild_id] = MusicPlayer(self.bot, guild_id)
+            self.players[guild_id] = MusicPlayer(self.bot, guild_id, self.journal, self.history)
         return self.players[guild_id]
     
-    async def ensure_voice_connection(self, ctx) -> bool:
-        """Ensure bot is connected to voice channel"""
+    @tasks.loop(seconds=10)
+    async def checkpoint_players(self):
+        """Periodically persist playback positions"""
+        for player in list(self.players.values()):
+            if player.is_playing:
+                player.checkpoint()
+    
+    @tasks.loop(seconds=300)
+    async def compact_journal(self):
+        """Fold the queue journal into snapshots in the background"""
+        try:
+            await asyncio.get_event_loop().run_in_executor(None, self.journal.compact)
+        except Exception as e:
+            print(f"Error compacting queue journal: {e}")
+    
+    def canned_queries(self) -> List[str]:
+        """Queries issued by fixed-repertoire commands, kept warm in the track cache"""
+        return list(self.BANKET_SONGS)
+    
+    @tasks.loop(seconds=3600)
+    async def prewarm_repertoire(self):
+        """Resolve every canned banket query at bulk priority so those commands skip the search"""
+        queries = []
+        for cog in list(self.bot.cogs.values()):
+            if hasattr(cog, 'canned_queries'):
+                queries.extend(cog.canned_queries())
+        
+        # Refresh anything that would expire before the next run
+        stale = self.downloader.cache.expiring(list(dict.fromkeys(queries)), within=self.prewarm_interval * 2)
+        if not stale:
+            return
+        
+        print(f"🔥 Pre-warming {len(stale)} of {len(queries)} repertoire queries")
+        warmed = 0
+        for query, entry in stale:
+            try:
+                # A known video only needs a fresh stream URL, not another search
+                webpage_url = entry['info'].get('webpage_url') if entry else None
+                if webpage_url:
+                    info = await self.downloader.extract_info(webpage_url, priority=Priority.BULK)
+                    self.downloader.cache.put(query, info)
+                else:
+                    info = await self.downloader.search_youtube(query, priority=Priority.BULK, use_cache=False)
+                if info:
+                    warmed += 1
+            except Exception as e:
+                print(f"Error pre-warming '{query}': {e}")
+        print(f"🔥 Pre-warmed {warmed}/{len(stale)} repertoire queries")
+    
+    @prewarm_repertoire.before_loop
+    async def before_prewarm_repertoire(self):
+        """Wait for the gateway before warming"""
+        await self.bot.wait_until_ready()
+    
+    @tasks.loop(seconds=1800)
+    async def warm_popular_tracks(self):
+        """During off-peak hours, keep the most played tracks resolved (or downloaded) within a request budget"""
+        # Keep downloaded audio within its disk limits, whatever the hour or mode
+        evicted = await asyncio.get_event_loop().run_in_executor(None, AudioCache.shared().trim)
+        for track_id in evicted:
+            self.downloader.cache.discard(track_id)
+        if evicted:
+            print(f"🧹 Evicted {len(evicted)} cached audio files")
+        
+        if not MusicUtils.is_within_hours(Config.OFFPEAK_HOURS):
+            return
+        
+        top_tracks = await asyncio.get_event_loop().run_in_executor(
+            None, self.history.top_tracks, Config.POPULAR_WARM_TOP_N
+        )
+        download = Config.POPULAR_WARM_MODE == 'download'
+        # Refresh anything that would expire before the next run
+        deadline = time.time() + Config.POPULAR_WARM_INTERVAL * 2
+        
+        budget = total_budget = self.popular_warm_budget
+        warmed = 0
+        for track in top_tracks:
+            if budget <= 0:
+                break
+            entry = self.downloader.cache.peek_track(track['id'])
+            if entry and entry['expires_at'] > deadline:
+                continue
+            
+            budget -= 1
+            try:
+                if download:
+                    info = await self.downloader.download_audio(track['webpage_url'], Config.AUDIO_CACHE_DIR)
+                else:
+                    info = await self.downloader.extract_info(track['webpage_url'], priority=Priority.BULK)
+                if info:
+                    self.downloader.cache.put(None, info)
+                    warmed += 1
+            except Exception as e:
+                print(f"Error warming popular track {track['id']}: {e}")
+        
+        if warmed:
+            print(f"🔥 Warmed {warmed} popular tracks ({total_budget - budget} upstream requests)")
+    
+    @warm_popular_tracks.before_loop
+    async def before_warm_popular_tracks(self):
+        """Wait for the gateway before warming"""
+        await self.bot.wait_until_ready()
+    
+    def _track_now_playing(self, player: MusicPlayer, message: discord.Message):
+        """Make message the guild's live now-playing message, replacing the previous one"""
+        if player.now_playing_message is not None and player.now_playing_message.id != message.id:
+            self.edits.forget(player.now_playing_message)
+        player.now_playing_message = message
+    
+    @staticmethod
+    def _render_now_playing(player: MusicPlayer) -> Optional[Dict[str, Any]]:
+        """Edit arguments for a player's now-playing message, rendered when the edit is sent"""
+        if not player.current_song:
+            return None
+        return {'embed': MusicUtils.create_now_playing_embed(player.current_song, player.get_position())}
+    
+    @tasks.loop(seconds=10)
+    async def refresh_now_playing(self):
+        """Queue progress updates of every live now-playing message through the edit coalescer"""
+        for player in list(self.players.values()):
+            message = player.now_playing_message
+            if message is None:
+                continue
+            if not player.current_song:
+                self.edits.forget(message)
+                player.now_playing_message = None
+                continue
+            if player.is_playing and not player.is_paused:
+                self.edits.request(message, lambda player=player: self._render_now_playing(player))
+    
+    @tasks.loop(seconds=300)
+    async def scan_library(self):
+        """Pick up files added, changed or removed in the local music directories"""
+        try:
+            await asyncio.get_event_loop().run_in_executor(None, self.library.scan)
+        except Exception as e:
+            print(f"Error scanning local music library: {e}")
+    
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Restore queues and playback from the journal after a restart"""
+        if self.registry.restored or not Config.RESTORE_ON_STARTUP:
+            return
+        self.registry.restored = True
+        
+        for guild_id in self.journal.guilds():
+            guild = self.bot.get_guild(guild_id)
+            if not guild:
+                continue
+            try:
+                await self._restore_player(guild)
+            except Exception as e:
+                print(f"Error restoring player for guild {guild_id}: {e}")
+    
+    async def _restore_player(self, guild: discord.Guild):
+        """Rebuild a guild's player from persisted state and resume playback"""
+        state = self.journal.load_playback(guild.id)
+        queue = self.journal.load_queue(guild.id)
+        if not state and not queue:
+            return
+        
+        def restore_song(data: Dict[str, Any]) -> Dict[str, Any]:
+            song = dict(data)
+            requester_id = song.pop('requester_id', None)
+            song['requester'] = (guild.get_member(requester_id) if requester_id else None) or guild.me
+            return song
+        
+        player = self.get_player(guild.id)
+        player.queue = deque(restore_song(song) for song in queue)
+        player.queue_version += 1
+        
+        if not state:
+            print(f"Restored {len(player.queue)} queued songs for guild {guild.id}")
+            return
+        
+        channel = guild.get_channel(state['channel_id'])
+        if not isinstance(channel, (discord.VoiceChannel, discord.StageChannel)):
+            print(f"Voice channel for guild {guild.id} no longer exists, keeping queue only")
+            return
+        
+        player.volume = state['volume']
+        player.repeat_mode = state['repeat_mode']
+        if not player.voice_client:
+            player.voice_client = guild.voice_client or await channel.connect()
+        
+        print(f"Restored {len(player.queue)} queued songs for guild {guild.id}, resuming at {state['position']:.0f}s")
+        await player.play_next(resume_song=restore_song(state['song']), start_at=state['position'])
+    
+    async def _require_author_voice(self, ctx) -> bool:
+        """Check that the command author is in a voice channel"""
         if not ctx.author.voice:
             embed = MusicUtils.create_music_embed(
                 "❌ Грешка",
@@ -248,43 +821,89 @@ class Music(commands.Cog):
             )
             await ctx.send(embed=embed)
             return False
-        
-        channel = ctx.author.voice.channel
+        return True
+    
+    async def _connect_voice(self, ctx):
+        """Connect to the author's voice channel if not connected yet (raises on failure)"""
         player = self.get_player(ctx.guild.id)
-        
         if not player.voice_client:
-            try:
-                player.voice_client = await channel.connect()
-            except Exception as e:
-                embed = MusicUtils.create_music_embed(
-                    "❌ Грешка",
-                    f"Не мога да се свържа с гласовия канал: {str(e)}",
-                    Config.COLOR_ERROR
-                )
-                await ctx.send(embed=embed)
-                return False
+            player.voice_client = await ctx.author.voice.channel.connect()
+    
+    async def ensure_voice_connection(self, ctx) -> bool:
+        """Ensure bot is connected to voice channel"""
+        if not await self._require_author_voice(ctx):
+            return False
+        
+        try:
+            await self._connect_voice(ctx)
+        except Exception as e:
+            embed = MusicUtils.create_music_embed(
+                "❌ Грешка",
+                f"Не мога да се свържа с гласовия канал: {str(e)}",
+                Config.COLOR_ERROR
+            )
+            await ctx.send(embed=embed)
+            return False
         
         return True
     
-    @commands.command(name='play', aliases=['p', 'свири', 'пусни'])
+    @commands.hybrid_command(name='play', aliases=['p', 'свири', 'пусни'], description="Пусни песен или я добави в опашката")
+    @app_commands.describe(query="Име на песен или линк")
     async def play(self, ctx, *, query: str):
         """Play a song or add it to queue"""
-        if not await self.ensure_voice_connection(ctx):
+        if not await self._require_author_voice(ctx):
+            return
+        
+        # Playlist links are imported page by page instead of being resolved in one go
+        if Canonicalizer.extract_playlist_id(query) and not Canonicalizer.extract_video_id(query):
+            await self.playlist(ctx, url=query)
             return
         
         player = self.get_player(ctx.guild.id)
+        trace = StageTrace(f"play '{query}'")
         
-        # Show searching message
+        # The voice handshake and the searching message don't depend on the search, run them alongside it
+        connect_task = asyncio.create_task(trace.timed('connect', self._connect_voice(ctx)))
         searching_embed = MusicUtils.create_music_embed(
             "🔍 Търсене...",
             f"Търся: **{query}**",
             Config.COLOR_WARNING
         )
-        search_msg = await ctx.send(embed=searching_embed)
+        message_task = asyncio.create_task(trace.timed('message', ctx.send(embed=searching_embed)))
+        search_msg = None
         
         try:
             # Search for the song or extract URL info
-            song_info = await self.downloader.search_youtube(query)
+            try:
+                # Our own collection needs no network, try it before YouTube
+                song_info = self.find_local(query)
+                if song_info:
+                    print(f"📁 Local library hit for: {query}")
+                else:
+                    song_info = await trace.timed('search', player.jobs.run(
+                        self.downloader.search_youtube, query,
+                        priority=Priority.INTERACTIVE, guild_id=ctx.guild.id
+                    ))
+            finally:
+                search_msg = await message_task
+            
+            # Start probing the stream while the voice handshake may still be running
+            if (song_info and not self.downloader.is_playlist(song_info) and song_info.get('url')
+                    and not player.is_playing and not player.queue
+                    and song_info.get('duration', 0) <= Config.MAX_SONG_LENGTH):
+                player.prepare_source(song_info['url'])
+            
+            try:
+                await connect_task
+            except Exception as e:
+                player.discard_prepared_source()
+                embed = MusicUtils.create_music_embed(
+                    "❌ Грешка",
+                    f"Не мога да се свържа с гласовия канал: {str(e)}",
+                    Config.COLOR_ERROR
+                )
+                await search_msg.edit(embed=embed)
+                return
             
             if not song_info:
                 embed = MusicUtils.create_music_embed(
@@ -302,9 +921,21 @@ class Music(commands.Cog):
                 return
             
             # Single song handling
-            await self._handle_single_song(ctx, song_info, search_msg, player)
+            await self._handle_single_song(ctx, song_info, search_msg, player, trace)
+            print(f"⏱️ {trace.summary()}")
+        
+        except ExtractionCancelled:
+            await asyncio.gather(connect_task, return_exceptions=True)
+            embed = MusicUtils.create_music_embed(
+                "⏹️ Отменено",
+                f"Търсенето за **{query}** беше отменено",
+                Config.COLOR_WARNING
+            )
+            if search_msg:
+                await search_msg.edit(embed=embed)
         
         except Exception as e:
+            await asyncio.gather(connect_task, return_exceptions=True)
             print(f"Error in play command: {str(e)}")  # Debug logging
             error_msg = str(e)
             
@@ -323,9 +954,159 @@ class Music(commands.Cog):
                 f"Възникна грешка: {error_msg}",
                 Config.COLOR_ERROR
             )
-            await search_msg.edit(embed=embed)
+            if search_msg:
+                await search_msg.edit(embed=embed)
+            else:
+                await ctx.send(embed=embed)
+    
+    @play.autocomplete('query')
+    async def play_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        """Suggest tracks for /play from local indexes only, Discord allows 3 seconds for an answer"""
+        try:
+            suggestions = self.suggest_tracks(current, 25)
+        except Exception as e:
+            print(f"Error building /play suggestions: {e}")
+            return []
+        return [app_commands.Choice(name=label, value=value) for label, value in suggestions]
+    
+    def suggest_tracks(self, query: str, limit: int) -> List[tuple]:
+        """(label, query) pairs from the local library, the track index or, for an empty query, play history"""
+        suggestions = []
+        seen = set()
+        
+        def add(prefix: str, track: Dict[str, Any], value: str):
+            # Choice names and values are limited to 100 characters
+            value = value[:100]
+            if not value or value in seen:
+                return
+            seen.add(value)
+            label = f"{prefix} {track['title']} — {track.get('uploader') or 'Unknown'}"
+            if track.get('duration'):
+                label += f" ({MusicUtils.format_duration(track['duration'])})"
+            suggestions.append((label[:100], value))
+        
+        if not query.strip():
+            for track in self.history.top_tracks(limit):
+                add("🔥", track, track['webpage_url'] or '')
+            return suggestions
+        
+        if self.library:
+            # !play looks in the library first, so the title finds the same file again
+            for track in self.library.search(query, limit=10):
+                add("📁", track, track['title'])
+        for track in self.downloader.index.suggest(query, limit):
+            add("🎵", track, track['webpage_url'])
+        return suggestions[:limit]
     
-    @commands.command(name='pause', aliases=['пауза'])
+    @commands.hybrid_command(name='search', aliases=['търси'], description="Покажи резултатите от търсене и избери песен")
+    @app_commands.describe(query="Какво да търся")
+    async def search(self, ctx, *, query: str):
+        """Show the top search results and let the requester pick one"""
+        if not await self._require_author_voice(ctx):
+            return
+        
+        # Slash invocations must be acknowledged within 3 seconds, the search can take longer
+        await ctx.defer()
+        
+        player = self.get_player(ctx.guild.id)
+        connect_task = asyncio.create_task(self._connect_voice(ctx))
+        
+        try:
+            results = await player.jobs.run(
+                self.downloader.search_candidates, query, 5,
+                priority=Priority.INTERACTIVE, guild_id=ctx.guild.id
+            )
+        except ExtractionCancelled:
+            return
+        except Exception as e:
+            print(f"Error in search command: {e}")
+            embed = MusicUtils.create_music_embed(
+                "❌ Грешка",
+                f"Възникна грешка при търсене: {str(e)}",
+                Config.COLOR_ERROR
+            )
+            await ctx.send(embed=embed)
+            return
+        finally:
+            # Connect while the requester is choosing, failures are reported when a result is picked
+            connect_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        
+        if not results:
+            embed = MusicUtils.create_music_embed(
+                "❌ Не намерих",
+                f"Няма резултати за: **{query}**",
+                Config.COLOR_ERROR
+            )
+            await ctx.send(embed=embed)
+            return
+        
+        # The top result is the likeliest pick, resolve it while the list is being read
+        speculative_token = player.jobs.child()
+        speculative = player.jobs.spawn(
+            self.downloader.search_youtube, results[0]['url'],
+            priority=Priority.PREFETCH, guild_id=ctx.guild.id, cancel_token=speculative_token
+        )
+        speculative.add_done_callback(lambda task: task.cancelled() or task.exception())
+        
+        view = SearchResultsView(self, ctx, query, results, speculative, connect_task, speculative_token)
+        view.message = await ctx.send(embed=SearchResultsView.create_results_embed(query, results), view=view)
+    
+    async def play_search_result(self, ctx, query: str, result: Dict[str, Any],
+                                 speculative: Optional[asyncio.Task], connect_task: Optional[asyncio.Task], message):
+        """Resolve a picked !search result (reusing a speculative resolution) and queue it"""
+        player = self.get_player(ctx.guild.id)
+        
+        try:
+            info = None
+            if speculative is not None:
+                await asyncio.wait({speculative})
+                if not speculative.cancelled() and speculative.exception() is None:
+                    info = speculative.result()
+            if not info:
+                info = await player.jobs.run(
+                    self.downloader.search_youtube, result['url'],
+                    priority=Priority.INTERACTIVE, guild_id=ctx.guild.id
+                )
+            
+            if not info:
+                embed = MusicUtils.create_music_embed(
+                    "❌ Не мога да заредя песента",
+                    f"Не мога да заредя: **{result['title']}**",
+                    Config.COLOR_ERROR
+                )
+                await message.edit(embed=embed)
+                return
+            
+            # Remember what the pick was searched as, so the same query finds it directly next time
+            try:
+                self.downloader.index.record(query, info)
+            except Exception as e:
+                print(f"Error indexing track: {e}")
+            
+            # Retry the connection if the attempt made during the search failed
+            if connect_task is not None:
+                await asyncio.gather(connect_task, return_exceptions=True)
+            await self._connect_voice(ctx)
+            await self._handle_single_song(ctx, info, message, player)
+        
+        except ExtractionCancelled:
+            embed = MusicUtils.create_music_embed(
+                "⏹️ Отменено",
+                f"Зареждането на **{result['title']}** беше отменено",
+                Config.COLOR_WARNING
+            )
+            await message.edit(embed=embed)
+        
+        except Exception as e:
+            print(f"Error playing search result: {e}")
+            embed = MusicUtils.create_music_embed(
+                "❌ Грешка",
+                f"Възникна грешка: {str(e)}",
+                Config.COLOR_ERROR
+            )
+            await message.edit(embed=embed)
+    
+    @commands.hybrid_command(name='pause', aliases=['пауза'], description="Паузирай текущата песен")
     async def pause(self, ctx):
         """Pause the current song"""
         player = self.get_player(ctx.guild.id)
@@ -347,7 +1128,7 @@ class Music(commands.Cog):
         )
         await ctx.send(embed=embed)
     
-    @commands.command(name='resume', aliases=['продължи'])
+    @commands.hybrid_command(name='resume', aliases=['продължи'], description="Продължи текущата песен")
     async def resume(self, ctx):
         """Resume the current song"""
         player = self.get_player(ctx.guild.id)
@@ -369,7 +1150,7 @@ class Music(commands.Cog):
         )
         await ctx.send(embed=embed)
     
-    @commands.command(name='skip', aliases=['прескочи', 'next'])
+    @commands.hybrid_command(name='skip', aliases=['прескочи', 'next'], description="Прескочи текущата песен")
     async def skip(self, ctx):
         """Skip the current song"""
         player = self.get_player(ctx.guild.id)
@@ -391,7 +1172,7 @@ class Music(commands.Cog):
         )
         await ctx.send(embed=embed)
     
-    @commands.command(name='stop', aliases=['спри'])
+    @commands.hybrid_command(name='stop', aliases=['спри'], description="Спри музиката и изчисти опашката")
     async def stop(self, ctx):
         """Stop the music and clear queue"""
         player = self.get_player(ctx.guild.id)
@@ -406,16 +1187,15 @@ class Music(commands.Cog):
         )
         await ctx.send(embed=embed)
     
-    @commands.command(name='queue', aliases=['q', 'опашка'])
+    @commands.hybrid_command(name='queue', aliases=['q', 'опашка'], description="Покажи опашката")
     async def queue(self, ctx):
         """Show the current queue"""
         player = self.get_player(ctx.guild.id)
         
-        embed = MusicUtils.create_queue_embed(list(player.queue), player.current_song)
-        view = MusicButtonHandler(self.bot)
-        await ctx.send(embed=embed, view=view)
+        view = QueueView(player)
+        view.message = await ctx.send(embed=view.create_embed(), view=view)
     
-    @commands.command(name='nowplaying', aliases=['np', 'сега'])
+    @commands.hybrid_command(name='nowplaying', aliases=['np', 'сега'], description="Покажи какво свири в момента")
     async def nowplaying(self, ctx):
         """Show currently playing song"""
         player = self.get_player(ctx.guild.id)
@@ -429,11 +1209,12 @@ class Music(commands.Cog):
             await ctx.send(embed=embed)
             return
         
-        embed = MusicUtils.create_now_playing_embed(player.current_song)
-        view = MusicButtonHandler(self.bot)
-        await ctx.send(embed=embed, view=view)
+        embed = MusicUtils.create_now_playing_embed(player.current_song, player.get_position())
+        view = self.bot.music_controls
+        self._track_now_playing(player, await ctx.send(embed=embed, view=view))
     
-    @commands.command(name='remove', aliases=['rem', 'премахни'])
+    @commands.hybrid_command(name='remove', aliases=['rem', 'премахни'], description="Премахни песен от опашката")
+    @app_commands.describe(index="Позиция в опашката")
     async def remove(self, ctx, index: int):
         """Remove a song from the queue by position"""
         player = self.get_player(ctx.guild.id)
@@ -462,7 +1243,8 @@ class Music(commands.Cog):
         
         await ctx.send(embed=embed)
     
-    @commands.command(name='move', aliases=['mv', 'премести'])
+    @commands.hybrid_command(name='move', aliases=['mv', 'премести'], description="Премести песен в опашката")
+    @app_commands.describe(from_pos="Текуща позиция", to_pos="Нова позиция")
     async def move(self, ctx, from_pos: int, to_pos: int):
         """Move a song from one position to another in the queue"""
         player = self.get_player(ctx.guild.id)
@@ -491,7 +1273,7 @@ class Music(commands.Cog):
         
         await ctx.send(embed=embed)
     
-    @commands.command(name='queueinfo', aliases=['qi', 'инфо'])
+    @commands.hybrid_command(name='queueinfo', aliases=['qi', 'инфо'], description="Подробна информация за опашката")
     async def queueinfo(self, ctx):
         """Show detailed queue information"""
         player = self.get_player(ctx.guild.id)
@@ -561,7 +1343,7 @@ class Music(commands.Cog):
         embed.set_footer(text=f"{Config.BOT_NAME} • Банкет статистики")
         await ctx.send(embed=embed)
     
-    @commands.command(name='shuffle', aliases=['разбъркай'])
+    @commands.hybrid_command(name='shuffle', aliases=['разбъркай'], description="Разбъркай опашката")
     async def shuffle(self, ctx):
         """Shuffle the queue"""
         player = self.get_player(ctx.guild.id)
@@ -581,12 +1363,14 @@ class Music(commands.Cog):
         
         await ctx.send(embed=embed)
     
-    @commands.command(name='clear', aliases=['изчисти'])
+    @commands.hybrid_command(name='clear', aliases=['изчисти'], description="Изчисти опашката")
     async def clear(self, ctx):
         """Clear the queue"""
         player = self.get_player(ctx.guild.id)
         
         if not player.queue:
+            # Searches still in flight would refill the queue
+            player.cancel_extractions()
             embed = MusicUtils.create_music_embed(
                 "❌ Празна опашка",
                 "Опашката вече е празна",
@@ -602,7 +1386,8 @@ class Music(commands.Cog):
         
         await ctx.send(embed=embed)
     
-    @commands.command(name='volume', aliases=['vol', 'сила'])
+    @commands.hybrid_command(name='volume', aliases=['vol', 'сила'], description="Покажи или задай силата на звука (0-100)")
+    @app_commands.describe(volume="Сила на звука от 0 до 100")
     async def volume(self, ctx, volume: Optional[int] = None):
         """Set or show the volume (0-100)"""
         player = self.get_player(ctx.guild.id)
@@ -655,7 +1440,7 @@ class Music(commands.Cog):
         
         await ctx.send(embed=embed)
     
-    @commands.command(name='repeat', aliases=['повтори'])
+    @commands.hybrid_command(name='repeat', aliases=['повтори'], description="Включи или изключи повторението")
     async def repeat(self, ctx):
         """Toggle repeat mode"""
         player = self.get_player(ctx.guild.id)
@@ -677,7 +1462,7 @@ class Music(commands.Cog):
         
         await ctx.send(embed=embed)
     
-    @commands.command(name='disconnect', aliases=['dc', 'напусни'])
+    @commands.hybrid_command(name='disconnect', aliases=['dc', 'напусни'], description="Напусни гласовия канал")
     async def disconnect(self, ctx):
         """Disconnect from voice channel"""
         player = self.get_player(ctx.guild.id)
@@ -703,17 +1488,7 @@ class Music(commands.Cog):
     @commands.command(name='banket', aliases=['банкет'])
     async def banket(self, ctx):
         """Special banket command - play random Bulgarian folk music"""
-        bulgarian_songs = [
-            "Калинка",
-            "Тих бял Дунав",
-            "Малка мома",
-            "Дилмано Дилберо",
-            "Българско хоро",
-            "Мила родино",
-            "Дунавско хоро"
-        ]
-        
-        random_song = random.choice(bulgarian_songs)
+        random_song = random.choice(self.BANKET_SONGS)
         
         embed = MusicUtils.create_music_embed(
             "🎉 Банкет режим!",
@@ -725,9 +1500,11 @@ class Music(commands.Cog):
         # Try to play the song
         await self.play(ctx, query=random_song)
     
-    @commands.command(name='playlist', aliases=['pl', 'плейлист'])
+    @commands.hybrid_command(name='playlist', aliases=['pl', 'плейлист'], description="Добави плейлист в опашката")
+    @app_commands.describe(url="Линк към плейлист")
     async def playlist(self, ctx, *, url: str):
         """Add a playlist to the queue"""
+        await ctx.defer()
         if not await self.ensure_voice_connection(ctx):
             return
         
@@ -752,20 +1529,16 @@ class Music(commands.Cog):
         loading_msg = await ctx.send(embed=loading_embed)
         
         try:
-            # Extract playlist info
-            playlist_info = await self.downloader.search_youtube(url)
-            
-            if not playlist_info:
-                embed = MusicUtils.create_music_embed(
-                    "❌ Не мога да заредя плейлиста",
-                    "Моля проверете дали URL-то е валидно",
-                    Config.COLOR_ERROR
-                )
-                await loading_msg.edit(embed=embed)
-                return
-            
-            # Handle the playlist
-            await self._handle_playlist(ctx, playlist_info, loading_msg, player)
+            # Import page by page so long playlists start playing early and never sit in memory whole
+            await self._import_playlist(ctx, url, loading_msg, player)
+        
+        except ExtractionCancelled:
+            embed = MusicUtils.create_music_embed(
+                "⏹️ Отменено",
+                "Зареждането на плейлиста беше отменено",
+                Config.COLOR_WARNING
+            )
+            await loading_msg.edit(embed=embed)
             
         except Exception as e:
             print(f"Error loading playlist: {str(e)}")
@@ -776,7 +1549,252 @@ class Music(commands.Cog):
             )
             await loading_msg.edit(embed=embed)
     
-    async def _handle_single_song(self, ctx, song_info, search_msg, player):
+    @commands.hybrid_command(name='saveplaylist', aliases=['savepl', 'запази'], description="Запази текущата песен и опашката като плейлист")
+    @app_commands.describe(name="Име на плейлиста")
+    async def save_playlist(self, ctx, *, name: str):
+        """Save the current song and the queue as a named playlist"""
+        player = self.get_player(ctx.guild.id)
+        songs = ([player.current_song] if player.current_song else []) + list(player.queue)
+        
+        if not songs:
+            embed = MusicUtils.create_music_embed(
+                "❌ Няма какво да запазя",
+                "Няма песен, която свири, и опашката е празна",
+                Config.COLOR_ERROR
+            )
+            await ctx.send(embed=embed)
+            return
+        
+        if len(name) > 50:
+            embed = MusicUtils.create_music_embed(
+                "❌ Твърде дълго име",
+                "Името на плейлиста може да е най-много 50 символа",
+                Config.COLOR_ERROR
+            )
+            await ctx.send(embed=embed)
+            return
+        
+        count = await asyncio.get_event_loop().run_in_executor(
+            None, self.playlists.save, ctx.guild.id, name, songs, ctx.author.id
+        )
+        total_duration = sum(song.get('duration') or 0 for song in songs)
+        embed = MusicUtils.create_music_embed(
+            "💾 Плейлистът е запазен",
+            f"**{name}** • {count} песни • {MusicUtils.format_duration(total_duration)}\n"
+            f"Заредете го с `{Config.BOT_PREFIX}loadplaylist {name}`",
+            Config.COLOR_SUCCESS
+        )
+        await ctx.send(embed=embed)
+    
+    @commands.hybrid_command(name='loadplaylist', aliases=['loadpl', 'зареди'], description="Зареди запазен плейлист")
+    @app_commands.describe(name="Име на плейлиста")
+    async def load_playlist(self, ctx, *, name: str):
+        """Queue a saved playlist without searching for any of its songs"""
+        await ctx.defer()
+        if not await self.ensure_voice_connection(ctx):
+            return
+        
+        songs = await asyncio.get_event_loop().run_in_executor(None, self.playlists.load, ctx.guild.id, name)
+        if songs is None:
+            embed = MusicUtils.create_music_embed(
+                "❌ Няма такъв плейлист",
+                f"Не намерих запазен плейлист **{name}**\n"
+                f"Вижте запазените с `{Config.BOT_PREFIX}playlists`",
+                Config.COLOR_ERROR
+            )
+            await ctx.send(embed=embed)
+            return
+        
+        player = self.get_player(ctx.guild.id)
+        room = max(0, Config.MAX_QUEUE_SIZE - len(player.queue))
+        for song in songs[:room]:
+            song['requester'] = ctx.author
+            await player.add_to_queue(song)
+        added = min(len(songs), room)
+        
+        description = f"Добавени **{added}** песни от **{name}**"
+        if added < len(songs):
+            description += f"\n⚠️ {len(songs) - added} песни не се събраха в опашката"
+        embed = MusicUtils.create_music_embed("📂 Плейлистът е зареден", description, Config.COLOR_SUCCESS)
+        await ctx.send(embed=embed)
+        
+        # Stream URLs are resolved as each song comes up
+        if not player.is_playing:
+            await player.play_next()
+        else:
+            player.prefetch_upcoming()
+    
+    @commands.hybrid_command(name='playlists', aliases=['плейлисти'], description="Покажи запазените плейлисти на сървъра")
+    async def list_playlists(self, ctx):
+        """Show the server's saved playlists"""
+        saved = await asyncio.get_event_loop().run_in_executor(None, self.playlists.list, ctx.guild.id)
+        
+        if not saved:
+            embed = MusicUtils.create_music_embed(
+                "📂 Запазени плейлисти",
+                f"Няма запазени плейлисти\nЗапазете опашката с `{Config.BOT_PREFIX}saveplaylist <име>`",
+                Config.COLOR_WARNING
+            )
+        else:
+            lines = [
+                f"**{playlist['name']}** • {playlist['tracks']} песни • "
+                f"{MusicUtils.format_duration(playlist['duration'])}"
+                for playlist in saved[:25]
+            ]
+            embed = MusicUtils.create_music_embed("📂 Запазени плейлисти", "\n".join(lines))
+        
+        await ctx.send(embed=embed)
+    
+    @commands.hybrid_command(name='deleteplaylist', aliases=['delpl', 'изтрий'], description="Изтрий запазен плейлист")
+    @app_commands.describe(name="Име на плейлиста")
+    async def delete_playlist(self, ctx, *, name: str):
+        """Delete a saved playlist"""
+        deleted = await asyncio.get_event_loop().run_in_executor(None, self.playlists.delete, ctx.guild.id, name)
+        
+        if deleted:
+            embed = MusicUtils.create_music_embed(
+                "🗑️ Плейлистът е изтрит",
+                f"Плейлистът **{name}** беше изтрит",
+                Config.COLOR_SUCCESS
+            )
+        else:
+            embed = MusicUtils.create_music_embed(
+                "❌ Няма такъв плейлист",
+                f"Не намерих запазен плейлист **{name}**",
+                Config.COLOR_ERROR
+            )
+        await ctx.send(embed=embed)
+    
+    @staticmethod
+    def _build_song_data(song_info: Dict[str, Any], requester) -> Dict[str, Any]:
+        """Build queue entry data from extracted song info"""
+        return {
+            'title': song_info['title'],
+            'url': song_info['url'],
+            'original_url': song_info.get('webpage_url', song_info['url']),  # Store original YouTube URL
+            'duration': song_info.get('duration') or 0,
+            'uploader': song_info.get('uploader', 'Unknown'),
+            'thumbnail': song_info.get('thumbnail'),
+            'id': song_info.get('id'),
+            'requester': requester
+        }
+    
+    @staticmethod
+    def _build_flat_song_data(entry: Dict[str, Any], requester) -> Optional[Dict[str, Any]]:
+        """Build an unresolved queue entry from a flat playlist entry, None for private or deleted videos"""
+        if entry.get('title') in ('[Private video]', '[Deleted video]'):
+            return None
+        
+        video_id = entry.get('id') if Canonicalizer.VIDEO_ID_RE.match(entry.get('id') or '') else None
+        original_url = Canonicalizer.canonical_video_url(video_id) if video_id else entry.get('url')
+        if not original_url:
+            return None
+        
+        return {
+            'title': entry.get('title') or 'Unknown',
+            'url': None,
+            'original_url': original_url,
+            'duration': int(entry.get('duration') or 0),
+            'uploader': entry.get('uploader') or entry.get('channel') or 'Unknown',
+            'thumbnail': None,
+            'id': video_id,
+            'unresolved': True,
+            'requester': requester
+        }
+    
+    async def enqueue_many(self, ctx, queries: List[str], title: str = "📋 Добавяне на песни",
+                           intro: str = "") -> int:
+        """Resolve many queries concurrently and queue the results in order with a single progress message"""
+        if not queries or not await self._require_author_voice(ctx):
+            return 0
+        
+        player = self.get_player(ctx.guild.id)
+        statuses = ["⏳"] * len(queries)
+        semaphore = asyncio.Semaphore(Config.BATCH_RESOLVE_CONCURRENCY)
+        
+        def progress_embed(footer: str = "") -> discord.Embed:
+            lines = [f"{status} {query}" for status, query in zip(statuses, queries)]
+            description = (f"{intro}\n\n" if intro else "") + "\n".join(lines)
+            if footer:
+                description += f"\n\n{footer}"
+            return MusicUtils.create_music_embed(title, description, Config.COLOR_SECONDARY)
+        
+        async def resolve(index: int, query: str):
+            async with semaphore:
+                # The head of the batch decides time-to-first-audio, the rest is background work
+                priority = Priority.INTERACTIVE if index == 0 else Priority.BULK
+                try:
+                    info = await player.jobs.run(
+                        self.downloader.search_youtube, query,
+                        priority=priority, guild_id=ctx.guild.id
+                    )
+                except ExtractionCancelled:
+                    raise
+                except Exception as e:
+                    print(f"Error resolving batch entry '{query}': {e}")
+                    info = None
+                return index, info
+        
+        # Searches start right away, the voice handshake and the progress message overlap with them
+        tasks = [asyncio.create_task(resolve(index, query)) for index, query in enumerate(queries)]
+        connect_task = asyncio.create_task(self._connect_voice(ctx))
+        progress_msg = await ctx.send(embed=progress_embed())
+        
+        try:
+            await connect_task
+        except Exception as e:
+            for task in tasks:
+                task.cancel()
+            embed = MusicUtils.create_music_embed(
+                "❌ Грешка",
+                f"Не мога да се свържа с гласовия канал: {str(e)}",
+                Config.COLOR_ERROR
+            )
+            await progress_msg.edit(embed=embed)
+            return 0
+        
+        resolved: Dict[int, Optional[Dict[str, Any]]] = {}
+        next_index = 0
+        added = 0
+        last_edit = time.monotonic()
+        
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, info = await next_done
+                resolved[index] = info
+                
+                # Commit in query order, starting playback as soon as the head is queued
+                while next_index in resolved:
+                    info = resolved.pop(next_index)
+                    if not info or self.downloader.is_playlist(info) or not info.get('url'):
+                        statuses[next_index] = "❌"
+                    elif (info.get('duration') or 0) > Config.MAX_SONG_LENGTH:
+                        statuses[next_index] = "⏭️"
+                    elif len(player.queue) >= Config.MAX_QUEUE_SIZE:
+                        statuses[next_index] = "🚫"
+                    else:
+                        await player.add_to_queue(self._build_song_data(info, ctx.author))
+                        statuses[next_index] = "✅"
+                        added += 1
+                        if not player.is_playing:
+                            await player.play_next()
+                    next_index += 1
+                
+                # Keep progress edits to about one per second
+                if time.monotonic() - last_edit >= 1.0 and next_index < len(queries):
+                    last_edit = time.monotonic()
+                    await progress_msg.edit(embed=progress_embed())
+        
+        except ExtractionCancelled:
+            for task in tasks:
+                task.cancel()
+            await progress_msg.edit(embed=progress_embed("⏹️ Добавянето беше отменено"))
+            return added
+        
+        await progress_msg.edit(embed=progress_embed(f"✅ Добавени: {added}/{len(queries)} песни"))
+        return added
+    
+    async def _handle_single_song(self, ctx, song_info, search_msg, player, trace: Optional[StageTrace] = None):
         """Handle adding a single song to the queue"""
         print(f"_handle_single_song called for: {song_info.get('title', 'Unknown')}")  # Debug logging
         
@@ -791,15 +1809,7 @@ class Music(commands.Cog):
             return
         
         # Prepare song info
-        song_data = {
-            'title': song_info['title'],
-            'url': song_info['url'],
-            'original_url': song_info.get('webpage_url', song_info['url']),  # Store original YouTube URL
-            'duration': song_info.get('duration', 0),
-            'uploader': song_info.get('uploader', 'Unknown'),
-            'thumbnail': song_info.get('thumbnail'),
-            'requester': ctx.author
-        }
+        song_data = self._build_song_data(song_info, ctx.author)
         
         print(f"Adding song to queue: {song_data['title']}")  # Debug logging
         
@@ -810,15 +1820,16 @@ class Music(commands.Cog):
         if not player.is_playing:
             print("Player not playing, starting playback")  # Debug logging
             try:
-                await player.play_next()
+                await player.play_next(trace=trace)
                 print("play_next completed successfully")  # Debug logging
                 
                 # Check if playback actually started
                 if player.is_playing:
                     print("Playback started, updating message with now playing")  # Debug logging
-                    embed = MusicUtils.create_now_playing_embed(song_data)
-                    view = MusicButtonHandler(self.bot)
+                    embed = MusicUtils.create_now_playing_embed(song_data, player.get_position())
+                    view = self.bot.music_controls
                     await search_msg.edit(embed=embed, view=view)
+                    self._track_now_playing(player, search_msg)
                 else:
                     print("Playback failed to start")  # Debug logging
                     embed = MusicUtils.create_music_embed(
@@ -845,6 +1856,93 @@ class Music(commands.Cog):
             )
             await search_msg.edit(embed=embed)
     
+    async def _import_playlist(self, ctx, url: str, status_msg, player):
+        """Queue a playlist from flat pages as they arrive, stopping once the queue is full"""
+        page_size = Config.PLAYLIST_PAGE_SIZE
+        title = None
+        start = 1
+        added = skipped = 0
+        truncated = False
+        failed_page = None
+        
+        while True:
+            if len(player.queue) >= Config.MAX_QUEUE_SIZE:
+                truncated = True
+                break
+            try:
+                page = await player.jobs.run(
+                    self.downloader.extract_playlist_page, url, start, page_size,
+                    priority=Priority.BULK, guild_id=ctx.guild.id
+                )
+            except ExtractionCancelled:
+                raise
+            except Exception as e:
+                if not added:
+                    raise
+                # Songs from earlier pages are already queued and playing, keep them and report where it stopped
+                print(f"Error loading playlist page {start // page_size + 1}: {e}")
+                failed_page = start // page_size + 1
+                break
+            if not page:
+                break
+            title = title or page.get('title')
+            entries = page.get('entries') or []
+            
+            for entry in entries:
+                song_data = self._build_flat_song_data(entry, ctx.author) if entry else None
+                if song_data is None or song_data['duration'] > Config.MAX_SONG_LENGTH:
+                    skipped += 1
+                    continue
+                if len(player.queue) >= Config.MAX_QUEUE_SIZE:
+                    truncated = True
+                    break
+                await player.add_to_queue(song_data)
+                added += 1
+            
+            # Start on the first page, later entries keep arriving while it plays
+            if added and not player.is_playing:
+                await player.play_next()
+            else:
+                player.prefetch_upcoming()
+            
+            if truncated or len(entries) < page_size:
+                break
+            start += page_size
+            
+            embed = MusicUtils.create_music_embed(
+                "🔄 Зареждане на плейлист...",
+                f"**{title or url}**\n"
+                f"✅ Добавени: {added} песни • ⏭️ Прескочени: {skipped}\n"
+                f"📄 Зареждам страница {start // page_size + 1}...",
+                Config.COLOR_WARNING
+            )
+            await status_msg.edit(embed=embed)
+        
+        if not added:
+            embed = MusicUtils.create_music_embed(
+                "❌ Не мога да заредя плейлиста",
+                "Плейлистът е празен, недостъпен или опашката е пълна",
+                Config.COLOR_ERROR
+            )
+            await status_msg.edit(embed=embed)
+            return
+        
+        description = (
+            f"**{title or url}**\n"
+            f"✅ Добавени: {added} песни\n"
+            f"⏭️ Прескочени: {skipped} песни (твърде дълги или недостъпни)"
+        )
+        if truncated:
+            description += f"\n⚠️ Спрях при пълна опашка ({Config.MAX_QUEUE_SIZE} песни)"
+        if failed_page:
+            description += f"\n⚠️ Спрях на страница {failed_page}: останалата част от плейлиста не можа да се зареди"
+        embed = MusicUtils.create_music_embed(
+            "📋 Плейлист добавен частично" if failed_page else "📋 Плейлист добавен",
+            description,
+            Config.COLOR_WARNING if failed_page else Config.COLOR_SUCCESS
+        )
+        await status_msg.edit(embed=embed)
+    
     async def _handle_playlist(self, ctx, playlist_info, search_msg, player):
         """Handle adding a playlist to the queue"""
         entries = playlist_info.get('entries', [])
@@ -868,16 +1966,7 @@ class Music(commands.Cog):
                 skipped_songs += 1
                 continue
             
-            song_data = {
-                'title': entry['title'],
-                'url': entry['url'],
-                'original_url': entry.get('webpage_url', entry['url']),  # Store original YouTube URL
-                'duration': entry.get('duration', 0),
-                'uploader': entry.get('uploader', 'Unknown'),
-                'thumbnail': entry.get('thumbnail'),
-                'requester': ctx.author
-            }
-            valid_songs.append(song_data)
+            valid_songs.append(self._build_song_data(entry, ctx.author))
         
         # Check if we have valid songs
         if not valid_songs:
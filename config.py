@@ -10,6 +10,21 @@ class Config:
     # Bot Configuration
     BOT_TOKEN = os.getenv('BOT_TOKEN')
     BOT_PREFIX = os.getenv('BOT_PREFIX', '!')
+    # Prefix commands need the privileged message content intent; slash commands work without it
+    MESSAGE_CONTENT_INTENT = os.getenv('MESSAGE_CONTENT_INTENT', 'True').lower() == 'true'
+    
+    # Lean gateway: cache only voice members, skip chunking, keep a small message cache
+    LEAN_GATEWAY = os.getenv('LEAN_GATEWAY', 'False').lower() == 'true'
+    LEAN_MESSAGE_CACHE_SIZE = int(os.getenv('LEAN_MESSAGE_CACHE_SIZE', '100'))  # 0 disables the message cache
+    
+    # Voice idle handling
+    VOICE_ALONE_TIMEOUT = int(os.getenv('VOICE_ALONE_TIMEOUT', '120'))  # seconds alone in a channel before leaving
+    VOICE_IDLE_TIMEOUT = int(os.getenv('VOICE_IDLE_TIMEOUT', '300'))  # seconds with an empty queue before leaving
+    
+    # Sharding and clustering
+    SHARD_COUNT = int(os.getenv('SHARD_COUNT', '0')) or None  # None lets Discord recommend a shard count
+    CLUSTER_COUNT = int(os.getenv('CLUSTER_COUNT', '1'))  # Processes, each running a range of shards
+    CLUSTER_STATS_INTERVAL = int(os.getenv('CLUSTER_STATS_INTERVAL', '30'))  # seconds between stats reports
     
     # Music settings
     MAX_QUEUE_SIZE = 100
@@ -17,6 +32,61 @@ class Config:
     DEFAULT_VOLUME = 0.5  # 50%
     MAX_VOLUME = 100  # Maximum volume percentage
     
+    # Persistence settings
+    DATA_DIR = os.getenv('DATA_DIR', 'data')
+    DATA_DB_PATH = os.getenv('DATA_DB_PATH', os.path.join(DATA_DIR, 'banketnika.db'))
+    JOURNAL_CHECKPOINT_INTERVAL = int(os.getenv('JOURNAL_CHECKPOINT_INTERVAL', '10'))  # seconds
+    JOURNAL_COMPACT_INTERVAL = int(os.getenv('JOURNAL_COMPACT_INTERVAL', '300'))  # seconds
+    RESTORE_ON_STARTUP = os.getenv('RESTORE_ON_STARTUP', 'True').lower() == 'true'
+    
+    # Extraction settings
+    MAX_CONCURRENT_DOWNLOADS = int(os.getenv('MAX_CONCURRENT_DOWNLOADS', '3'))  # yt-dlp worker threads
+    BATCH_RESOLVE_CONCURRENCY = int(os.getenv('BATCH_RESOLVE_CONCURRENCY', '3'))  # Parallel searches per batch
+    PREFETCH_AHEAD = int(os.getenv('PREFETCH_AHEAD', '2'))  # Upcoming queue entries resolved in the background
+    PLAYLIST_PAGE_SIZE = int(os.getenv('PLAYLIST_PAGE_SIZE', '50'))  # Flat entries fetched per playlist page
+    EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', '0'))  # yt-dlp worker processes, 0 runs it in the bot process
+    EXTRACTION_WORKER_TIMEOUT = int(os.getenv('EXTRACTION_WORKER_TIMEOUT', '300'))  # seconds before a hung worker is replaced
+    
+    # Audio sending
+    AUDIO_SEND_LOOP = os.getenv('AUDIO_SEND_LOOP', 'True').lower() == 'true'  # One send thread for all guilds
+    AUDIO_SLOW_READ_MS = float(os.getenv('AUDIO_SLOW_READ_MS', '5'))  # Source reads slower than this are counted
+    AUDIO_BUFFER_MS = int(os.getenv('AUDIO_BUFFER_MS', '200'))  # Audio read ahead per connection for the send loop
+    AUDIO_READER_THREADS = int(os.getenv('AUDIO_READER_THREADS', '4'))  # Threads reading audio sources for all guilds
+    
+    # Live now-playing messages
+    NOW_PLAYING_UPDATE_INTERVAL = int(os.getenv('NOW_PLAYING_UPDATE_INTERVAL', '10'))  # seconds between progress edits
+    MESSAGE_EDITS_PER_SECOND = float(os.getenv('MESSAGE_EDITS_PER_SECOND', '2'))  # Edits sent across all guilds
+    
+    # Keyword replies (per channel: a burst of replies, then one per cooldown)
+    KEYWORD_REPLY_COOLDOWN = float(os.getenv('KEYWORD_REPLY_COOLDOWN', '60'))  # seconds to earn another reply
+    KEYWORD_REPLY_BURST = int(os.getenv('KEYWORD_REPLY_BURST', '2'))  # Replies a quiet channel can get in a row
+    
+    # Cache settings
+    TRACK_CACHE_SIZE = int(os.getenv('TRACK_CACHE_SIZE', '1000'))  # Cached search results
+    TRACK_CACHE_TTL = int(os.getenv('TRACK_CACHE_TTL', '3600'))  # seconds, when the stream URL has no expiry
+    PREWARM_INTERVAL = int(os.getenv('PREWARM_INTERVAL', '3600'))  # seconds between repertoire warm-ups
+    POPULAR_WARM_INTERVAL = int(os.getenv('POPULAR_WARM_INTERVAL', '1800'))  # seconds between popularity warm-ups
+    POPULAR_WARM_TOP_N = int(os.getenv('POPULAR_WARM_TOP_N', '200'))  # Most played tracks to keep warm
+    POPULAR_WARM_BUDGET = int(os.getenv('POPULAR_WARM_BUDGET', '50'))  # Upstream requests per warm-up run
+    POPULAR_WARM_MODE = os.getenv('POPULAR_WARM_MODE', 'stream')  # 'stream' refreshes URLs, 'download' saves audio
+    OFFPEAK_HOURS = os.getenv('OFFPEAK_HOURS', '3-9')  # Local hours (start-end) when warming may run
+    AUDIO_CACHE_DIR = os.getenv('AUDIO_CACHE_DIR', os.path.join(DATA_DIR, 'audio'))
+    AUDIO_CACHE_MAX_MB = int(os.getenv('AUDIO_CACHE_MAX_MB', '2048'))  # Downloaded audio kept on disk
+    AUDIO_CACHE_MAX_AGE = int(os.getenv('AUDIO_CACHE_MAX_AGE', '2592000'))  # seconds since a downloaded track was last played
+    TRACK_INDEX_MIN_CONFIDENCE = float(os.getenv('TRACK_INDEX_MIN_CONFIDENCE', '0.8'))  # 0-1, index match needed to skip search
+    
+    # Local music library (comma-separated directories, searched before YouTube)
+    LOCAL_MUSIC_DIRS = [d.strip() for d in os.getenv('LOCAL_MUSIC_DIRS', '').split(',') if d.strip()]
+    LOCAL_LIBRARY_SCAN_INTERVAL = int(os.getenv('LOCAL_LIBRARY_SCAN_INTERVAL', '300'))  # seconds between rescans
+    LOCAL_LIBRARY_MIN_CONFIDENCE = float(os.getenv('LOCAL_LIBRARY_MIN_CONFIDENCE', '0.8'))  # 0-1, match needed to play a local file
+    
+    # Negative cache settings (private and removed videos are remembered until restart)
+    NEGATIVE_CACHE_SIZE = int(os.getenv('NEGATIVE_CACHE_SIZE', '2000'))  # Remembered failed lookups
+    NEGATIVE_NOT_FOUND_TTL = int(os.getenv('NEGATIVE_NOT_FOUND_TTL', '1800'))  # seconds, searches with no results
+    NEGATIVE_UPCOMING_TTL = int(os.getenv('NEGATIVE_UPCOMING_TTL', '600'))  # seconds, premieres and scheduled streams
+    NEGATIVE_BLOCKED_TTL = int(os.getenv('NEGATIVE_BLOCKED_TTL', '120'))  # seconds, bot detection and rate limits
+    NEGATIVE_ERROR_TTL = int(os.getenv('NEGATIVE_ERROR_TTL', '60'))  # seconds, other failures
+    
     # Bot settings
     BOT_NAME = "Banketnika"
     BOT_DESCRIPTION = "Advanced Bulgarian Music Bot for Discord - Bringing the banket spirit to your server!"
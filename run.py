@@ -10,6 +10,7 @@ This script provides a user-friendly way to start the bot with:
 - Proper error handling and user feedback
 """
 
+import argparse
 import os
 import sys
 import subprocess
@@ -90,8 +91,38 @@ def check_env_file():
     print("✅ Configuration file is ready!")
     return True
 
+def parse_args():
+    """Command line options, defaulting to the values from .env"""
+    from config import Config
+    parser = argparse.ArgumentParser(description="Start Banketnika, optionally as several shard clusters")
+    parser.add_argument('--shards', type=int, default=Config.SHARD_COUNT or 0,
+                        help="total gateway shards (0 = Discord's recommendation)")
+    parser.add_argument('--clusters', type=int, default=Config.CLUSTER_COUNT,
+                        help="worker processes to split the shards across (1 = run in this process)")
+    return parser.parse_args()
+
+def run_clusters(cluster_count, shard_count):
+    """Run the bot as supervised worker processes, each owning a range of shards"""
+    import asyncio
+    import logging
+    from config import Config
+    from utils.cluster import ClusterSupervisor, fetch_recommended_shards
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if not shard_count:
+        shard_count = asyncio.run(fetch_recommended_shards(Config.BOT_TOKEN))
+        print(f"📡 Discord recommends {shard_count} shards")
+    # Every cluster needs at least one shard
+    shard_count = max(shard_count, cluster_count)
+    
+    supervisor = ClusterSupervisor(cluster_count, shard_count, Config.DATA_DIR)
+    print(f"🧩 Starting {len(supervisor.ranges)} clusters over {shard_count} shards")
+    supervisor.run(stats_interval=Config.CLUSTER_STATS_INTERVAL)
+
 def main():
     """Main startup function"""
+    args = parse_args()
+    
     print("🎵 Starting Banketnika Discord Bot...")
     print(f"   Version {BOT_VERSION} - {BOT_CODENAME}")
     print("   Advanced Bulgarian Music Bot with YT-DLP & Enhanced Bot Detection Evasion")
@@ -120,9 +151,14 @@ def main():
     
     # Import and run the bot
     try:
+        if args.clusters > 1:
+            run_clusters(args.clusters, args.shards)
+            print("👋 All clusters stopped. Довиждане!")
+            return
+        
         from bot import main as bot_main
         import asyncio
-        asyncio.run(bot_main())
+        asyncio.run(bot_main(shard_count=args.shards or None))
     except KeyboardInterrupt:
         print("\n")
         print("=" * 70)
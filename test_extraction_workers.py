@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test script for the extraction worker protocol, in process and with spawned workers
+"""
+import sys
+from utils.extraction_workers import ExtractionWorkers
+
+def check_pool(name: str, workers: ExtractionWorkers) -> bool:
+    """Send the same requests through a pool and report whether every reply is as expected"""
+    print(f"\n{name}")
+    print("-" * 30)
+    passed = True
+    transport = workers.transports[0]
+    
+    reply = transport.request({'op': 'ping'}, timeout=10)
+    ok = reply.get('ok') is True and isinstance(reply.get('data'), int)
+    print(f"{'✅' if ok else '❌'} ping -> pid {reply.get('data')}")
+    passed &= ok
+    
+    reply = transport.request({'op': 'dance'}, timeout=10)
+    ok = reply.get('ok') is False and 'Unknown operation' in (reply.get('error') or '')
+    print(f"{'✅' if ok else '❌'} unknown op -> {reply.get('error')}")
+    passed &= ok
+    
+    # An invalid URL fails inside yt-dlp without touching the network; the error must come back, not crash the worker
+    try:
+        workers.extract('not-a-url', {'quiet': True, 'no_warnings': True})
+        print("❌ invalid URL -> no error raised")
+        passed = False
+    except Exception as e:
+        print(f"✅ invalid URL -> {str(e)[:80]}")
+    
+    stats = workers.stats()
+    ok = stats['alive'] == stats['workers'] and stats['busy'] == 0 and stats['crashes'] == 0
+    print(f"{'✅' if ok else '❌'} stats -> {stats}")
+    passed &= ok
+    return passed
+
+def test_extraction_workers():
+    """Check the in-process stand-in, and real worker processes with --process"""
+    print("Testing extraction worker protocol...")
+    print("=" * 50)
+    
+    passed = check_pool("In-process stand-in", ExtractionWorkers.local())
+    
+    if '--process' in sys.argv:
+        workers = ExtractionWorkers.spawn(1, timeout=60)
+        try:
+            passed &= check_pool("Worker process", workers)
+        finally:
+            workers.close()
+    
+    print("\n" + "=" * 50)
+    print("Extraction worker test " + ("passed." if passed else "FAILED."))
+    return passed
+
+if __name__ == "__main__":
+    sys.exit(0 if test_extraction_workers() else 1)
@@ -7,6 +7,7 @@ import asyncio
 import discord
 import aiohttp
 import io
+import os
 from typing import Optional, AsyncGenerator
 from config import Config
 
@@ -49,16 +50,59 @@ class DirectAudioSource(discord.AudioSource):
             asyncio.create_task(self.session.close())
         self.connected = False
 
+class FrameCountingSource(discord.AudioSource):
+    """Wraps an audio source and counts the 20 ms frames handed to the voice client, an exact playback clock"""
+    
+    FRAME_SECONDS = 0.02
+    
+    def __init__(self, source: discord.AudioSource, start_at: float = 0.0):
+        self.source = source
+        self.start_at = start_at
+        self.frames = 0
+    
+    @property
+    def position(self) -> float:
+        """Seconds into the track, including the initial seek"""
+        return self.start_at + self.frames * self.FRAME_SECONDS
+    
+    @property
+    def volume(self) -> Optional[float]:
+        """Volume of the wrapped source, if it has one"""
+        return getattr(self.source, 'volume', None)
+    
+    @volume.setter
+    def volume(self, value: float):
+        if hasattr(self.source, 'volume'):
+            self.source.volume = value
+    
+    def read(self) -> bytes:
+        data = self.source.read()
+        if data:
+            self.frames += 1
+        return data
+    
+    def is_opus(self) -> bool:
+        return self.source.is_opus()
+    
+    def cleanup(self):
+        self.source.cleanup()
+
 class SimpleAudioPlayer:
     """Simple audio player using basic HTTP streaming"""
     
     def __init__(self):
         self.current_source: Optional[DirectAudioSource] = None
         
-    async def create_source(self, url: str) -> discord.AudioSource:
-        """Create an audio source from URL"""
+    async def create_source(self, url: str, start_at: float = 0) -> discord.AudioSource:
+        """Create an audio source from URL, optionally seeking to start_at seconds"""
         print(f"Creating simple audio source for: {url}")
         
+        # Reconnect options only apply to network streams, local files don't accept them
+        before_options = '' if os.path.isfile(url) else '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5'
+        if start_at > 0:
+            # Input seeking keeps resume after restart cheap
+            before_options = f"-ss {start_at:.2f} {before_options}".strip()
+        
         try:
             # For WebM/Opus streams, we can try to use them more directly
             if 'mime=audio%2Fwebm' in url or 'mime=audio/webm' in url:
@@ -66,7 +110,7 @@ class SimpleAudioPlayer:
                 # Use a very basic FFmpeg command for WebM
                 return discord.FFmpegOpusAudio(
                     url,
-                    before_options='-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5',
+                    before_options=before_options,
                     options='-vn'
                 )
             else:
@@ -74,7 +118,7 @@ class SimpleAudioPlayer:
                 print("Using PCM audio source")
                 source = discord.FFmpegPCMAudio(
                     url,
-                    before_options='-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5',
+                    before_options=before_options,
                     options='-vn'
                 )
                 return discord.PCMVolumeTransformer(source, volume=0.3)
@@ -0,0 +1,66 @@
+import logging
+import os
+import time
+from typing import Optional, List
+
+logger = logging.getLogger(__name__)
+
+class AudioCache:
+    """Downloaded audio files kept under a size and age limit, evicting the least recently played first"""
+
+    _shared: Optional['AudioCache'] = None
+
+    def __init__(self, directory: str, max_bytes: int, max_age: float):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.evicted = 0
+
+    @classmethod
+    def shared(cls) -> 'AudioCache':
+        """Get the process-wide audio cache"""
+        if cls._shared is None:
+            from config import Config
+            cls._shared = cls(Config.AUDIO_CACHE_DIR, Config.AUDIO_CACHE_MAX_MB * 1024 * 1024, Config.AUDIO_CACHE_MAX_AGE)
+        return cls._shared
+
+    @staticmethod
+    def track_id(filename: str) -> str:
+        """Track id of a downloaded file, which is saved as <id>.<ext>"""
+        return filename.split('.', 1)[0]
+
+    def trim(self) -> List[str]:
+        """Delete files older than the age limit, then the least recently played until under the size limit;
+        returns the track ids whose files were removed"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+
+        files = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            # Playing a cached track touches its file, so mtime is the last time it was used
+            files.append((stat.st_mtime, stat.st_size, name, path))
+        files.sort()
+
+        total = sum(size for _, size, _, _ in files)
+        cutoff = time.time() - self.max_age
+        removed = []
+        for mtime, size, name, path in files:
+            if mtime >= cutoff and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not evict cached audio {path}: {e}")
+                continue
+            total -= size
+            removed.append(self.track_id(name))
+
+        self.evicted += len(removed)
+        return removed
@@ -0,0 +1,357 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Callable
+import discord
+from discord import opus
+from discord.player import AudioSource
+from discord.gateway import SpeakingState
+
+logger = logging.getLogger(__name__)
+
+# Opus frame of silence, sent when a stream pauses or ends so clients don't interpolate
+OPUS_SILENCE = b'\xf8\xff\xfe'
+
+class MultiplexedStream:
+    """Stands in for discord.py's per-connection AudioPlayer thread; the shared send loop sends its frames"""
+
+    def __init__(self, source: AudioSource, client: discord.VoiceClient,
+                 after: Optional[Callable[[Optional[Exception]], Any]] = None,
+                 buffer_frames: int = 10, slow_read: float = 0.005,
+                 submit: Optional[Callable[[Callable[[], None]], Any]] = None):
+        self.source = source
+        self.client = client
+        self.after = after
+        self.guild_id = client.guild.id if client.guild else None
+        self.buffer_frames = buffer_frames
+        # Refill once half the buffer is used, so a reader wakes every few frames rather than every tick
+        self.low_water = buffer_frames // 2
+        self.slow_read = slow_read
+        self._submit = submit
+        self._lock = threading.Lock()
+        # Encoded frames read ahead by the reader pool; None marks the end of the source
+        self._frames: deque = deque()
+        # At most one fill per stream is queued or running, so a stalled source holds a single reader
+        self._queued = False
+        self._idle = threading.Event()
+        self._idle.set()
+        self._exhausted = False
+        self._ended = False
+        self._paused = False
+        self._silence_pending = 0
+        self._disconnected_since: Optional[float] = None
+        self.error: Optional[Exception] = None
+
+        # Per-guild timing
+        self.frames = 0
+        self.reads = 0
+        self.slow_reads = 0
+        self.underruns = 0
+        self.read_total = 0.0
+        self.read_max = 0.0
+
+    # AudioPlayer interface used by VoiceClient
+
+    def stop(self) -> None:
+        self._ended = True
+        self._speak(SpeakingState.none)
+
+    def pause(self, *, update_speaking: bool = True) -> None:
+        self._paused = True
+        self._silence_pending = 5
+        if update_speaking:
+            self._speak(SpeakingState.none)
+
+    def resume(self, *, update_speaking: bool = True) -> None:
+        self._paused = False
+        if update_speaking:
+            self._speak(SpeakingState.voice)
+
+    def is_playing(self) -> bool:
+        return not self._paused and not self._ended
+
+    def is_paused(self) -> bool:
+        return not self._ended and self._paused
+
+    def set_source(self, source: AudioSource) -> None:
+        with self._lock:
+            self.source = source
+            self._frames.clear()
+            self._exhausted = False
+        self.request_fill()
+
+    def _speak(self, speaking: SpeakingState) -> None:
+        try:
+            asyncio.run_coroutine_threadsafe(self.client.ws.speak(speaking), self.client.client.loop)
+        except Exception:
+            logger.exception("Speaking call in multiplexed player failed")
+
+    # Reader pool: the only place the source is read, so a stalled source only delays its own guild
+
+    def start(self) -> None:
+        """Start reading ahead from the source"""
+        self.request_fill()
+
+    def request_fill(self) -> None:
+        """Queue a read-ahead on the reader pool unless one is already queued or running"""
+        with self._lock:
+            if self._queued or self._ended or self._exhausted:
+                return
+            self._queued = True
+            self._idle.clear()
+        self._submit(self.fill)
+
+    def fill(self) -> None:
+        """Read until the buffer is full or the source ends, on a reader pool thread"""
+        try:
+            encoder = self.client.encoder
+            while not self._ended and len(self._frames) < self.buffer_frames:
+                # Read outside the lock so set_source never waits on a stalled source
+                source = self.source
+                started = time.perf_counter()
+                data = source.read()
+                elapsed = time.perf_counter() - started
+                if data and not source.is_opus():
+                    # Encode here too, the send loop only packs and sends
+                    data = encoder.encode(data, encoder.SAMPLES_PER_FRAME)
+                with self._lock:
+                    if source is not self.source:
+                        continue  # Replaced while reading, this frame belongs to the old source
+                    self._frames.append(data or None)
+                    if not data:
+                        self._exhausted = True
+
+                self.reads += 1
+                self.read_total += elapsed
+                self.read_max = max(self.read_max, elapsed)
+                if elapsed > self.slow_read:
+                    self.slow_reads += 1
+                if not data:
+                    return
+        except Exception as e:
+            if not self._ended:
+                self.error = e
+                with self._lock:
+                    self._frames.append(None)
+                    self._exhausted = True
+            return
+        finally:
+            with self._lock:
+                self._queued = False
+            self._idle.set()
+
+        # The send loop may have drained frames after its own request was skipped because this fill was queued
+        if len(self._frames) <= self.low_water:
+            self.request_fill()
+
+    # Driven by the send loop, never blocks
+
+    def step(self) -> bool:
+        """Send this tick's frame if one is buffered, returns False once the stream is finished"""
+        if self._ended:
+            return False
+
+        client = self.client
+        if self._paused:
+            if self._silence_pending and client.is_connected():
+                self._silence_pending -= 1
+                client.send_audio_packet(OPUS_SILENCE, encode=False)
+            return True
+
+        if not client.is_connected():
+            # Wait for a reconnect like AudioPlayer does, but without holding up other guilds
+            if self._disconnected_since is None:
+                self._disconnected_since = time.monotonic()
+            elif time.monotonic() - self._disconnected_since > client.timeout:
+                logger.debug(f"Voice in guild {self.guild_id} did not reconnect, aborting playback")
+                self._ended = True
+                return False
+            return True
+        if self._disconnected_since is not None:
+            self._disconnected_since = None
+            self._speak(SpeakingState.voice)
+
+        try:
+            data = self._frames.popleft()
+        except IndexError:
+            # The reader is behind (slow source, network stall), skip this guild for one tick
+            self.underruns += 1
+            self.request_fill()
+            return True
+        if len(self._frames) <= self.low_water:
+            self.request_fill()
+
+        if data is None:
+            if self.error:
+                raise self.error
+            self.stop()
+            return False
+
+        client.send_audio_packet(data, encode=False)
+        self.frames += 1
+        return True
+
+    def finish(self) -> None:
+        """Run the after callback and release the source, like AudioPlayer does when its thread ends"""
+        self._ended = True
+        if self.client.is_connected():
+            for _ in range(5):
+                try:
+                    self.client.send_audio_packet(OPUS_SILENCE, encode=False)
+                except Exception:
+                    break
+        try:
+            if self.after is not None:
+                try:
+                    self.after(self.error)
+                except Exception:
+                    logger.exception("Calling the after function failed")
+            elif self.error:
+                logger.error(f"Error in multiplexed audio for guild {self.guild_id}: {self.error}")
+        finally:
+            # Kills FFmpeg, which also unblocks a reader stuck in read()
+            self.source.cleanup()
+            self._idle.wait(5)
+
+    def stats(self) -> Dict[str, Any]:
+        """Frames sent, buffer underruns and source read timings"""
+        return {
+            'frames': self.frames,
+            'paused': self._paused,
+            'buffered': len(self._frames),
+            'underruns': self.underruns,
+            'slow_reads': self.slow_reads,
+            'avg_read_ms': self.read_total / self.reads * 1000 if self.reads else 0.0,
+            'max_read_ms': self.read_max * 1000,
+        }
+
+class AudioSendLoop:
+    """One thread that sends the next buffered frame of every playing voice connection on a shared 20 ms tick,
+    fed by a fixed pool of reader threads"""
+
+    DELAY = opus.Encoder.FRAME_LENGTH / 1000.0
+
+    _shared: Optional['AudioSendLoop'] = None
+
+    def __init__(self, slow_read_ms: float = 5.0, buffer_frames: int = 10, resync_after_ms: float = 200.0,
+                 reader_threads: int = 4):
+        self.slow_read = slow_read_ms / 1000.0
+        self.buffer_frames = buffer_frames
+        self.reader_threads = reader_threads
+        self.resync_after = resync_after_ms / 1000.0
+        self._streams: List[MultiplexedStream] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Cleanup kills FFmpeg and waits for it, that must not stall the tick
+        self._finalizer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='audio-finish')
+        # Source reads for every stream; as many threads as sources that may stall at once, not one per guild
+        self._readers = ThreadPoolExecutor(max_workers=reader_threads, thread_name_prefix='audio-reader')
+
+        self.ticks = 0
+        self.late_ticks = 0
+        self.resyncs = 0
+        self.max_lateness = 0.0
+        self.max_tick_work = 0.0
+
+    @classmethod
+    def shared(cls) -> 'AudioSendLoop':
+        """Get the process-wide send loop"""
+        if cls._shared is None:
+            from config import Config
+            cls._shared = cls(Config.AUDIO_SLOW_READ_MS, max(1, Config.AUDIO_BUFFER_MS // 20),
+                              reader_threads=max(1, Config.AUDIO_READER_THREADS))
+        return cls._shared
+
+    def play(self, client: discord.VoiceClient, source: AudioSource,
+             after: Optional[Callable[[Optional[Exception]], Any]] = None) -> None:
+        """Same contract as VoiceClient.play, but frames are sent by the shared loop instead of a new thread"""
+        if not client.is_connected():
+            raise discord.ClientException('Not connected to voice.')
+        if client.is_playing():
+            raise discord.ClientException('Already playing audio.')
+        if not isinstance(source, AudioSource):
+            raise TypeError(f'source must be an AudioSource not {source.__class__.__name__}')
+
+        if not source.is_opus():
+            client.encoder = opus.Encoder()
+
+        stream = MultiplexedStream(source, client, after, self.buffer_frames, self.slow_read, self._readers.submit)
+        client._player = stream
+        stream.start()
+        stream._speak(SpeakingState.voice)
+        with self._lock:
+            self._streams.append(stream)
+        self._ensure_running()
+        self._wakeup.set()
+
+    def _ensure_running(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='audio-send-loop', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        start = time.perf_counter()
+        tick = 0
+        while True:
+            with self._lock:
+                streams = list(self._streams)
+            if not streams:
+                # Nothing to send, sleep until something plays instead of waking every 20 ms
+                self._wakeup.wait()
+                self._wakeup.clear()
+                start, tick = time.perf_counter(), 0
+                continue
+
+            tick_started = time.perf_counter()
+            finished = []
+            for stream in streams:
+                try:
+                    if not stream.step():
+                        finished.append(stream)
+                except Exception as e:
+                    stream.error = e
+                    stream.stop()
+                    finished.append(stream)
+
+            if finished:
+                with self._lock:
+                    for stream in finished:
+                        self._streams.remove(stream)
+                        self._finalizer.submit(stream.finish)
+
+            now = time.perf_counter()
+            self.max_tick_work = max(self.max_tick_work, now - tick_started)
+            self.ticks += 1
+            tick += 1
+
+            # Aim every tick at start + n * 20 ms so timing errors don't accumulate
+            next_time = start + self.DELAY * tick
+            lateness = now - next_time
+            if lateness > 0:
+                self.late_ticks += 1
+                self.max_lateness = max(self.max_lateness, lateness)
+                if lateness > self.resync_after:
+                    # Too far behind to catch up by sending faster, start a new schedule from now
+                    self.resyncs += 1
+                    start, tick = now, 0
+                continue
+            time.sleep(-lateness)
+
+    def stats(self) -> Dict[str, Any]:
+        """Loop timing and per-guild stream stats"""
+        with self._lock:
+            streams = list(self._streams)
+        return {
+            'streams': len(streams),
+            'reader_threads': self.reader_threads,
+            'ticks': self.ticks,
+            'late_ticks': self.late_ticks,
+            'resyncs': self.resyncs,
+            'max_lateness_ms': self.max_lateness * 1000,
+            'max_tick_work_ms': self.max_tick_work * 1000,
+            'guilds': {stream.guild_id: stream.stats() for stream in streams},
+        }
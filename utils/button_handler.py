@@ -2,12 +2,13 @@ import discord
 from discord.ext import commands
 from typing import Optional, Dict, Any
 from utils.music_utils import MusicUtils
+from utils.queue_view import QueueView
 from config import Config
 
 class MusicButtonHandler(discord.ui.View):
-    """Handle Discord button interactions for music controls"""
+    """Music control buttons, one persistent instance shared by every message and routed by custom_id and guild"""
     
-    def __init__(self, bot, timeout: float = 300):
+    def __init__(self, bot, timeout: Optional[float] = None):
         super().__init__(timeout=timeout)
         self.bot = bot
     
@@ -147,9 +148,9 @@ class MusicButtonHandler(discord.ui.View):
             await interaction.followup.send("❌ Няма активен плейър", ephemeral=True)
             return
         
-        embed = MusicUtils.create_queue_embed(list(player.queue), player.current_song)
-        view = MusicButtonHandler(self.bot)
-        await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+        queue_view = QueueView(player)
+        queue_view.message = await interaction.followup.send(embed=queue_view.create_embed(), view=queue_view,
+                                                             ephemeral=True, wait=True)
     
     @discord.ui.button(
         style=discord.ButtonStyle.secondary,
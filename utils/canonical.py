@@ -0,0 +1,144 @@
+import re
+import unicodedata
+from typing import Optional
+from urllib.parse import urlparse, parse_qs
+
+class Canonicalizer:
+    """Turns YouTube URLs and free-text queries into stable cache keys without network calls"""
+    
+    # YouTube video ids are 11 characters from this alphabet
+    VIDEO_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+    YOUTUBE_HOSTS = {
+        'youtube.com', 'www.youtube.com', 'm.youtube.com', 'music.youtube.com',
+        'youtube-nocookie.com', 'www.youtube-nocookie.com',
+    }
+    SHORT_HOSTS = {'youtu.be', 'www.youtu.be'}
+
+    # Path prefixes that are followed by a video id
+    VIDEO_PATH_PREFIXES = ('shorts', 'embed', 'live', 'v', 'e')
+
+    # Bulgarian streamlined transliteration (plus a few Russian letters seen in song titles)
+    TRANSLITERATION = {
+        'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ж': 'zh', 'з': 'z',
+        'и': 'i', 'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o', 'п': 'p',
+        'р': 'r', 'с': 's', 'т': 't', 'у': 'u', 'ф': 'f', 'х': 'h', 'ц': 'ts', 'ч': 'ch',
+        'ш': 'sh', 'щ': 'sht', 'ъ': 'a', 'ь': 'y', 'ю': 'yu', 'я': 'ya',
+        'ё': 'yo', 'ы': 'y', 'э': 'e', 'і': 'i', 'ї': 'yi', 'є': 'ye', 'ѝ': 'i',
+    }
+
+    _NON_WORD_RE = re.compile(r'[^\w]+', re.UNICODE)
+    
+    @staticmethod
+    def parse_url(query: str):
+        """Parse a query as a URL if it looks like one, adding a scheme when it is missing"""
+        text = query.strip()
+        if not text or ' ' in text:
+            return None
+        if '://' not in text:
+            if not re.match(r'^(www\.|m\.|music\.)?(youtube\.com|youtu\.be|youtube-nocookie\.com)/', text, re.IGNORECASE) \
+                    and not text.lower().startswith('www.'):
+                return None
+            text = 'https://' + text
+
+        parsed = urlparse(text)
+        if parsed.scheme not in ('http', 'https') or not parsed.netloc:
+            return None
+        return parsed
+    
+    @staticmethod
+    def is_url(query: str) -> bool:
+        """Check if the query is a URL"""
+        return Canonicalizer.parse_url(query) is not None
+    
+    @staticmethod
+    def is_youtube_url(query: str) -> bool:
+        """Check if the query is a YouTube URL"""
+        parsed = Canonicalizer.parse_url(query)
+        if not parsed:
+            return False
+        host = parsed.netloc.lower().split(':')[0]
+        return host in Canonicalizer.YOUTUBE_HOSTS or host in Canonicalizer.SHORT_HOSTS
+    
+    @staticmethod
+    def extract_video_id(query: str) -> Optional[str]:
+        """Get the video id from any YouTube URL form (watch, youtu.be, shorts, embed, live, music)"""
+        parsed = Canonicalizer.parse_url(query)
+        if not parsed:
+            return None
+
+        host = parsed.netloc.lower().split(':')[0]
+        parts = [part for part in parsed.path.split('/') if part]
+
+        candidate = None
+        if host in Canonicalizer.SHORT_HOSTS:
+            candidate = parts[0] if parts else None
+        elif host in Canonicalizer.YOUTUBE_HOSTS:
+            if parts and parts[0] == 'watch':
+                candidate = parse_qs(parsed.query).get('v', [None])[0]
+            elif len(parts) >= 2 and parts[0] in Canonicalizer.VIDEO_PATH_PREFIXES:
+                candidate = parts[1]
+            elif not parts or parts[0] in ('attribution_link',):
+                candidate = parse_qs(parsed.query).get('v', [None])[0]
+
+        if candidate and Canonicalizer.VIDEO_ID_RE.match(candidate):
+            return candidate
+        return None
+    
+    @staticmethod
+    def extract_playlist_id(query: str) -> Optional[str]:
+        """Get the playlist id from a YouTube URL, if it has one"""
+        parsed = Canonicalizer.parse_url(query)
+        if not parsed:
+            return None
+        host = parsed.netloc.lower().split(':')[0]
+        if host not in Canonicalizer.YOUTUBE_HOSTS and host not in Canonicalizer.SHORT_HOSTS:
+            return None
+
+        playlist_id = parse_qs(parsed.query).get('list', [None])[0]
+        if playlist_id and re.match(r'^[A-Za-z0-9_-]+$', playlist_id):
+            return playlist_id
+        return None
+    
+    @staticmethod
+    def canonical_video_url(video_id: str) -> str:
+        """Standard watch URL for a video id"""
+        return f"https://www.youtube.com/watch?v={video_id}"
+    
+    @staticmethod
+    def canonical_playlist_url(playlist_id: str) -> str:
+        """Standard URL for a playlist id"""
+        return f"https://www.youtube.com/playlist?list={playlist_id}"
+    
+    @staticmethod
+    def transliterate(text: str) -> str:
+        """Transliterate Cyrillic to Latin, leaving other characters untouched"""
+        return ''.join(Canonicalizer.TRANSLITERATION.get(char, char) for char in text)
+    
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Normalize free text so spelling variants of a search share one key"""
+        text = unicodedata.normalize('NFKC', query).casefold()
+        text = Canonicalizer.transliterate(text)
+        # Drop accents left over after transliteration (e.g. "é" -> "e")
+        text = ''.join(
+            char for char in unicodedata.normalize('NFKD', text)
+            if not unicodedata.combining(char)
+        )
+        return ' '.join(Canonicalizer._NON_WORD_RE.sub(' ', text).split())
+    
+    @staticmethod
+    def cache_key(query: str) -> str:
+        """Stable cache key for a query: 'yt:<id>' / 'ytpl:<id>' for YouTube URLs, normalized text otherwise"""
+        # A video link inside a playlist (watch?v=X&list=Y) plays the playlist, so it must not share the video's key
+        playlist_id = Canonicalizer.extract_playlist_id(query)
+        if playlist_id:
+            return f"ytpl:{playlist_id}"
+
+        video_id = Canonicalizer.extract_video_id(query)
+        if video_id:
+            return f"yt:{video_id}"
+
+        if Canonicalizer.is_url(query):
+            return query.strip()
+        return f"q:{Canonicalizer.normalize_query(query)}"
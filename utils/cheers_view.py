@@ -0,0 +1,16 @@
+import discord
+from typing import Optional
+
+class CheersView(discord.ui.View):
+    """🍻 button for !cheers; the first user to press it clinks glasses with the bot"""
+
+    def __init__(self, timeout: float = 30):
+        super().__init__(timeout=timeout)
+        self.user: Optional[discord.abc.User] = None
+
+    @discord.ui.button(emoji="🍻", label="Наздраве!", style=discord.ButtonStyle.success)
+    async def cheers(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Remember who pressed first, the command updates the message"""
+        self.user = interaction.user
+        self.stop()
+        await interaction.response.defer()
@@ -50,6 +50,9 @@ class CleanupManager:
         
         for guild_id, player in music_cog.players.items():
             try:
+                # Keep the persisted queue so it can be restored on the next start
+                if hasattr(player, 'detach_journal'):
+                    player.detach_journal()
                 await CleanupManager.cleanup_music_player(player)
                 logger.info(f"Cleaned up player for guild {guild_id}")
             except Exception as e:
@@ -0,0 +1,186 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import time
+from typing import Dict, Any, List
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Where the supervisor publishes the latest stats of every cluster
+STATS_FILE = 'clusters.json'
+
+def shard_ranges(shard_count: int, cluster_count: int) -> List[List[int]]:
+    """Split shard ids into contiguous, evenly sized ranges, one per cluster"""
+    cluster_count = max(1, min(cluster_count, shard_count))
+    base, extra = divmod(shard_count, cluster_count)
+    ranges, start = [], 0
+    for cluster_id in range(cluster_count):
+        size = base + (1 if cluster_id < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+async def fetch_recommended_shards(token: str) -> int:
+    """Shard count Discord recommends for the bot"""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+            'https://discord.com/api/v10/gateway/bot',
+            headers={'Authorization': f'Bot {token}'}
+        ) as response:
+            response.raise_for_status()
+            data = await response.json()
+    return int(data['shards'])
+
+def read_cluster_stats(data_dir: str) -> Dict[str, Any]:
+    """Latest per-cluster stats published by the supervisor, empty when not running clustered"""
+    try:
+        with open(os.path.join(data_dir, STATS_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def run_cluster(cluster_id: int, shard_ids: List[int], shard_count: int, stats_queue,
+                cluster_count: int = 1) -> None:
+    """Worker process entry point: run one bot instance over a range of shards"""
+    # The supervisor decides when clusters stop, a terminal Ctrl+C only reaches it
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Each cluster logs to its own file; configured before bot.py is imported so its basicConfig does nothing
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f'%(asctime)s - cluster {cluster_id} - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(f'banketnika-cluster-{cluster_id}.log'),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+    from bot import main as bot_main
+    asyncio.run(bot_main(shard_ids=shard_ids, shard_count=shard_count, cluster_id=cluster_id,
+                         stats_queue=stats_queue, cluster_count=cluster_count))
+
+class ClusterSupervisor:
+    """Runs each shard range in its own process, restarts clusters that die and gathers their stats"""
+
+    def __init__(self, cluster_count: int, shard_count: int, data_dir: str,
+                 restart_delay: float = 5, max_restart_delay: float = 300, stable_after: float = 600):
+        self.shard_count = shard_count
+        self.ranges = shard_ranges(shard_count, cluster_count)
+        self.data_dir = data_dir
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.stable_after = stable_after
+
+        self._context = multiprocessing.get_context('spawn')
+        self.stats_queue = self._context.Queue()
+        self.processes: Dict[int, multiprocessing.Process] = {}
+        self.started_at: Dict[int, float] = {}
+        self.restarts: Dict[int, int] = {cluster_id: 0 for cluster_id in range(len(self.ranges))}
+        self.backoff: Dict[int, float] = {cluster_id: restart_delay for cluster_id in range(len(self.ranges))}
+        self.restart_at: Dict[int, float] = {}
+        self.stats: Dict[int, Dict[str, Any]] = {}
+        self._stopping = False
+
+    def start_cluster(self, cluster_id: int) -> None:
+        """Spawn the worker process of a cluster"""
+        process = self._context.Process(
+            target=run_cluster,
+            args=(cluster_id, self.ranges[cluster_id], self.shard_count, self.stats_queue, len(self.ranges)),
+            name=f'banketnika-cluster-{cluster_id}',
+            daemon=False
+        )
+        process.start()
+        self.processes[cluster_id] = process
+        self.started_at[cluster_id] = time.time()
+        self.restart_at.pop(cluster_id, None)
+        logger.info(f"Started cluster {cluster_id} (pid {process.pid}) with shards "
+                    f"{self.ranges[cluster_id][0]}-{self.ranges[cluster_id][-1]} of {self.shard_count}")
+
+    def _check_clusters(self) -> None:
+        """Schedule restarts for clusters whose process exited, backing off for ones that keep crashing"""
+        now = time.time()
+        for cluster_id, process in self.processes.items():
+            if process.is_alive() or cluster_id in self.restart_at:
+                continue
+            uptime = now - self.started_at[cluster_id]
+            if uptime >= self.stable_after:
+                self.backoff[cluster_id] = self.restart_delay
+            delay = self.backoff[cluster_id]
+            self.backoff[cluster_id] = min(delay * 2, self.max_restart_delay)
+            self.restart_at[cluster_id] = now + delay
+            self.stats.pop(cluster_id, None)
+            logger.warning(f"Cluster {cluster_id} exited with code {process.exitcode} after {uptime:.0f}s, "
+                           f"restarting in {delay:.0f}s")
+
+        for cluster_id, when in list(self.restart_at.items()):
+            if when <= now:
+                self.restarts[cluster_id] += 1
+                self.start_cluster(cluster_id)
+
+    def _drain_stats(self, timeout: float) -> None:
+        """Take stats reports off the queue, waiting up to timeout for the first"""
+        try:
+            report = self.stats_queue.get(timeout=timeout)
+            while True:
+                self.stats[report['cluster_id']] = report
+                report = self.stats_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _publish_stats(self) -> None:
+        """Write the latest stats of every cluster for !diag and external monitoring"""
+        clusters = {}
+        for cluster_id, shard_ids in enumerate(self.ranges):
+            process = self.processes.get(cluster_id)
+            clusters[str(cluster_id)] = {
+                'shards': [shard_ids[0], shard_ids[-1]],
+                'pid': process.pid if process else None,
+                'alive': bool(process and process.is_alive()),
+                'restarts': self.restarts[cluster_id],
+                **self.stats.get(cluster_id, {}),
+            }
+        os.makedirs(self.data_dir, exist_ok=True)
+        path = os.path.join(self.data_dir, STATS_FILE)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'shard_count': self.shard_count, 'updated_at': time.time(), 'clusters': clusters}, f)
+        os.replace(path + '.tmp', path)
+
+    def stop(self, *_) -> None:
+        """Ask the supervision loop to shut every cluster down"""
+        self._stopping = True
+
+    def run(self, stats_interval: float = 30) -> None:
+        """Start all clusters and supervise them until stopped"""
+        signal.signal(signal.SIGTERM, self.stop)
+        for cluster_id in range(len(self.ranges)):
+            self.start_cluster(cluster_id)
+
+        next_publish = 0.0
+        try:
+            while not self._stopping:
+                self._drain_stats(timeout=1)
+                self._check_clusters()
+                if time.time() >= next_publish:
+                    self._publish_stats()
+                    next_publish = time.time() + stats_interval
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self, timeout: float = 30) -> None:
+        """Terminate every cluster, giving each time to close its voice connections"""
+        logger.info("Stopping all clusters...")
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = time.time() + timeout
+        for process in self.processes.values():
+            process.join(max(0.0, deadline - time.time()))
+            if process.is_alive():
+                process.kill()
+        self._publish_stats()
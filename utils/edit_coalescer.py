@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Callable, Tuple
+import discord
+
+logger = logging.getLogger(__name__)
+
+class EditCoalescer:
+    """Single paced queue for message edits across all guilds; repeated requests for one message collapse into one edit"""
+
+    def __init__(self, edits_per_second: float = 2.0, per_message_interval: float = 5.0):
+        self.edit_interval = 1.0 / max(edits_per_second, 0.01)
+        self.per_message_interval = per_message_interval
+        # message id -> (message, render); render is called at send time so the edit carries the latest state
+        self._pending: 'OrderedDict[int, Tuple[discord.Message, Callable[[], Optional[Dict[str, Any]]]]]' = OrderedDict()
+        self._last_edit: Dict[int, float] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.requested = 0
+        self.coalesced = 0
+        self.sent = 0
+        self.failed = 0
+
+    def request(self, message: discord.Message, render: Callable[[], Optional[Dict[str, Any]]]) -> None:
+        """Ask for a message to be edited with render()'s keyword arguments (None skips the edit)"""
+        self.requested += 1
+        if message.id in self._pending:
+            self.coalesced += 1
+        self._pending[message.id] = (message, render)
+
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+
+    def forget(self, message: Optional[discord.Message]) -> None:
+        """Drop pending edits for a message that is no longer live"""
+        if message is not None:
+            self._pending.pop(message.id, None)
+            self._last_edit.pop(message.id, None)
+
+    def _next_ready(self) -> Tuple[Optional[int], float]:
+        """Pending message that may be edited now, or how long until one may"""
+        now = time.monotonic()
+        wait = float('inf')
+        for message_id in self._pending:
+            remaining = self._last_edit.get(message_id, 0.0) + self.per_message_interval - now
+            if remaining <= 0:
+                return message_id, 0.0
+            wait = min(wait, remaining)
+        return None, wait
+
+    async def _run(self) -> None:
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            message_id, wait = self._next_ready()
+            if message_id is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            message, render = self._pending.pop(message_id)
+            self._last_edit[message_id] = time.monotonic()
+            try:
+                kwargs = render()
+                if kwargs:
+                    await message.edit(**kwargs)
+                    self.sent += 1
+            except discord.NotFound:
+                self._last_edit.pop(message_id, None)
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"Coalesced edit of message {message_id} failed: {e}")
+
+            # Global pacing keeps live updates far below Discord's rate limits
+            await asyncio.sleep(self.edit_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        """Edit requests, how many were merged into later ones, and edits sent"""
+        return {
+            'pending': len(self._pending),
+            'requested': self.requested,
+            'coalesced': self.coalesced,
+            'sent': self.sent,
+            'failed': self.failed,
+        }
+
+    def close(self) -> None:
+        """Stop the edit loop"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        self._pending.clear()
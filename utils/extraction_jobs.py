@@ -0,0 +1,75 @@
+import asyncio
+import threading
+from typing import Optional, Set
+
+class ExtractionCancelled(Exception):
+    """Raised when an extraction job was cancelled by a user action"""
+
+class CancelToken:
+    """Thread-safe cancellation flag checked by extraction code, including executor threads"""
+
+    def __init__(self, parent: Optional['CancelToken'] = None):
+        self._event = threading.Event()
+        # A child token is also cancelled when its parent is, but can be cancelled on its own
+        self._parent = parent
+
+    def cancel(self) -> None:
+        """Mark the token as cancelled"""
+        self._event.set()
+
+    def is_cancelled(self) -> bool:
+        """Check if the token (or its parent) was cancelled"""
+        return self._event.is_set() or (self._parent is not None and self._parent.is_cancelled())
+
+    def raise_if_cancelled(self) -> None:
+        """Raise ExtractionCancelled if the token was cancelled"""
+        if self.is_cancelled():
+            raise ExtractionCancelled("Extraction was cancelled")
+
+class ExtractionJobs:
+    """Extraction work owned by a guild's player, cancelled together on stop/clear/leave"""
+
+    def __init__(self):
+        self.token = CancelToken()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def spawn(self, func, *args, **kwargs) -> asyncio.Task:
+        """Start func(*args, cancel_token=..., **kwargs) as a tracked task; a given token should be a child()"""
+        kwargs.setdefault('cancel_token', self.token)
+        task = asyncio.create_task(func(*args, **kwargs))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def run(self, func, *args, **kwargs):
+        """Run an extraction job and wait for its result, raising ExtractionCancelled if it was cancelled"""
+        task = self.spawn(func, *args, **kwargs)
+        try:
+            await asyncio.wait({task})
+        except asyncio.CancelledError:
+            # The caller went away, nobody wants the result any more
+            task.cancel()
+            raise
+
+        if task.cancelled():
+            raise ExtractionCancelled("Extraction was cancelled")
+        return task.result()
+
+    def child(self) -> CancelToken:
+        """Token for one job that can be cancelled alone and still goes with cancel_all"""
+        return CancelToken(self.token)
+
+    def cancel_all(self) -> int:
+        """Cancel every in-flight job, returns how many were running"""
+        self.token.cancel()
+        self.token = CancelToken()
+
+        cancelled = 0
+        for task in list(self._tasks):
+            self._tasks.discard(task)
+            if task.cancel():
+                cancelled += 1
+        return cancelled
+
+    def __len__(self) -> int:
+        return sum(1 for task in self._tasks if not task.done())
@@ -0,0 +1,216 @@
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import time
+from multiprocessing.connection import Client, Listener
+from typing import Optional, Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+class WorkerCrashed(Exception):
+    """An extraction worker died or hung while handling a request"""
+
+def handle_request(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one control message, the same in a worker process and in the local stand-in"""
+    op = message.get('op')
+    if op == 'ping':
+        return {'ok': True, 'data': os.getpid()}
+    if op != 'extract':
+        return {'ok': False, 'error': f"Unknown operation: {op}"}
+
+    import yt_dlp
+    try:
+        ytdl = yt_dlp.YoutubeDL(message['options'])
+        info = ytdl.extract_info(message['url'], download=message.get('download', False))
+        return {'ok': True, 'data': ytdl.sanitize_info(info) if info else None}
+    except Exception as e:
+        return {'ok': False, 'error': str(e)}
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def serve(address: str, authkey: bytes) -> None:
+    """Worker process entry point: answer requests from the bot process until it goes away"""
+    with Listener(address, authkey=authkey) as listener:
+        with listener.accept() as conn:
+            while True:
+                try:
+                    message = json.loads(conn.recv_bytes())
+                except (EOFError, OSError):
+                    return
+                conn.send_bytes(_encode(handle_request(message)))
+
+class LocalTransport:
+    """In-process stand-in for a worker: same messages and JSON round trip, no process or socket"""
+
+    alive = True
+
+    def request(self, message: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """Answer a message in this process, encoded like the socket protocol so the pool sees the same replies"""
+        return json.loads(_encode(handle_request(json.loads(_encode(message)))))
+
+    def restart(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+class ProcessTransport:
+    """One worker process and the local socket connection to it"""
+
+    def __init__(self, address: str, authkey: bytes, context, connect_timeout: float = 30):
+        self.address = address
+        self.authkey = authkey
+        self.context = context
+        self.connect_timeout = connect_timeout
+        self.process = None
+        self.conn = None
+
+    @property
+    def alive(self) -> bool:
+        return bool(self.process and self.process.is_alive())
+
+    def start(self) -> None:
+        """Spawn the worker and connect to it once it listens"""
+        if sys.platform != 'win32' and os.path.exists(self.address):
+            os.unlink(self.address)
+        self.process = self.context.Process(target=serve, args=(self.address, self.authkey),
+                                            name='banketnika-extract', daemon=True)
+        self.process.start()
+
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                self.conn = Client(self.address, authkey=self.authkey)
+                return
+            except (FileNotFoundError, ConnectionRefusedError):
+                if not self.process.is_alive() or time.monotonic() > deadline:
+                    raise WorkerCrashed(f"Extraction worker did not start (exit code {self.process.exitcode})")
+                time.sleep(0.05)
+
+    def request(self, message: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """Send a message and wait for the reply"""
+        if self.conn is None:
+            raise WorkerCrashed("Extraction worker is not running")
+        try:
+            self.conn.send_bytes(_encode(message))
+            if not self.conn.poll(timeout):
+                raise WorkerCrashed(f"Extraction worker did not answer within {timeout:.0f}s")
+            return json.loads(self.conn.recv_bytes())
+        except (EOFError, OSError) as e:
+            raise WorkerCrashed(f"Extraction worker exited (code {self.process.exitcode}): {e}")
+
+    def restart(self) -> None:
+        """Replace a crashed or hung worker with a fresh one"""
+        self.close()
+        self.start()
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        if self.process is not None:
+            if self.process.is_alive():
+                self.process.kill()
+            self.process.join(5)
+            self.process = None
+
+class ExtractionWorkers:
+    """Pool of worker processes running yt-dlp, so extraction CPU never competes with the gateway's event loop"""
+
+    _shared: Optional['ExtractionWorkers'] = None
+    _disabled = False
+
+    def __init__(self, transports: List[Any], timeout: float = 300):
+        self.transports = transports
+        self.timeout = timeout
+        self._idle: 'queue.Queue' = queue.Queue()
+        for transport in transports:
+            self._idle.put(transport)
+        self.requests = 0
+        self.crashes = 0
+
+    @classmethod
+    def shared(cls) -> Optional['ExtractionWorkers']:
+        """Get the process-wide worker pool, or None when extraction runs in this process"""
+        if cls._shared is None and not cls._disabled:
+            from config import Config
+            if Config.EXTRACTION_WORKERS <= 0:
+                cls._disabled = True
+                return None
+            cls._shared = cls.spawn(Config.EXTRACTION_WORKERS, Config.EXTRACTION_WORKER_TIMEOUT)
+        return cls._shared
+
+    @classmethod
+    def spawn(cls, count: int, timeout: float = 300) -> 'ExtractionWorkers':
+        """Start count worker processes listening on private local sockets"""
+        context = multiprocessing.get_context('spawn')
+        authkey = os.urandom(16)
+        socket_dir = tempfile.mkdtemp(prefix='banketnika-')
+        transports = []
+        for index in range(count):
+            if sys.platform == 'win32':
+                address = rf'\\.\pipe\banketnika-{os.getpid()}-{index}'
+            else:
+                address = os.path.join(socket_dir, f'extract-{index}.sock')
+            transport = ProcessTransport(address, authkey, context)
+            transport.start()
+            transports.append(transport)
+        logger.info(f"Started {count} extraction worker processes")
+        return cls(transports, timeout)
+
+    @classmethod
+    def local(cls, count: int = 1, timeout: float = 300) -> 'ExtractionWorkers':
+        """Pool of in-process stand-ins speaking the worker protocol, for checking it without spawning processes"""
+        return cls([LocalTransport() for _ in range(count)], timeout)
+
+    def extract(self, url: str, options: Dict[str, Any], download: bool = False) -> Optional[Dict[str, Any]]:
+        """Blocking yt-dlp extract_info in a worker; raises the worker's error message like yt-dlp would"""
+        transport = self._idle.get()
+        try:
+            # A worker that died while idle is replaced before it costs a request
+            if not transport.alive:
+                self.crashes += 1
+                self._restart(transport, "Extraction worker died while idle")
+            self.requests += 1
+            reply = transport.request({'op': 'extract', 'url': url, 'options': options, 'download': download},
+                                      self.timeout)
+        except WorkerCrashed as e:
+            # Only this request fails, the worker is replaced for the next one
+            self.crashes += 1
+            self._restart(transport, str(e))
+            raise
+        finally:
+            self._idle.put(transport)
+
+        if not reply.get('ok'):
+            raise Exception(reply.get('error') or "Extraction failed")
+        return reply.get('data')
+
+    @staticmethod
+    def _restart(transport, reason: str) -> None:
+        """Replace a worker, logging instead of raising so the caller's own error stands"""
+        logger.warning(f"{reason}, restarting it")
+        try:
+            transport.restart()
+        except Exception as e:
+            logger.error(f"Could not restart extraction worker: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Workers, how many are busy, requests served and crashes survived"""
+        return {
+            'workers': len(self.transports),
+            'alive': sum(1 for transport in self.transports if transport.alive),
+            'busy': len(self.transports) - self._idle.qsize(),
+            'requests': self.requests,
+            'crashes': self.crashes,
+        }
+
+    def close(self) -> None:
+        """Stop every worker process"""
+        for transport in self.transports:
+            transport.close()
@@ -0,0 +1,204 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+class QueueJournal:
+    """Append-only journal of queue mutations and playback checkpoints backed by SQLite"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # A single connection shared between the event loop and the compaction thread
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS queue_journal (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER NOT NULL,
+                op TEXT NOT NULL,
+                payload TEXT
+            );
+            CREATE INDEX IF NOT EXISTS queue_journal_guild ON queue_journal (guild_id, seq);
+            CREATE TABLE IF NOT EXISTS queue_snapshot (
+                guild_id INTEGER PRIMARY KEY,
+                last_seq INTEGER NOT NULL,
+                queue TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS playback_state (
+                guild_id INTEGER PRIMARY KEY,
+                channel_id INTEGER NOT NULL,
+                song TEXT NOT NULL,
+                position REAL NOT NULL,
+                volume REAL NOT NULL,
+                repeat_mode INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            );
+        """)
+
+    @staticmethod
+    def serialize_song(song: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert song data to a JSON-safe dict (requester is stored by id)"""
+        data = {key: value for key, value in song.items() if key != 'requester' and not key.startswith('_')}
+        requester = song.get('requester')
+        if requester is not None:
+            data['requester_id'] = getattr(requester, 'id', None)
+        return data
+
+    def append(self, guild_id: int, op: str, payload: Any = None) -> None:
+        """Append a queue mutation to the journal"""
+        encoded = json.dumps(payload, ensure_ascii=False) if payload is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO queue_journal (guild_id, op, payload) VALUES (?, ?, ?)",
+                (guild_id, op, encoded)
+            )
+
+    def checkpoint(self, guild_id: int, channel_id: int, song: Dict[str, Any], position: float,
+                   volume: float, repeat_mode: bool) -> None:
+        """Record the currently playing song and its playback position"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO playback_state "
+                "(guild_id, channel_id, song, position, volume, repeat_mode, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (guild_id, channel_id, json.dumps(self.serialize_song(song), ensure_ascii=False),
+                 position, volume, int(repeat_mode), time.time())
+            )
+
+    def clear_playback(self, guild_id: int) -> None:
+        """Forget the playback checkpoint for a guild"""
+        with self._lock:
+            self._conn.execute("DELETE FROM playback_state WHERE guild_id = ?", (guild_id,))
+
+    def forget(self, guild_id: int) -> None:
+        """Drop all persisted state for a guild"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM queue_journal WHERE guild_id = ?", (guild_id,))
+            self._conn.execute("DELETE FROM queue_snapshot WHERE guild_id = ?", (guild_id,))
+            self._conn.execute("DELETE FROM playback_state WHERE guild_id = ?", (guild_id,))
+            self._conn.execute("COMMIT")
+
+    def guilds(self) -> List[int]:
+        """Get all guilds that have persisted state"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT guild_id FROM playback_state "
+                "UNION SELECT guild_id FROM queue_snapshot "
+                "UNION SELECT DISTINCT guild_id FROM queue_journal"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def load_playback(self, guild_id: int) -> Optional[Dict[str, Any]]:
+        """Load the last playback checkpoint for a guild"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT channel_id, song, position, volume, repeat_mode, updated_at "
+                "FROM playback_state WHERE guild_id = ?",
+                (guild_id,)
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            'channel_id': row[0],
+            'song': json.loads(row[1]),
+            'position': row[2],
+            'volume': row[3],
+            'repeat_mode': bool(row[4]),
+            'updated_at': row[5]
+        }
+
+    def load_queue(self, guild_id: int) -> List[Dict[str, Any]]:
+        """Rebuild a guild's queue from its snapshot and the journal entries after it"""
+        with self._lock:
+            return self._load_queue_locked(guild_id)[0]
+
+    def compact(self) -> int:
+        """Fold journal entries into per-guild snapshots, returns the number of entries removed"""
+        removed = 0
+        with self._lock:
+            guild_ids = [row[0] for row in self._conn.execute(
+                "SELECT DISTINCT guild_id FROM queue_journal"
+            ).fetchall()]
+
+            for guild_id in guild_ids:
+                queue, last_seq = self._load_queue_locked(guild_id)
+                self._conn.execute("BEGIN")
+                try:
+                    if queue:
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO queue_snapshot (guild_id, last_seq, queue) VALUES (?, ?, ?)",
+                            (guild_id, last_seq, json.dumps(queue, ensure_ascii=False))
+                        )
+                    else:
+                        self._conn.execute("DELETE FROM queue_snapshot WHERE guild_id = ?", (guild_id,))
+                    cursor = self._conn.execute(
+                        "DELETE FROM queue_journal WHERE guild_id = ? AND seq <= ?",
+                        (guild_id, last_seq)
+                    )
+                    removed += cursor.rowcount
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+
+            self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+        if removed:
+            logger.info(f"Compacted {removed} queue journal entries for {len(guild_ids)} guilds")
+        return removed
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def _load_queue_locked(self, guild_id: int):
+        """Replay the journal on top of the snapshot (caller must hold the lock)"""
+        row = self._conn.execute(
+            "SELECT last_seq, queue FROM queue_snapshot WHERE guild_id = ?",
+            (guild_id,)
+        ).fetchone()
+        last_seq, queue = (row[0], json.loads(row[1])) if row else (0, [])
+
+        for seq, op, payload in self._conn.execute(
+            "SELECT seq, op, payload FROM queue_journal WHERE guild_id = ? AND seq > ? ORDER BY seq",
+            (guild_id, last_seq)
+        ):
+            self._apply(queue, op, json.loads(payload) if payload is not None else None)
+            last_seq = seq
+
+        return queue, last_seq
+
+    @staticmethod
+    def _apply(queue: List[Dict[str, Any]], op: str, payload: Any) -> None:
+        """Apply a single journal operation to a queue list"""
+        if op == 'append':
+            queue.append(payload)
+        elif op == 'pop':
+            if queue:
+                queue.pop(0)
+        elif op == 'clear':
+            queue.clear()
+        elif op == 'remove':
+            if 0 <= payload < len(queue):
+                queue.pop(payload)
+        elif op == 'move':
+            from_index, to_index = payload
+            if 0 <= from_index < len(queue):
+                queue.insert(to_index, queue.pop(from_index))
+        elif op == 'replace':
+            queue[:] = payload
+        else:
+            logger.warning(f"Unknown queue journal operation: {op}")
@@ -0,0 +1,218 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import subprocess
+import threading
+from typing import Optional, Dict, Any, List, Tuple
+from utils.canonical import Canonicalizer
+from utils.track_index import TrackIndex
+
+logger = logging.getLogger(__name__)
+
+# Audio files picked up by the scanner
+AUDIO_EXTENSIONS = ('.mp3', '.flac', '.ogg', '.opus', '.m4a', '.aac', '.wav', '.wma', '.webm')
+
+class LocalLibrary:
+    """Catalog of audio files on disk with a full-text index over their tags"""
+
+    def __init__(self, path: str, directories: List[str]):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.directories = [os.path.abspath(d) for d in directories if d]
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS library_tracks (
+                id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL UNIQUE,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                artist TEXT,
+                album TEXT,
+                duration INTEGER
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS library_fts USING fts5(
+                title, artist, album, folded,
+                tokenize = 'unicode61 remove_diacritics 2'
+            );
+        """)
+
+    @staticmethod
+    def probe(path: str) -> Dict[str, Any]:
+        """Read title, artist, album and duration of an audio file with ffprobe"""
+        try:
+            result = subprocess.run(
+                ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', path],
+                capture_output=True, text=True, timeout=15
+            )
+            data = json.loads(result.stdout or '{}').get('format', {})
+        except (OSError, subprocess.SubprocessError, ValueError) as e:
+            logger.warning(f"Could not probe {path}: {e}")
+            data = {}
+
+        tags = {key.lower(): value for key, value in (data.get('tags') or {}).items()}
+        title, artist = tags.get('title'), tags.get('artist') or tags.get('album_artist')
+        if not title:
+            # Fall back to "Artist - Title" file names
+            stem = os.path.splitext(os.path.basename(path))[0]
+            if ' - ' in stem and not artist:
+                artist, title = (part.strip() for part in stem.split(' - ', 1))
+            else:
+                title = stem.replace('_', ' ').strip()
+
+        try:
+            duration = int(float(data.get('duration', 0)))
+        except (TypeError, ValueError):
+            duration = 0
+
+        return {'title': title, 'artist': artist, 'album': tags.get('album'), 'duration': duration}
+
+    def _walk(self) -> Dict[str, Tuple[float, int]]:
+        """Audio files under the configured directories with their mtime and size"""
+        files = {}
+        for root_dir in self.directories:
+            if not os.path.isdir(root_dir):
+                logger.warning(f"Local music directory does not exist: {root_dir}")
+                continue
+            for root, _, names in os.walk(root_dir):
+                for name in names:
+                    if not name.lower().endswith(AUDIO_EXTENSIONS):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    files[path] = (stat.st_mtime, stat.st_size)
+        return files
+
+    def scan(self) -> Dict[str, int]:
+        """Bring the index up to date with the disk, probing only new and changed files"""
+        files = self._walk()
+        with self._lock:
+            known = {
+                row[0]: (row[1], row[2], row[3])
+                for row in self._conn.execute("SELECT path, mtime, size, id FROM library_tracks")
+            }
+
+        changed = [path for path, stat in files.items() if path not in known or known[path][:2] != stat]
+        removed = [known[path][2] for path in known if path not in files]
+
+        # Probe outside the lock, it spawns a process per file
+        probed = [(path, files[path], self.probe(path)) for path in changed]
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for track_id in removed:
+                    self._conn.execute("DELETE FROM library_tracks WHERE id = ?", (track_id,))
+                    self._conn.execute("DELETE FROM library_fts WHERE rowid = ?", (track_id,))
+                for path, (mtime, size), tags in probed:
+                    cursor = self._conn.execute(
+                        "INSERT INTO library_tracks (path, mtime, size, title, artist, album, duration) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(path) DO UPDATE SET mtime = excluded.mtime, size = excluded.size, "
+                        "title = excluded.title, artist = excluded.artist, album = excluded.album, "
+                        "duration = excluded.duration "
+                        "RETURNING id",
+                        (path, mtime, size, tags['title'], tags['artist'], tags['album'], tags['duration'])
+                    )
+                    track_id = cursor.fetchone()[0]
+                    folded = Canonicalizer.normalize_query(
+                        ' '.join(filter(None, (tags['title'], tags['artist'], tags['album'])))
+                    )
+                    self._conn.execute("DELETE FROM library_fts WHERE rowid = ?", (track_id,))
+                    self._conn.execute(
+                        "INSERT INTO library_fts (rowid, title, artist, album, folded) VALUES (?, ?, ?, ?, ?)",
+                        (track_id, tags['title'], tags['artist'] or '', tags['album'] or '', folded)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        if changed or removed:
+            logger.info(f"Local library: {len(changed)} added or changed, {len(removed)} removed, {len(files)} total")
+        return {'changed': len(changed), 'removed': len(removed), 'total': len(files)}
+
+    @staticmethod
+    def _match_expression(words: List[str], partial: bool = False) -> Optional[str]:
+        """FTS5 expression requiring every word of the query, in either script; only a half-typed last word is a prefix"""
+        if not words:
+            return None
+        terms = [f'folded:"{word}"' for word in words]
+        if partial:
+            terms[-1] += '*'
+        return ' AND '.join(terms)
+
+    def _rows(self, words: List[str], limit: int, partial: bool = False) -> List[Tuple]:
+        expression = self._match_expression(words, partial)
+        if not expression:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT t.path, t.title, t.artist, t.album, t.duration "
+                "FROM library_fts JOIN library_tracks t ON t.id = library_fts.rowid "
+                "WHERE library_fts MATCH ? ORDER BY rank LIMIT ?",
+                (expression, limit)
+            ).fetchall()
+        return [row for row in rows if os.path.isfile(row[0])]
+
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Best matching local tracks for a partially typed query, as track info dicts"""
+        words = Canonicalizer.normalize_query(query).split()
+        return [self.to_info(*row) for row in self._rows(words, limit, partial=True)]
+
+    def find(self, query: str, min_confidence: float = 0.8, limit: int = 10) -> Optional[Dict[str, Any]]:
+        """Best local track for a query, scored like the track index; None sends the query on to YouTube"""
+        if Canonicalizer.is_url(query):
+            return None
+        words = Canonicalizer.normalize_query(query).split()
+
+        best, best_score = None, 0.0
+        for row in self._rows(words, limit):
+            path, title, artist, album, duration = row
+            # "Artist Title" names the file as well as the title does
+            aliases = [Canonicalizer.normalize_query(f"{artist} {title}")] if artist else []
+            score = TrackIndex.confidence(words, title, aliases)
+            if score > best_score:
+                best, best_score = row, score
+
+        if best and best_score >= min_confidence:
+            return self.to_info(*best)
+        return None
+
+    @staticmethod
+    def to_info(path: str, title: str, artist: Optional[str], album: Optional[str],
+                duration: Optional[int]) -> Dict[str, Any]:
+        """Track info in the same shape as a yt-dlp result"""
+        return {
+            'id': 'local:' + hashlib.sha1(path.encode('utf-8')).hexdigest()[:16],
+            'title': title,
+            'url': path,
+            'webpage_url': path,
+            'duration': duration or 0,
+            'uploader': artist or album or 'Local library',
+            'thumbnail': None,
+            'extractor': 'local',
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of indexed tracks and their total duration"""
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(duration), 0) FROM library_tracks"
+            ).fetchone()
+        return {'tracks': count, 'duration': total, 'directories': len(self.directories)}
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
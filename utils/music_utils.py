@@ -4,11 +4,21 @@ import yt_dlp
 import random
 import subprocess
 import shutil
+import itertools
 import json
 import time
 import os
-from typing import Optional, Dict, Any
+import sys
+from typing import Optional, Dict, Any, List
+from urllib.parse import urlparse, parse_qs
 from config import Config
+from utils.extraction_jobs import CancelToken, ExtractionCancelled
+from utils.scheduler import ExtractionScheduler, Priority
+from utils.track_cache import TrackCache
+from utils.canonical import Canonicalizer
+from utils.negative_cache import NegativeCache, LookupFailed
+from utils.track_index import TrackIndex
+from utils.extraction_workers import ExtractionWorkers
 
 class MusicUtils:
     """Utility class for music-related operations"""
@@ -39,6 +49,24 @@ class MusicUtils:
             print(f"Error checking FFmpeg: {e}")
             return False
     
+    @staticmethod
+    def get_memory_usage() -> Optional[float]:
+        """Resident set size of this process in MB, or None where it cannot be read"""
+        try:
+            with open('/proc/self/status', encoding='ascii') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        try:
+            import resource
+            # Peak rather than current RSS; kilobytes on Linux, bytes on macOS
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+        except ImportError:
+            return None
+    
     @staticmethod
     def format_duration(seconds: int) -> str:
         """Format duration from seconds to MM:SS or HH:MM:SS format"""
@@ -50,6 +78,40 @@ class MusicUtils:
             seconds = seconds % 60
             return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
     
+    @staticmethod
+    def get_stream_expiry(url: str) -> Optional[float]:
+        """Get the expiry timestamp of a googlevideo stream URL, if it has one"""
+        if not url or 'googlevideo.com' not in url:
+            return None
+        
+        expire = parse_qs(urlparse(url).query).get('expire')
+        if not expire:
+            return None
+        
+        try:
+            return float(expire[0])
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def is_stream_expired(url: str, margin: float = 60) -> bool:
+        """Check if a stream URL has expired (or will within the margin)"""
+        expiry = MusicUtils.get_stream_expiry(url)
+        return expiry is not None and expiry - margin <= time.time()
+    
+    @staticmethod
+    def is_within_hours(window: str, hour: Optional[int] = None) -> bool:
+        """Check if the local hour falls in a 'start-end' window (end exclusive, may wrap past midnight)"""
+        if hour is None:
+            hour = time.localtime().tm_hour
+        try:
+            start, end = (int(part) for part in window.split('-', 1))
+        except ValueError:
+            return False
+        if start <= end:
+            return start <= hour < end
+        return hour >= start or hour < end
+    
     @staticmethod
     def get_random_banket_phrase() -> str:
         """Get a random Bulgarian banket phrase"""
@@ -120,7 +182,18 @@ class MusicUtils:
         return view
 
     @staticmethod
-    def create_now_playing_embed(song_info: Dict[str, Any]) -> discord.Embed:
+    def create_progress_bar(position: float, duration: int, length: int = 12) -> str:
+        """Text progress bar with elapsed and total time"""
+        elapsed = MusicUtils.format_duration(int(position))
+        if not duration:
+            return f"🔴 На живо • {elapsed}"
+        ratio = min(max(position / duration, 0.0), 1.0)
+        filled = min(int(ratio * length), length - 1)
+        bar = "▬" * filled + "🔘" + "▬" * (length - filled - 1)
+        return f"{bar} {elapsed} / {MusicUtils.format_duration(duration)} ({ratio:.0%})"
+
+    @staticmethod
+    def create_now_playing_embed(song_info: Dict[str, Any], position: float = 0.0) -> discord.Embed:
         """Create a now playing embed with enhanced information"""
         embed = discord.Embed(
             title="🎵 Сега свири",
@@ -138,20 +211,49 @@ class MusicUtils:
         if song_info.get('thumbnail'):
             embed.set_thumbnail(url=song_info['thumbnail'])
         
-        # Add progress bar (placeholder for now)
-        embed.add_field(name="⏳ Прогрес", value="▬▬▬▬▬▬▬▬▬▬ 0%", inline=False)
+        embed.add_field(
+            name="⏳ Прогрес",
+            value=MusicUtils.create_progress_bar(position, song_info.get('duration') or 0),
+            inline=False
+        )
         
         embed.set_footer(text=f"{Config.BOT_NAME} • Банкет режим активен! 🎉")
         return embed
 
     @staticmethod
-    def create_queue_embed(queue_list: list, current_song: Optional[Dict] = None, page: int = 1, per_page: int = 10) -> discord.Embed:
-        """Create a queue display embed with pagination"""
+    def format_queue_page(queue, start: int, per_page: int) -> str:
+        """Text of one queue page, read straight from the queue and kept within the 1024-character field limit"""
+        # Titles give way first so every entry of the page fits
+        budget = 1024 // per_page - 1
+        lines = []
+        for i, song in enumerate(itertools.islice(queue, start, start + per_page), start + 1):
+            duration = MusicUtils.format_duration(song['duration']) if song.get('duration') else "Live"
+            requester = getattr(song.get('requester'), 'display_name', 'Unknown')
+            details = f"    👤 {MusicUtils.truncate(song.get('uploader') or 'Unknown', 24)} • 🎧 {MusicUtils.truncate(requester, 24)}"
+            head = f"`{i}.` **** [{duration}]\n"
+            title = MusicUtils.truncate(song['title'], max(budget - len(head) - len(details), 10))
+            lines.append(f"`{i}.` **{title}** [{duration}]\n{details}")
+        return MusicUtils.truncate("\n".join(lines), 1024)
+    
+    @staticmethod
+    def truncate(text: str, limit: int) -> str:
+        """Shorten text to at most limit characters, marking the cut with an ellipsis"""
+        return text if len(text) <= limit else text[:limit - 1] + "…"
+    
+    @staticmethod
+    def queue_page_count(queue_length: int, per_page: int = 10) -> int:
+        """Number of queue pages, at least one"""
+        return max(1, (queue_length + per_page - 1) // per_page)
+    
+    @staticmethod
+    def create_queue_embed(player, page: int = 1, per_page: int = 10) -> discord.Embed:
+        """Create a queue display embed for one page of a player's queue"""
         embed = discord.Embed(
             title="🎼 Опашка за музика",
             color=Config.COLOR_PRIMARY
         )
         
+        current_song = player.current_song
         if current_song:
             duration = MusicUtils.format_duration(current_song['duration']) if current_song.get('duration') else "Live"
             embed.add_field(
@@ -160,29 +262,20 @@ class MusicUtils:
                 inline=False
             )
         
-        if queue_list:
-            total_pages = (len(queue_list) + per_page - 1) // per_page
-            start_idx = (page - 1) * per_page
-            end_idx = start_idx + per_page
-            page_queue = queue_list[start_idx:end_idx]
-            
-            queue_text = ""
-            for i, song in enumerate(page_queue, start_idx + 1):
-                duration = MusicUtils.format_duration(song['duration']) if song.get('duration') else "Live"
-                queue_text += f"`{i}.` **{song['title']}** [{duration}]\n"
-                queue_text += f"    👤 {song.get('uploader', 'Unknown')} • 🎧 {song['requester'].display_name}\n"
+        if player.queue:
+            total_pages = MusicUtils.queue_page_count(len(player.queue), per_page)
+            page = min(max(page, 1), total_pages)
             
             embed.add_field(
                 name=f"📋 Следващи песни (Страница {page}/{total_pages})",
-                value=queue_text,
+                value=player.get_queue_page(page, per_page),
                 inline=False
             )
             
             # Add queue statistics
-            total_duration = sum(song.get('duration', 0) for song in queue_list)
             embed.add_field(
                 name="📊 Статистики",
-                value=f"🎵 Общо песни: {len(queue_list)}\n⏱️ Общо време: {MusicUtils.format_duration(total_duration)}",
+                value=f"🎵 Общо песни: {len(player.queue)}\n⏱️ Общо време: {MusicUtils.format_duration(player.get_queue_duration())}",
                 inline=True
             )
         else:
@@ -195,6 +288,39 @@ class MusicUtils:
         embed.set_footer(text=f"{Config.BOT_NAME} • Използвайте бутоните за контрол")
         return embed
 
+class StageTrace:
+    """Collects stage timings for a request so overlapping stages can be compared to a sequential run"""
+    
+    def __init__(self, label: str):
+        self.label = label
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.first_audio: Optional[float] = None
+    
+    async def timed(self, name: str, coro):
+        """Await a coroutine and record how long it took"""
+        start = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            self.stages[name] = time.perf_counter() - start
+    
+    def mark_first_audio(self):
+        """Record the moment playback started"""
+        if self.first_audio is None:
+            self.first_audio = time.perf_counter() - self.started
+    
+    def summary(self) -> str:
+        """Human-readable trace with the time saved compared to running the stages one after another"""
+        if self.first_audio is not None:
+            elapsed, milestone = self.first_audio, "first audio"
+        else:
+            elapsed, milestone = time.perf_counter() - self.started, "done"
+        sequential = sum(self.stages.values())
+        stages = ", ".join(f"{name} {duration:.2f}s" for name, duration in self.stages.items())
+        return (f"{self.label}: {stages} | {milestone} at {elapsed:.2f}s "
+                f"(sequential {sequential:.2f}s, saved {max(0.0, sequential - elapsed):.2f}s)")
+
 class YouTubeDownloader:
     """Enhanced YouTube downloader using yt-dlp with better bot detection evasion"""
     
@@ -232,7 +358,7 @@ class YouTubeDownloader:
             'skip_unavailable_fragments': True,
             'extractor_retries': 3,
             'file_access_retries': 3,
-            'playlistend': 50,
+            'playlistend': 50,  # Cap for eagerly resolved playlists, long ones go through extract_playlist_page
             'source_address': '0.0.0.0'
         }
         
@@ -258,11 +384,23 @@ class YouTubeDownloader:
         # Create yt-dlp instance
         self.ytdl = self._create_ytdl_instance()
         
+        # Blocking yt-dlp calls go through the shared priority scheduler
+        self.scheduler = ExtractionScheduler.shared()
+        
+        # Resolved tracks shared by every downloader
+        self.cache = TrackCache.shared()
+        
+        # Known-bad URLs and queries, so repeated requests fail without going upstream
+        self.failures = NegativeCache.shared()
+        
+        # Every track resolved so far, so fuzzy repeats skip the search
+        self.index = TrackIndex.shared()
+        
         # Cookie jar for session persistence
         self.cookie_jar = {}
     
-    def _create_ytdl_instance(self, additional_options: Optional[Dict] = None):
-        """Create a new yt-dlp instance with current options"""
+    def _ytdl_options(self, additional_options: Optional[Dict] = None) -> Dict[str, Any]:
+        """yt-dlp options with current headers and any additional options"""
         options = self.base_options.copy()
         
         # Add headers
@@ -272,16 +410,43 @@ class YouTubeDownloader:
         if additional_options:
             options.update(additional_options)
         
-        return yt_dlp.YoutubeDL(options)
+        return options
+    
+    def _create_ytdl_instance(self, additional_options: Optional[Dict] = None):
+        """Create a new yt-dlp instance with current options"""
+        return yt_dlp.YoutubeDL(self._ytdl_options(additional_options))
+    
+    def _extraction(self, url: str, additional_options: Optional[Dict] = None, download: bool = False):
+        """Blocking extract_info call for the scheduler, run in a worker process when those are enabled"""
+        workers = ExtractionWorkers.shared()
+        if workers:
+            options = self._ytdl_options(additional_options)
+            return lambda: workers.extract(url, options, download)
+        ytdl = self._create_ytdl_instance(additional_options)
+        return lambda: ytdl.extract_info(url, download=download)
     
     def _rotate_user_agent(self):
         """Rotate to a new user agent"""
         self.current_user_agent = random.choice(self.user_agents)
         self.headers['User-Agent'] = self.current_user_agent
     
-    async def extract_info(self, url: str, download: bool = False) -> Optional[Dict[str, Any]]:
+    @staticmethod
+    def _run_unless_cancelled(cancel_token: Optional[CancelToken], func):
+        """Wrap executor work so jobs cancelled while queued give their slot back immediately"""
+        def run():
+            if cancel_token and cancel_token.is_cancelled():
+                return None
+            return func()
+        return run
+    
+    async def extract_info(self, url: str, download: bool = False,
+                           cancel_token: Optional[CancelToken] = None,
+                           priority: Priority = Priority.INTERACTIVE,
+                           guild_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """Extract information from YouTube URL with enhanced retry logic"""
-        loop = asyncio.get_event_loop()
+        is_url = self._is_url(url)
+        if is_url:
+            self._raise_known_failure(url)
         
         # Try multiple extraction strategies
         strategies = [
@@ -296,8 +461,8 @@ class YouTubeDownloader:
             try:
                 print(f"Extraction strategy {i+1}/{len(strategies)}: {strategy['name']}")
                 
-                # Create new ytdl instance with strategy options
-                ytdl = self._create_ytdl_instance(strategy['options'])
+                # Prepare the extraction with strategy options
+                extraction = self._extraction(url, strategy['options'], download)
                 
                 # Add delay between attempts
                 if i > 0:
@@ -305,17 +470,26 @@ class YouTubeDownloader:
                     print(f"Waiting {delay} seconds before next attempt...")
                     await asyncio.sleep(delay)
                 
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
+                
                 # Extract info
-                data = await loop.run_in_executor(
-                    None,
-                    lambda: ytdl.extract_info(url, download=download)
+                data = await self.scheduler.run(
+                    self._run_unless_cancelled(cancel_token, extraction),
+                    priority, guild_id, cancel_token
                 )
                 
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
+                
                 if data:
                     print(f"✅ Strategy '{strategy['name']}' succeeded!")
                     return data
                 else:
                     print(f"❌ Strategy '{strategy['name']}' returned no data")
+            
+            except ExtractionCancelled:
+                raise
                     
             except Exception as e:
                 error_msg = str(e)
@@ -326,21 +500,106 @@ class YouTubeDownloader:
                     print("Bot detection triggered, trying next strategy...")
                     continue
                 elif "Private video" in error_msg:
-                    raise Exception("This video is private and cannot be accessed.")
+                    self._fail(url if is_url else None, NegativeCache.PRIVATE,
+                               "This video is private and cannot be accessed.")
                 elif "Video unavailable" in error_msg:
-                    raise Exception("Video is not available.")
+                    self._fail(url if is_url else None, NegativeCache.REMOVED, "Video is not available.")
                 elif "Premieres in" in error_msg:
-                    raise Exception("This video is a premiere that hasn't started yet.")
+                    self._fail(url if is_url else None, NegativeCache.UPCOMING,
+                               "This video is a premiere that hasn't started yet.")
                 elif "This live event will begin in" in error_msg:
-                    raise Exception("This is a scheduled live stream that hasn't started yet.")
+                    self._fail(url if is_url else None, NegativeCache.UPCOMING,
+                               "This is a scheduled live stream that hasn't started yet.")
                 
                 # Continue to next strategy
                 continue
         
         # If all strategies failed
-        raise Exception("All extraction strategies failed. YouTube may be temporarily blocking requests.")
+        self._fail(url if is_url else None, NegativeCache.BLOCKED,
+                   "All extraction strategies failed. YouTube may be temporarily blocking requests.")
+    
+    def _raise_known_failure(self, query: str) -> None:
+        """Raise LookupFailed right away if the query is known to fail"""
+        failure = self.failures.get(query)
+        if failure:
+            print(f"🚫 Known failure ({failure['reason']}) for: {query}")
+            raise LookupFailed(failure['message'], failure['reason'])
+    
+    def _fail(self, query: Optional[str], reason: str, message: str):
+        """Remember a failed lookup and raise it"""
+        if query:
+            self.failures.record(query, reason, message)
+        raise LookupFailed(message, reason)
     
-    async def search_youtube(self, query: str) -> Optional[Dict[str, Any]]:
+    async def search_youtube(self, query: str,
+                             cancel_token: Optional[CancelToken] = None,
+                             priority: Priority = Priority.INTERACTIVE,
+                             guild_id: Optional[int] = None,
+                             use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """Search YouTube (or extract a URL), answering from the track cache when possible"""
+        video_id = Canonicalizer.extract_video_id(query)
+        in_playlist = Canonicalizer.extract_playlist_id(query) is not None
+        if use_cache:
+            # A cached single video never answers a link that also names a playlist
+            cached = self.cache.get(query) or (self.cache.get_track(video_id) if video_id and not in_playlist else None)
+            if cached:
+                print(f"⚡ Cache hit for: {query}")
+                return cached
+            
+            failure = self.failures.get(query)
+            if failure:
+                print(f"🚫 Known failure ({failure['reason']}) for: {query}")
+                if failure['reason'] == NegativeCache.NOT_FOUND:
+                    return None
+                raise LookupFailed(failure['message'], failure['reason'])
+        
+        target = query
+        if video_id:
+            # Extract plain video links in their canonical form (drops tracking and timestamp parameters)
+            if not in_playlist:
+                target = Canonicalizer.canonical_video_url(video_id)
+        elif use_cache:
+            # A fuzzy repeat of an earlier query only needs its known video resolved, not a search
+            known = self._index_lookup(query)
+            if known:
+                print(f"📇 Index match ({known['confidence']:.0%}) for: {query} -> {known['title']}")
+                cached = self.cache.get_track(known['id'])
+                if cached:
+                    self.cache.put(query, cached)
+                    return cached
+                target = known['webpage_url']
+        
+        try:
+            result = await self._search_youtube(target, cancel_token, priority, guild_id)
+        except ExtractionCancelled:
+            raise
+        except Exception as e:
+            self.failures.record(query, getattr(e, 'reason', None) or NegativeCache.classify(str(e)), str(e))
+            raise
+        
+        if result:
+            # A playlist link that resolved to one video stays unmapped, other videos share the playlist key
+            self.cache.put(None if in_playlist else query, result)
+            try:
+                self.index.record(query, result)
+            except Exception as e:
+                print(f"Error indexing track: {e}")
+        else:
+            self.failures.record(query, NegativeCache.NOT_FOUND, "No results found.")
+        return result
+    
+    def _index_lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """Best previously resolved track for a text query, if it is a confident match"""
+        try:
+            return self.index.lookup(query, Config.TRACK_INDEX_MIN_CONFIDENCE)
+        except Exception as e:
+            print(f"Error searching track index: {e}")
+            return None
+    
+    async def _search_youtube(self, query: str,
+                              cancel_token: Optional[CancelToken] = None,
+                              priority: Priority = Priority.INTERACTIVE,
+                              guild_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """Search YouTube with enhanced bot detection evasion"""
         try:
             print(f"🔍 Searching for: {query}")
@@ -348,7 +607,7 @@ class YouTubeDownloader:
             # Check if it's a direct URL
             if self._is_url(query):
                 print("📺 Direct URL detected, extracting info...")
-                return await self.extract_info(query)
+                return await self.extract_info(query, cancel_token=cancel_token, priority=priority, guild_id=guild_id)
             
             # For search queries, try multiple search strategies
             search_strategies = [
@@ -358,12 +617,17 @@ class YouTubeDownloader:
                 f"ytsearch:{query}",
             ]
             
+            # A search that ran and found nothing means "not found"; only errors mean we could not tell
+            searched = False
+            last_error = None
             for strategy in search_strategies:
                 try:
                     print(f"🔍 Trying search strategy: {strategy}")
                     
                     # Use extract_info for search
-                    search_result = await self.extract_info(strategy)
+                    search_result = await self.extract_info(strategy, cancel_token=cancel_token,
+                                                            priority=priority, guild_id=guild_id)
+                    searched = True
                     
                     if not search_result:
                         continue
@@ -383,22 +647,37 @@ class YouTubeDownloader:
                     elif search_result.get('title'):
                         print(f"✅ Direct result: {search_result.get('title')}")
                         return search_result
+                
+                except ExtractionCancelled:
+                    raise
                     
                 except Exception as e:
                     print(f"❌ Search strategy failed: {e}")
+                    last_error = e
                     continue
             
             # If all search strategies failed, try alternative search
-            return await self._alternative_search(query)
-            
+            result = await self._alternative_search(query, cancel_token, priority, guild_id)
+            if result or searched or last_error is None:
+                return result
+        
+        except ExtractionCancelled:
+            print(f"⏹️ Search cancelled: {query}")
+            raise
+        
         except Exception as e:
+            # Private, removed and upcoming videos will not turn up through the fallback searches
+            if isinstance(e, LookupFailed) and e.reason in (NegativeCache.PRIVATE, NegativeCache.REMOVED,
+                                                            NegativeCache.UPCOMING):
+                raise
+            
             error_msg = str(e)
             print(f"❌ Search failed: {error_msg}")
             
             # Try alternative search as last resort
             try:
-                return await self._alternative_search(query)
-            except:
+                return await self._alternative_search(query, cancel_token, priority, guild_id)
+            except Exception:
                 pass
             
             # Provide user-friendly error messages
@@ -410,8 +689,17 @@ class YouTubeDownloader:
                 raise Exception("Video is not available in your region.")
             else:
                 raise Exception(f"Search failed: {error_msg}")
+        
+        # Every search errored, so remember why instead of caching the query as not found
+        if NegativeCache.classify(str(last_error)) == NegativeCache.BLOCKED:
+            raise LookupFailed("YouTube is currently blocking bot requests. Please try again in a few minutes "
+                               "or use a more specific search term.", NegativeCache.BLOCKED)
+        raise LookupFailed(f"Search failed: {last_error}", NegativeCache.ERROR)
     
-    async def _alternative_search(self, query: str) -> Optional[Dict[str, Any]]:
+    async def _alternative_search(self, query: str,
+                                  cancel_token: Optional[CancelToken] = None,
+                                  priority: Priority = Priority.INTERACTIVE,
+                                  guild_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """Alternative search method using different approach"""
         print(f"🔄 Trying alternative search for: {query}")
         
@@ -439,17 +727,23 @@ class YouTubeDownloader:
                     'extract_flat': False
                 }
                 
-                ytdl = self._create_ytdl_instance(alt_options)
+                extraction = self._extraction(strategy['query'], alt_options)
+                
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
                 
                 # Try to extract
-                result = await asyncio.get_event_loop().run_in_executor(
-                    None,
-                    lambda: ytdl.extract_info(strategy['query'], download=False)
+                result = await self.scheduler.run(
+                    self._run_unless_cancelled(cancel_token, extraction),
+                    priority, guild_id, cancel_token
                 )
                 
                 if result:
                     print(f"✅ Alternative search succeeded with {strategy['name']}")
                     return result
+            
+            except ExtractionCancelled:
+                raise
                     
             except Exception as e:
                 print(f"❌ Alternative strategy '{strategy['name']}' failed: {e}")
@@ -458,14 +752,88 @@ class YouTubeDownloader:
         print("❌ All alternative search strategies failed")
         return None
     
+    async def search_candidates(self, query: str, count: int = 5,
+                                cancel_token: Optional[CancelToken] = None,
+                                priority: Priority = Priority.INTERACTIVE,
+                                guild_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Top results of one flat search (id, title, duration, uploader, watch URL) without resolving streams"""
+        extraction = self._extraction(f"ytsearch{count}:{query}", {'extract_flat': 'in_playlist'})
+        
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+        data = await self.scheduler.run(
+            self._run_unless_cancelled(cancel_token, extraction),
+            priority, guild_id, cancel_token
+        )
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+        
+        candidates = []
+        for entry in (data or {}).get('entries') or []:
+            if not entry or not Canonicalizer.VIDEO_ID_RE.match(entry.get('id') or ''):
+                continue
+            candidates.append({
+                'id': entry['id'],
+                'title': entry.get('title') or 'Unknown',
+                'duration': int(entry.get('duration') or 0),
+                'uploader': entry.get('uploader') or entry.get('channel') or 'Unknown',
+                'url': Canonicalizer.canonical_video_url(entry['id']),
+            })
+        return candidates[:count]
+    
+    async def extract_playlist_page(self, url: str, start: int, count: int,
+                                    cancel_token: Optional[CancelToken] = None,
+                                    priority: Priority = Priority.BULK,
+                                    guild_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Extract one page of flat playlist entries (start is 1-based) without resolving any streams"""
+        self._raise_known_failure(url)
+        extraction = self._extraction(url, {
+            'extract_flat': 'in_playlist',
+            'playlist_items': f"{start}-{start + count - 1}",
+            'playlistend': None,
+        })
+        
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+        try:
+            data = await self.scheduler.run(
+                self._run_unless_cancelled(cancel_token, extraction),
+                priority, guild_id, cancel_token
+            )
+        except ExtractionCancelled:
+            raise
+        except Exception as e:
+            self.failures.record(url, getattr(e, 'reason', None) or NegativeCache.classify(str(e)), str(e))
+            raise
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+        return data
+    
+    async def download_audio(self, url: str, directory: str,
+                             priority: Priority = Priority.BULK) -> Optional[Dict[str, Any]]:
+        """Download a track's audio to directory, returns its info with 'url' pointing at the local file"""
+        os.makedirs(directory, exist_ok=True)
+        extraction = self._extraction(url, {
+            'format': 'bestaudio/best',
+            'outtmpl': os.path.join(directory, '%(id)s.%(ext)s'),
+            'overwrites': False,
+        }, download=True)
+        
+        info = await self.scheduler.run(extraction, priority)
+        if not info:
+            return None
+        
+        downloads = info.get('requested_downloads') or []
+        filepath = downloads[0].get('filepath') if downloads else None
+        if not filepath or not os.path.isfile(filepath):
+            return None
+        
+        info['url'] = filepath
+        return info
+    
     def _is_url(self, query: str) -> bool:
         """Check if the query is a URL"""
-        url_indicators = [
-            'http://', 'https://', 'www.',
-            'youtube.com', 'youtu.be', 'music.youtube.com',
-            'soundcloud.com', 'spotify.com'
-        ]
-        return any(indicator in query.lower() for indicator in url_indicators)
+        return Canonicalizer.is_url(query)
     
     def is_playlist(self, info: Dict[str, Any]) -> bool:
         """Check if the extracted info is a playlist"""
@@ -0,0 +1,104 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+from utils.canonical import Canonicalizer
+
+class LookupFailed(Exception):
+    """A lookup that failed for a known reason, remembered by the negative cache"""
+
+    def __init__(self, message: str, reason: str):
+        super().__init__(message)
+        self.reason = reason
+
+class NegativeCache:
+    """Remembers failed lookups by canonical key so repeated bad requests fail without going upstream"""
+
+    # Reasons a lookup can fail; None TTL means the failure is permanent
+    PRIVATE = 'private'
+    REMOVED = 'removed'
+    NOT_FOUND = 'not_found'
+    UPCOMING = 'upcoming'
+    BLOCKED = 'blocked'
+    ERROR = 'error'
+
+    _shared: Optional['NegativeCache'] = None
+
+    def __init__(self, max_entries: int = 2000, ttls: Optional[Dict[str, Optional[float]]] = None):
+        self.max_entries = max_entries
+        self.ttls: Dict[str, Optional[float]] = {
+            self.PRIVATE: None,
+            self.REMOVED: None,
+            self.NOT_FOUND: 1800,
+            self.UPCOMING: 600,
+            self.BLOCKED: 120,
+            self.ERROR: 60,
+        }
+        if ttls:
+            self.ttls.update(ttls)
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self.hits = 0
+
+    @classmethod
+    def shared(cls) -> 'NegativeCache':
+        """Get the process-wide negative cache"""
+        if cls._shared is None:
+            from config import Config
+            cls._shared = cls(Config.NEGATIVE_CACHE_SIZE, {
+                cls.NOT_FOUND: Config.NEGATIVE_NOT_FOUND_TTL,
+                cls.UPCOMING: Config.NEGATIVE_UPCOMING_TTL,
+                cls.BLOCKED: Config.NEGATIVE_BLOCKED_TTL,
+                cls.ERROR: Config.NEGATIVE_ERROR_TTL,
+            })
+        return cls._shared
+
+    @staticmethod
+    def classify(message: str) -> str:
+        """Failure reason for a yt-dlp or downloader error message"""
+        text = message.lower()
+        if 'private' in text:
+            return NegativeCache.PRIVATE
+        if any(marker in text for marker in ('video unavailable', 'video is not available', 'been removed',
+                                             'account associated', 'terminated')):
+            return NegativeCache.REMOVED
+        if 'premiere' in text or 'live event will begin' in text or "hasn't started" in text:
+            return NegativeCache.UPCOMING
+        if 'sign in to confirm' in text or 'blocking' in text or '429' in text:
+            return NegativeCache.BLOCKED
+        return NegativeCache.ERROR
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        """Get the remembered failure for a query, if it has not expired"""
+        key = Canonicalizer.cache_key(query)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry['expires_at'] <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(entry)
+
+    def record(self, query: str, reason: str, message: str) -> None:
+        """Remember that a query failed"""
+        ttl = self.ttls.get(reason, self.ttls[self.ERROR])
+        if ttl is not None and ttl <= 0:
+            return
+        key = Canonicalizer.cache_key(query)
+        self._entries[key] = {
+            'reason': reason,
+            'message': message,
+            'expires_at': float('inf') if ttl is None else time.time() + ttl,
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Remembered failures per reason and short-circuited lookups"""
+        now = time.time()
+        reasons: Dict[str, int] = {}
+        for entry in self._entries.values():
+            if entry['expires_at'] > now:
+                reasons[entry['reason']] = reasons.get(entry['reason'], 0) + 1
+        return {'entries': sum(reasons.values()), 'hits': self.hits, 'reasons': reasons}
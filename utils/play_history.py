@@ -0,0 +1,64 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+class PlayHistory:
+    """Play counts per track, used to decide which tracks to keep warm"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS play_counts (
+                video_id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                webpage_url TEXT NOT NULL,
+                duration INTEGER,
+                uploader TEXT,
+                plays INTEGER NOT NULL DEFAULT 0,
+                last_played REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS play_counts_plays ON play_counts (plays DESC);
+        """)
+
+    def record_play(self, video_id: str, song: Dict[str, Any]) -> None:
+        """Count a play of a track"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO play_counts (video_id, title, webpage_url, duration, uploader, plays, last_played) "
+                "VALUES (?, ?, ?, ?, ?, 1, ?) "
+                "ON CONFLICT(video_id) DO UPDATE SET plays = plays + 1, last_played = excluded.last_played, "
+                "title = excluded.title",
+                (video_id, song.get('title', 'Unknown'), song.get('original_url') or song.get('url'),
+                 song.get('duration') or 0, song.get('uploader'), time.time())
+            )
+
+    def top_tracks(self, limit: int) -> List[Dict[str, Any]]:
+        """Most played tracks, most popular first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT video_id, title, webpage_url, duration, uploader, plays "
+                "FROM play_counts ORDER BY plays DESC, last_played DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [
+            {'id': row[0], 'title': row[1], 'webpage_url': row[2], 'duration': row[3],
+             'uploader': row[4], 'plays': row[5]}
+            for row in rows
+        ]
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
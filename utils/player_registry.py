@@ -0,0 +1,52 @@
+import logging
+from typing import Dict, Any
+
+logger = logging.getLogger(__name__)
+
+class PlayerRegistry:
+    """Music state kept on the bot so it outlives reloads of the music cog"""
+
+    def __init__(self):
+        self.players: Dict[int, Any] = {}
+        self.journal = None
+        self.history = None
+        self.library = None
+        self.playlists = None
+        self.edits = None
+        self.restored = False
+
+    @classmethod
+    def attach(cls, bot) -> 'PlayerRegistry':
+        """Get the bot's registry, creating it on first load"""
+        registry = getattr(bot, 'music_registry', None)
+
+        if registry is None:
+            registry = cls()
+            bot.music_registry = registry
+            logger.info("Created music player registry")
+        elif not isinstance(registry, cls):
+            raise TypeError(
+                f"bot.music_registry is {type(registry).__name__}, expected {cls.__name__}"
+            )
+        else:
+            logger.info(f"Reusing music player registry with {len(registry.players)} players")
+
+        return registry
+
+    def close(self) -> None:
+        """Release resources held by the registry"""
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+        if self.history:
+            self.history.close()
+            self.history = None
+        if self.library:
+            self.library.close()
+            self.library = None
+        if self.playlists:
+            self.playlists.close()
+            self.playlists = None
+        if self.edits:
+            self.edits.close()
+            self.edits = None
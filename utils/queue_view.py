@@ -0,0 +1,90 @@
+import discord
+from typing import Optional
+from utils.music_utils import MusicUtils
+
+class QueueJumpModal(discord.ui.Modal, title="Отиди на страница"):
+    """Asks for a queue page number"""
+    
+    page = discord.ui.TextInput(label="Страница", placeholder="1", max_length=5)
+    
+    def __init__(self, view: 'QueueView'):
+        super().__init__()
+        self.queue_view = view
+        self.page.placeholder = f"1-{view.total_pages}"
+    
+    async def on_submit(self, interaction: discord.Interaction):
+        """Show the requested page in the queue message"""
+        try:
+            page = int(self.page.value)
+        except ValueError:
+            await interaction.response.send_message("❌ Въведете номер на страница", ephemeral=True)
+            return
+        await self.queue_view.show(interaction, page)
+
+class QueueView(discord.ui.View):
+    """Page buttons for a queue message; each flip renders one page and answers with a single edit"""
+    
+    def __init__(self, player, page: int = 1, per_page: int = 10, timeout: float = 180):
+        super().__init__(timeout=timeout)
+        self.player = player
+        self.per_page = per_page
+        self.page = page
+        self.message: Optional[discord.Message] = None
+        self._update_buttons()
+    
+    @property
+    def total_pages(self) -> int:
+        """Pages in the queue as it is now"""
+        return MusicUtils.queue_page_count(len(self.player.queue), self.per_page)
+    
+    def create_embed(self) -> discord.Embed:
+        """Embed of the current page"""
+        return MusicUtils.create_queue_embed(self.player, self.page, self.per_page)
+    
+    def _update_buttons(self):
+        """Clamp the page to the queue and enable only the moves that lead somewhere"""
+        total_pages = self.total_pages
+        self.page = min(max(self.page, 1), total_pages)
+        self.first_button.disabled = self.previous_button.disabled = self.page <= 1
+        self.next_button.disabled = self.last_button.disabled = self.page >= total_pages
+        self.jump_button.disabled = total_pages <= 1
+        self.jump_button.label = f"{self.page}/{total_pages}"
+    
+    async def show(self, interaction: discord.Interaction, page: int):
+        """Switch to a page with one edit of the queue message"""
+        self.page = page
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.create_embed(), view=self)
+    
+    @discord.ui.button(emoji="⏮️", style=discord.ButtonStyle.secondary)
+    async def first_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Go to the first page"""
+        await self.show(interaction, 1)
+    
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Go to the previous page"""
+        await self.show(interaction, self.page - 1)
+    
+    @discord.ui.button(label="1/1", style=discord.ButtonStyle.primary)
+    async def jump_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Ask for a page number"""
+        await interaction.response.send_modal(QueueJumpModal(self))
+    
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Go to the next page"""
+        await self.show(interaction, self.page + 1)
+    
+    @discord.ui.button(emoji="⏭️", style=discord.ButtonStyle.secondary)
+    async def last_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """Go to the last page"""
+        await self.show(interaction, self.total_pages)
+    
+    async def on_timeout(self):
+        """Remove the page buttons once they stop working"""
+        if self.message:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
@@ -0,0 +1,124 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any, List
+from utils.canonical import Canonicalizer
+
+logger = logging.getLogger(__name__)
+
+class SavedPlaylists:
+    """Per-guild named playlists stored as compact track references, loaded without any upstream calls"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS saved_playlists (
+                guild_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                tracks TEXT NOT NULL,
+                track_count INTEGER NOT NULL,
+                total_duration INTEGER NOT NULL,
+                created_by INTEGER,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (guild_id, name)
+            );
+        """)
+
+    @staticmethod
+    def normalize_name(name: str) -> str:
+        """Playlist names are case-insensitive"""
+        return ' '.join(name.split()).casefold()
+
+    @staticmethod
+    def compact(song: Dict[str, Any]) -> List[Any]:
+        """[ref, title, duration, uploader, loudness] where ref is a YouTube id or the original URL/path"""
+        original_url = song.get('original_url') or song.get('url')
+        ref = Canonicalizer.extract_video_id(original_url or '') or original_url
+        return [ref, song.get('title', 'Unknown'), song.get('duration') or 0,
+                song.get('uploader'), song.get('loudness')]
+
+    @staticmethod
+    def expand(entry: List[Any]) -> Dict[str, Any]:
+        """Queue entry for a compact track; YouTube tracks get their stream URL resolved at play time"""
+        ref, title, duration, uploader, loudness = entry
+        song = {
+            'title': title,
+            'duration': duration,
+            'uploader': uploader or 'Unknown',
+            'thumbnail': None,
+        }
+        if loudness is not None:
+            song['loudness'] = loudness
+
+        if Canonicalizer.VIDEO_ID_RE.match(ref):
+            song.update({
+                'id': ref,
+                'url': None,
+                'original_url': Canonicalizer.canonical_video_url(ref),
+                'unresolved': True,
+            })
+        else:
+            # Local files and other direct sources play as stored
+            song.update({'url': ref, 'original_url': ref})
+        return song
+
+    def save(self, guild_id: int, name: str, songs: List[Dict[str, Any]], created_by: Optional[int] = None) -> int:
+        """Save songs under a name, replacing any playlist with the same name; returns the track count"""
+        tracks = [self.compact(song) for song in songs if song.get('original_url') or song.get('url')]
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO saved_playlists "
+                "(guild_id, name, tracks, track_count, total_duration, created_by, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (guild_id, self.normalize_name(name), json.dumps(tracks, ensure_ascii=False, separators=(',', ':')),
+                 len(tracks), sum(track[2] for track in tracks), created_by, time.time())
+            )
+        return len(tracks)
+
+    def load(self, guild_id: int, name: str) -> Optional[List[Dict[str, Any]]]:
+        """Queue entries of a saved playlist, or None if there is no such playlist"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT tracks FROM saved_playlists WHERE guild_id = ? AND name = ?",
+                (guild_id, self.normalize_name(name))
+            ).fetchone()
+        if not row:
+            return None
+        return [self.expand(entry) for entry in json.loads(row[0])]
+
+    def list(self, guild_id: int) -> List[Dict[str, Any]]:
+        """Saved playlists of a guild with their size, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, track_count, total_duration, created_by FROM saved_playlists "
+                "WHERE guild_id = ? ORDER BY updated_at DESC",
+                (guild_id,)
+            ).fetchall()
+        return [
+            {'name': row[0], 'tracks': row[1], 'duration': row[2], 'created_by': row[3]}
+            for row in rows
+        ]
+
+    def delete(self, guild_id: int, name: str) -> bool:
+        """Delete a saved playlist, returns whether it existed"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM saved_playlists WHERE guild_id = ? AND name = ?",
+                (guild_id, self.normalize_name(name))
+            )
+        return cursor.rowcount > 0
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
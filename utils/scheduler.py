@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+from typing import Optional, Dict, Any, Callable
+
+logger = logging.getLogger(__name__)
+
+class Priority(IntEnum):
+    """Extraction priority classes, lower runs first"""
+    REFRESH = 0      # Stream refresh for the song about to play
+    INTERACTIVE = 1  # A user is waiting on !play / !search
+    PREFETCH = 2     # Resolving upcoming queue entries
+    BULK = 3         # Playlist imports, !banketmix batches, cache warming
+
+class _Job:
+    """A queued blocking call"""
+
+    __slots__ = ('func', 'future', 'priority', 'guild_id', 'cancel_token', 'enqueued_at')
+
+    def __init__(self, func, future, priority, guild_id, cancel_token):
+        self.func = func
+        self.future = future
+        self.priority = priority
+        self.guild_id = guild_id
+        self.cancel_token = cancel_token
+        self.enqueued_at = time.monotonic()
+
+    def is_cancelled(self) -> bool:
+        return self.future.done() or bool(self.cancel_token and self.cancel_token.is_cancelled())
+
+class ExtractionScheduler:
+    """Runs blocking extraction calls on a bounded pool, by priority class and round-robin across guilds"""
+
+    _shared: Optional['ExtractionScheduler'] = None
+
+    def __init__(self, workers: int = 3):
+        self.workers = max(1, workers)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='extract')
+
+        # Per class: guild id -> pending jobs, rotated to give each guild a turn
+        self._queues: Dict[Priority, OrderedDict] = {priority: OrderedDict() for priority in Priority}
+        self._running: Dict[Priority, int] = {priority: 0 for priority in Priority}
+        self._stats: Dict[Priority, Dict[str, float]] = {
+            priority: {'submitted': 0, 'completed': 0, 'cancelled': 0, 'wait_total': 0.0, 'wait_max': 0.0}
+            for priority in Priority
+        }
+
+    @classmethod
+    def shared(cls) -> 'ExtractionScheduler':
+        """Get the process-wide scheduler"""
+        if cls._shared is None:
+            from config import Config
+            cls._shared = cls(Config.MAX_CONCURRENT_DOWNLOADS)
+        return cls._shared
+
+    async def run(self, func: Callable[[], Any], priority: Priority = Priority.INTERACTIVE,
+                  guild_id: Optional[int] = None, cancel_token=None) -> Any:
+        """Queue a blocking call and wait for its result"""
+        future = asyncio.get_running_loop().create_future()
+        job = _Job(func, future, priority, guild_id, cancel_token)
+
+        self._queues[priority].setdefault(guild_id, deque()).append(job)
+        self._stats[priority]['submitted'] += 1
+        self._dispatch()
+
+        return await future
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-class queue depth, running jobs and wait times"""
+        result = {}
+        for priority in Priority:
+            stats = self._stats[priority]
+            started = stats['completed'] + self._running[priority]
+            result[priority.name.lower()] = {
+                'queued': sum(len(jobs) for jobs in self._queues[priority].values()),
+                'running': self._running[priority],
+                'completed': int(stats['completed']),
+                'cancelled': int(stats['cancelled']),
+                'avg_wait': stats['wait_total'] / started if started else 0.0,
+                'max_wait': stats['wait_max'],
+            }
+        return result
+
+    def _total_running(self) -> int:
+        return sum(self._running.values())
+
+    def _has_capacity(self, priority: Priority) -> bool:
+        """Check if a job of this class may start; one worker is kept free for refresh and interactive work"""
+        running = self._total_running()
+        if running >= self.workers:
+            return False
+        if priority >= Priority.PREFETCH and self.workers > 1:
+            background = self._running[Priority.PREFETCH] + self._running[Priority.BULK]
+            return background < self.workers - 1
+        return True
+
+    def _next_job(self, priority: Priority) -> Optional[_Job]:
+        """Take the next live job of a class, round-robin across guilds"""
+        queues = self._queues[priority]
+        while queues:
+            guild_id, jobs = next(iter(queues.items()))
+            job = jobs.popleft()
+            if jobs:
+                queues.move_to_end(guild_id)
+            else:
+                del queues[guild_id]
+
+            if job.is_cancelled():
+                self._stats[priority]['cancelled'] += 1
+                if not job.future.done():
+                    job.future.set_result(None)
+                continue
+            return job
+        return None
+
+    def _dispatch(self) -> None:
+        """Start queued jobs while there is capacity"""
+        for priority in Priority:
+            while self._queues[priority] and self._has_capacity(priority):
+                job = self._next_job(priority)
+                if job is None:
+                    break
+                self._start(job)
+
+    def _start(self, job: _Job) -> None:
+        wait = time.monotonic() - job.enqueued_at
+        stats = self._stats[job.priority]
+        stats['wait_total'] += wait
+        stats['wait_max'] = max(stats['wait_max'], wait)
+        self._running[job.priority] += 1
+
+        loop = job.future.get_loop()
+        executor_future = loop.run_in_executor(self.executor, job.func)
+
+        def finished(done):
+            self._running[job.priority] -= 1
+            stats['completed'] += 1
+            if not job.future.done():
+                if done.cancelled():
+                    job.future.cancel()
+                elif done.exception() is not None:
+                    job.future.set_exception(done.exception())
+                else:
+                    job.future.set_result(done.result())
+            self._dispatch()
+
+        executor_future.add_done_callback(finished)
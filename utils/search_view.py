@@ -0,0 +1,101 @@
+import asyncio
+import discord
+from typing import List, Dict, Any, Optional
+from utils.music_utils import MusicUtils
+from utils.extraction_jobs import CancelToken
+from config import Config
+
+class SearchResultsView(discord.ui.View):
+    """Select menu over !search results; only the requester can pick"""
+    
+    def __init__(self, music_cog, ctx, query: str, results: List[Dict[str, Any]],
+                 speculative: Optional[asyncio.Task] = None, connect_task: Optional[asyncio.Task] = None,
+                 speculative_token: Optional[CancelToken] = None, timeout: float = 60):
+        super().__init__(timeout=timeout)
+        self.music_cog = music_cog
+        self.ctx = ctx
+        self.query = query
+        self.results = results
+        self.speculative = speculative
+        self.speculative_token = speculative_token
+        self.connect_task = connect_task
+        self.message: Optional[discord.Message] = None
+        
+        select = discord.ui.Select(
+            placeholder="Изберете песен...",
+            options=[
+                discord.SelectOption(
+                    label=result['title'][:100],
+                    description=f"{result['uploader']} • {MusicUtils.format_duration(result['duration']) if result['duration'] else 'Live'}"[:100],
+                    value=str(index),
+                    emoji=f"{index + 1}\N{COMBINING ENCLOSING KEYCAP}"
+                )
+                for index, result in enumerate(results)
+            ]
+        )
+        select.callback = self.on_select
+        self.add_item(select)
+    
+    @staticmethod
+    def create_results_embed(query: str, results: List[Dict[str, Any]]) -> discord.Embed:
+        """List of search results to choose from"""
+        lines = []
+        for index, result in enumerate(results, 1):
+            duration = MusicUtils.format_duration(result['duration']) if result['duration'] else "Live"
+            lines.append(f"`{index}.` **{result['title']}** [{duration}]\n    👤 {result['uploader']}")
+        return MusicUtils.create_music_embed(
+            f"🔍 Резултати за: {query}",
+            "\n".join(lines) + "\n\nИзберете песен от менюто по-долу",
+        )
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Only the user who searched may pick a result"""
+        if interaction.user.id != self.ctx.author.id:
+            await interaction.response.send_message("❌ Само този, който търси, може да избере песен", ephemeral=True)
+            return False
+        return True
+    
+    async def on_select(self, interaction: discord.Interaction):
+        """Queue the picked result"""
+        index = int(interaction.data['values'][0])
+        self.stop()
+        await interaction.response.edit_message(
+            embed=MusicUtils.create_music_embed(
+                "⏳ Зареждане...",
+                f"Зареждам: **{self.results[index]['title']}**",
+                Config.COLOR_WARNING
+            ),
+            view=None
+        )
+        
+        # Only the top result was resolved ahead of time
+        if index != 0:
+            self.cancel_speculative()
+        speculative = self.speculative if index == 0 else None
+        await self.music_cog.play_search_result(
+            self.ctx, self.query, self.results[index], speculative, self.connect_task,
+            self.message or interaction.message
+        )
+    
+    def cancel_speculative(self):
+        """Stop resolving the top result, including a worker already extracting it"""
+        if self.speculative_token is not None:
+            self.speculative_token.cancel()
+        if self.speculative is not None:
+            self.speculative.cancel()
+    
+    async def on_timeout(self):
+        """Close the menu when nobody picked in time"""
+        self.cancel_speculative()
+        # The bot joined voice for a play that never came
+        self.music_cog.get_player(self.ctx.guild.id).schedule_idle_disconnect()
+        if self.message:
+            embed = MusicUtils.create_music_embed(
+                "⌛ Времето изтече",
+                f"Не беше избрана песен за: **{self.query}**",
+                Config.COLOR_WARNING
+            )
+            try:
+                await self.message.edit(embed=embed, view=None)
+            except discord.HTTPException:
+                pass
@@ -0,0 +1,158 @@
+import asyncio
+import inspect
+import logging
+import math
+import time
+from typing import Optional, Dict, Any, Callable, Hashable, List
+
+logger = logging.getLogger(__name__)
+
+class Timer:
+    """A scheduled callback and the wheel slot it currently sits in"""
+
+    __slots__ = ('key', 'deadline', 'callback', 'level', 'slot')
+
+    def __init__(self, key: Hashable, deadline: int, callback: Callable[[], Any]):
+        self.key = key
+        self.deadline = deadline
+        self.callback = callback
+        self.level = 0
+        self.slot = 0
+
+class TimerWheel:
+    """Hierarchical timer wheel: scheduling, cancelling and each tick are O(1) however many timers are pending"""
+
+    def __init__(self, tick: float = 1.0, slots: int = 60, levels: int = 3):
+        self.tick = tick
+        self.slots = slots
+        # Ticks covered by one slot of each level: 1, 60, 3600 ... with the defaults
+        self.spans = [slots ** level for level in range(levels)]
+        self._wheels: List[List[Dict[Hashable, Timer]]] = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._timers: Dict[Hashable, Timer] = {}
+        self._now = 0
+        self._started_at = time.monotonic()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+        self.scheduled = 0
+        self.cancelled = 0
+        self.fired = 0
+
+    def schedule(self, key: Hashable, delay: float, callback: Callable[[], Any]) -> None:
+        """Call callback after delay seconds, replacing any timer with the same key; coroutines are run as tasks"""
+        if self._closed:
+            # Shutting down, nothing would be left to tick the wheel
+            return
+        self.cancel(key, count=False)
+        timer = Timer(key, self._now + max(1, math.ceil(delay / self.tick)), callback)
+        self._timers[key] = timer
+        self._place(timer)
+        self.scheduled += 1
+
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+
+    def cancel(self, key: Hashable, count: bool = True) -> bool:
+        """Drop a pending timer, returns whether there was one"""
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+        del self._wheels[timer.level][timer.slot][key]
+        if count:
+            self.cancelled += 1
+        return True
+
+    def pending(self, key: Hashable) -> bool:
+        """Whether a timer with this key is waiting to fire"""
+        return key in self._timers
+
+    def remaining(self, key: Hashable) -> Optional[float]:
+        """Seconds until a pending timer fires"""
+        timer = self._timers.get(key)
+        if timer is None:
+            return None
+        return max(0.0, self._started_at + timer.deadline * self.tick - time.monotonic())
+
+    def _place(self, timer: Timer) -> None:
+        """Put a timer in the lowest level whose range reaches its deadline"""
+        delta = timer.deadline - self._now
+        level = 0
+        while level < len(self.spans) - 1 and delta >= self.spans[level + 1]:
+            level += 1
+        timer.level = level
+        timer.slot = (timer.deadline // self.spans[level]) % self.slots
+        self._wheels[level][timer.slot][timer.key] = timer
+
+    def _advance(self) -> None:
+        """Move one tick: cascade higher levels whose slot came due, then fire the current slot"""
+        self._now += 1
+        for level in range(len(self.spans) - 1, 0, -1):
+            if self._now % self.spans[level]:
+                continue
+            index = (self._now // self.spans[level]) % self.slots
+            due, self._wheels[level][index] = self._wheels[level][index], {}
+            for timer in due.values():
+                self._place(timer)
+
+        index = self._now % self.slots
+        due, self._wheels[0][index] = self._wheels[0][index], {}
+        for key, timer in due.items():
+            if timer.deadline > self._now:
+                # Scheduled beyond the top level's range, wait for another turn
+                self._place(timer)
+                continue
+            del self._timers[key]
+            self.fired += 1
+            self._fire(timer)
+
+    def _fire(self, timer: Timer) -> None:
+        try:
+            result = timer.callback()
+            if inspect.isawaitable(result):
+                task = asyncio.ensure_future(result)
+                task.add_done_callback(lambda done: self._log_failure(timer.key, done))
+        except Exception:
+            logger.exception(f"Timer {timer.key!r} failed")
+
+    @staticmethod
+    def _log_failure(key: Hashable, task: asyncio.Future) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Timer {key!r} failed: {task.exception()}")
+
+    async def _run(self) -> None:
+        while True:
+            if not self._timers:
+                # Nothing pending, sleep until something is scheduled instead of ticking
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                self._started_at = time.monotonic() - self._now * self.tick
+                continue
+
+            # Catch up on ticks missed while the event loop was busy, then sleep to the next one
+            target = int((time.monotonic() - self._started_at) / self.tick)
+            while self._now < target and self._timers:
+                self._advance()
+            await asyncio.sleep(max(0.0, self._started_at + (self._now + 1) * self.tick - time.monotonic()))
+
+    def stats(self) -> Dict[str, Any]:
+        """Pending timers and how many were scheduled, cancelled and fired"""
+        return {
+            'pending': len(self._timers),
+            'scheduled': self.scheduled,
+            'cancelled': self.cancelled,
+            'fired': self.fired,
+        }
+
+    def close(self) -> None:
+        """Stop ticking and drop every pending timer, later schedules are ignored"""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for wheel in self._wheels:
+            for slot in wheel:
+                slot.clear()
+        self._timers.clear()
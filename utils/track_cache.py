@@ -0,0 +1,128 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
+from utils.canonical import Canonicalizer
+
+# Fields kept from yt-dlp info dicts, everything else is dropped to keep entries small
+CACHED_FIELDS = ('id', 'title', 'url', 'webpage_url', 'duration', 'uploader', 'thumbnail', 'extractor')
+
+class TrackCache:
+    """LRU cache of resolved tracks keyed by track id, with search queries mapped onto tracks"""
+
+    _shared: Optional['TrackCache'] = None
+
+    def __init__(self, max_entries: int = 1000, default_ttl: float = 3600):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._tracks: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._queries: 'OrderedDict[str, str]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def shared(cls) -> 'TrackCache':
+        """Get the process-wide track cache"""
+        if cls._shared is None:
+            from config import Config
+            cls._shared = cls(Config.TRACK_CACHE_SIZE, Config.TRACK_CACHE_TTL)
+        return cls._shared
+
+    @staticmethod
+    def key(query: str) -> str:
+        """Cache key for a query, shared by URL forms of one video and spelling variants of one search"""
+        return Canonicalizer.cache_key(query)
+
+    @staticmethod
+    def track_id(info: Dict[str, Any]) -> Optional[str]:
+        """Identifier a resolved track is stored under"""
+        return info.get('id') or info.get('webpage_url') or info.get('url')
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        """Get a copy of the cached track for a query if its stream is still usable"""
+        track_id = self._queries.get(self.key(query))
+        info = self.get_track(track_id) if track_id else None
+        if info is None:
+            self.misses += 1
+        else:
+            self._queries.move_to_end(self.key(query))
+            self.hits += 1
+        return info
+
+    def get_track(self, track_id: str) -> Optional[Dict[str, Any]]:
+        """Get a copy of a cached track by id if its stream is still usable"""
+        entry = self._tracks.get(track_id)
+        if entry is None or entry['expires_at'] <= time.time():
+            return None
+        if entry['expires_at'] == float('inf'):
+            # Downloaded audio: drop the entry if the file was evicted, otherwise mark it as recently used
+            try:
+                os.utime(entry['info']['url'])
+            except OSError:
+                self.discard(track_id)
+                return None
+        self._tracks.move_to_end(track_id)
+        return dict(entry['info'])
+
+    def peek(self, query: str) -> Optional[Dict[str, Any]]:
+        """Get the cache entry for a query, even if expired, without touching statistics"""
+        track_id = self._queries.get(self.key(query))
+        return self._tracks.get(track_id) if track_id else None
+
+    def peek_track(self, track_id: str) -> Optional[Dict[str, Any]]:
+        """Get the cache entry for a track id, even if expired"""
+        return self._tracks.get(track_id)
+
+    def put(self, query: Optional[str], info: Dict[str, Any]) -> None:
+        """Cache a resolved single track, optionally mapping a query to it"""
+        if not info or info.get('entries') is not None or not info.get('url'):
+            return
+        track_id = self.track_id(info)
+
+        from utils.music_utils import MusicUtils
+        if os.path.isfile(info['url']):
+            expires_at = float('inf')  # Downloaded audio does not expire
+        else:
+            expires_at = MusicUtils.get_stream_expiry(info['url']) or time.time() + self.default_ttl
+
+        self._tracks[track_id] = {
+            'info': {field: info.get(field) for field in CACHED_FIELDS if info.get(field) is not None},
+            'stored_at': time.time(),
+            'expires_at': expires_at,
+        }
+        self._tracks.move_to_end(track_id)
+        while len(self._tracks) > self.max_entries:
+            self._tracks.popitem(last=False)
+
+        if query:
+            key = self.key(query)
+            self._queries[key] = track_id
+            self._queries.move_to_end(key)
+            # Several queries can point at one track, allow a few per entry before trimming
+            while len(self._queries) > self.max_entries * 4:
+                self._queries.popitem(last=False)
+
+    def discard(self, track_id: str) -> None:
+        """Forget a cached track, queries pointing at it become misses"""
+        self._tracks.pop(track_id, None)
+
+    def expiring(self, queries: List[str], within: float) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+        """Of the given queries, those missing or expiring within the given seconds, with their last entry"""
+        deadline = time.time() + within
+        result = []
+        for query in queries:
+            entry = self.peek(query)
+            if entry is None or entry['expires_at'] <= deadline:
+                result.append((query, entry))
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache size and hit rate"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._tracks),
+            'queries': len(self._queries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,194 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any, List
+from utils.canonical import Canonicalizer
+
+logger = logging.getLogger(__name__)
+
+# yt-dlp fields that name a track in other words; artist and album alone name many tracks, so they are not aliases
+ALIAS_FIELDS = ('track', 'alt_title')
+
+# Queries of fewer words must equal the whole title, single words like "queen" or "official" name too many tracks
+MIN_QUERY_WORDS = 2
+
+# Aliases kept per track, the oldest are dropped first
+MAX_ALIASES = 20
+
+class TrackIndex:
+    """Full-text index of every track resolved so far, matched against new queries before searching upstream"""
+
+    _shared: Optional['TrackIndex'] = None
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS indexed_tracks (
+                id INTEGER PRIMARY KEY,
+                video_id TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL,
+                uploader TEXT,
+                webpage_url TEXT NOT NULL,
+                duration INTEGER,
+                aliases TEXT NOT NULL DEFAULT '[]',
+                updated_at REAL NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS track_fts USING fts5(
+                folded,
+                tokenize = 'unicode61 remove_diacritics 2'
+            );
+        """)
+
+    @classmethod
+    def shared(cls) -> 'TrackIndex':
+        """Get the process-wide track index"""
+        if cls._shared is None:
+            from config import Config
+            cls._shared = cls(Config.DATA_DB_PATH)
+        return cls._shared
+
+    def record(self, query: Optional[str], info: Dict[str, Any]) -> None:
+        """Index a resolved YouTube track, remembering the text query that led to it as an alias"""
+        video_id = info.get('id')
+        if not video_id or info.get('entries') is not None or not info.get('title'):
+            return
+        if not Canonicalizer.VIDEO_ID_RE.match(video_id):
+            return  # Only YouTube videos can be resolved again from their id
+
+        new_aliases = [info.get(field) for field in ALIAS_FIELDS if info.get(field)]
+        if info.get('artist') and info.get('track'):
+            new_aliases.append(f"{info['artist']} {info['track']}")
+        if query and not Canonicalizer.is_url(query):
+            new_aliases.append(query)
+        new_aliases = [Canonicalizer.normalize_query(alias) for alias in new_aliases]
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, aliases FROM indexed_tracks WHERE video_id = ?", (video_id,)
+            ).fetchone()
+            aliases = json.loads(row[1]) if row else []
+            # Artist and album aliases recorded by earlier versions go as the track is seen again
+            generic = {Canonicalizer.normalize_query(info.get(field) or '') for field in ('artist', 'album')}
+            aliases = [alias for alias in aliases if alias not in generic]
+            for alias in new_aliases:
+                if alias and alias not in aliases:
+                    aliases.append(alias)
+            aliases = aliases[-MAX_ALIASES:]
+
+            folded = ' '.join([
+                Canonicalizer.normalize_query(info['title']),
+                Canonicalizer.normalize_query(info.get('uploader') or ''),
+                *aliases,
+            ])
+            webpage_url = info.get('webpage_url') or Canonicalizer.canonical_video_url(video_id)
+
+            self._conn.execute("BEGIN")
+            try:
+                cursor = self._conn.execute(
+                    "INSERT INTO indexed_tracks (video_id, title, uploader, webpage_url, duration, aliases, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(video_id) DO UPDATE SET title = excluded.title, uploader = excluded.uploader, "
+                    "webpage_url = excluded.webpage_url, duration = excluded.duration, "
+                    "aliases = excluded.aliases, updated_at = excluded.updated_at "
+                    "RETURNING id",
+                    (video_id, info['title'], info.get('uploader'), webpage_url,
+                     info.get('duration') or 0, json.dumps(aliases, ensure_ascii=False), time.time())
+                )
+                rowid = cursor.fetchone()[0]
+                self._conn.execute("DELETE FROM track_fts WHERE rowid = ?", (rowid,))
+                self._conn.execute("INSERT INTO track_fts (rowid, folded) VALUES (?, ?)", (rowid, folded))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def confidence(words: List[str], title: str, aliases: List[str]) -> float:
+        """How well a candidate's title and aliases match the query words as whole words, from 0 to 1"""
+        title_tokens = Canonicalizer.normalize_query(title).split()
+        if len(words) < MIN_QUERY_WORDS and words != title_tokens:
+            return 0.0
+        if ' '.join(words) in aliases:
+            return 1.0
+        tokens = set(title_tokens).union(*(alias.split() for alias in aliases))
+        query_coverage = sum(1 for word in words if word in tokens) / len(words)
+        # Prefer titles that are mostly made of the query over long titles that merely contain it
+        title_coverage = (
+            sum(1 for token in title_tokens if token in words) / len(title_tokens) if title_tokens else 0.0
+        )
+        return 0.5 * query_coverage + 0.5 * title_coverage
+
+    @staticmethod
+    def match_expression(words: List[str], partial: bool = False) -> str:
+        """FTS5 expression requiring every word; only the last one of a query still being typed may be a prefix"""
+        terms = [f'"{word}"' for word in words]
+        if partial:
+            terms[-1] += '*'
+        return ' AND '.join(terms)
+
+    def lookup(self, query: str, min_confidence: float, limit: int = 10) -> Optional[Dict[str, Any]]:
+        """Best previously resolved track for a text query, if it matches with at least min_confidence"""
+        words = Canonicalizer.normalize_query(query).split()
+        if not words or Canonicalizer.is_url(query):
+            return None
+
+        expression = self.match_expression(words)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT t.video_id, t.title, t.uploader, t.webpage_url, t.duration, t.aliases "
+                "FROM track_fts JOIN indexed_tracks t ON t.id = track_fts.rowid "
+                "WHERE track_fts MATCH ? ORDER BY rank LIMIT ?",
+                (expression, limit)
+            ).fetchall()
+
+        best, best_score = None, 0.0
+        for video_id, title, uploader, webpage_url, duration, aliases in rows:
+            score = self.confidence(words, title, json.loads(aliases))
+            if score > best_score:
+                best_score = score
+                best = {'id': video_id, 'title': title, 'uploader': uploader,
+                        'webpage_url': webpage_url, 'duration': duration, 'confidence': score}
+
+        if best and best_score >= min_confidence:
+            return best
+        return None
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Indexed tracks matching every word of a partially typed query, best first"""
+        words = Canonicalizer.normalize_query(query).split()
+        if not words or Canonicalizer.is_url(query):
+            return []
+
+        expression = self.match_expression(words, partial=True)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT t.video_id, t.title, t.uploader, t.webpage_url, t.duration "
+                "FROM track_fts JOIN indexed_tracks t ON t.id = track_fts.rowid "
+                "WHERE track_fts MATCH ? ORDER BY rank LIMIT ?",
+                (expression, limit)
+            ).fetchall()
+        return [
+            {'id': row[0], 'title': row[1], 'uploader': row[2], 'webpage_url': row[3], 'duration': row[4]}
+            for row in rows
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of indexed tracks"""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM indexed_tracks").fetchone()[0]
+        return {'tracks': count}
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
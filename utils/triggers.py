@@ -0,0 +1,177 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+
+# Keywords used by guilds that have not configured their own
+DEFAULT_KEYWORDS = ('банкет', 'banket', 'наздраве', 'nazdrave', 'хоро', 'horo')
+
+# Keywords a guild may configure
+MAX_KEYWORDS = 50
+MAX_KEYWORD_LENGTH = 50
+
+class TokenBucket:
+    """Allows a burst of actions, then one per refill interval"""
+
+    __slots__ = ('capacity', 'refill_rate', 'tokens', 'updated_at')
+
+    def __init__(self, capacity: float, refill_rate: float):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def take(self) -> bool:
+        """Spend a token if one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+class KeywordTriggers:
+    """Per-guild keyword sets compiled into minimal matchers, with a token-bucket reply cooldown per channel"""
+
+    _shared: Optional['KeywordTriggers'] = None
+
+    def __init__(self, path: str, cooldown: float = 60, burst: int = 2, max_channels: int = 10000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.cooldown = cooldown
+        self.burst = burst
+        self.max_channels = max_channels
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS guild_keywords (
+                guild_id INTEGER PRIMARY KEY,
+                keywords TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+        """)
+
+        self._default = self.compile(DEFAULT_KEYWORDS)
+        # Guilds with their own keywords; None means triggers are switched off
+        self._keywords: Dict[int, List[str]] = {}
+        self._matchers: Dict[int, Optional[Tuple[str, ...]]] = {}
+        for guild_id, keywords in self._conn.execute("SELECT guild_id, keywords FROM guild_keywords"):
+            self._cache(guild_id, json.loads(keywords))
+
+        self._buckets: 'OrderedDict[int, TokenBucket]' = OrderedDict()
+        self.matches = 0
+        self.allowed = 0
+        self.throttled = 0
+
+    @classmethod
+    def shared(cls) -> 'KeywordTriggers':
+        """Get the process-wide keyword triggers"""
+        if cls._shared is None:
+            from config import Config
+            cls._shared = cls(Config.DATA_DB_PATH, Config.KEYWORD_REPLY_COOLDOWN, Config.KEYWORD_REPLY_BURST)
+        return cls._shared
+
+    @staticmethod
+    def normalize(keyword: str) -> str:
+        """Keywords match case-insensitively and ignore repeated whitespace"""
+        return ' '.join(keyword.split()).casefold()
+
+    @classmethod
+    def compile(cls, keywords: Iterable[str]) -> Optional[Tuple[str, ...]]:
+        """Keywords that can match on their own; one containing a shorter keyword can never be the first hit"""
+        keywords = sorted({cls.normalize(keyword) for keyword in keywords} - {''}, key=len)
+        matcher = []
+        for keyword in keywords:
+            if not any(shorter in keyword for shorter in matcher):
+                matcher.append(keyword)
+        # Substring checks on casefolded text beat a regex alternation in CPython for sets this small
+        return tuple(matcher) or None
+
+    def _cache(self, guild_id: int, keywords: List[str]) -> None:
+        self._keywords[guild_id] = keywords
+        self._matchers[guild_id] = self.compile(keywords)
+
+    def keywords(self, guild_id: Optional[int]) -> List[str]:
+        """Keywords that trigger a reply in a guild"""
+        return list(self._keywords.get(guild_id, DEFAULT_KEYWORDS))
+
+    def is_custom(self, guild_id: Optional[int]) -> bool:
+        """Whether a guild has configured its own keywords"""
+        return guild_id in self._keywords
+
+    def set_keywords(self, guild_id: int, keywords: Iterable[str]) -> List[str]:
+        """Replace a guild's keywords, an empty list switches triggers off; returns what was stored"""
+        stored = []
+        for keyword in keywords:
+            keyword = self.normalize(keyword)[:MAX_KEYWORD_LENGTH]
+            if keyword and keyword not in stored:
+                stored.append(keyword)
+        stored = stored[:MAX_KEYWORDS]
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO guild_keywords (guild_id, keywords, updated_at) VALUES (?, ?, ?)",
+                (guild_id, json.dumps(stored, ensure_ascii=False), time.time())
+            )
+        self._cache(guild_id, stored)
+        return stored
+
+    def reset(self, guild_id: int) -> None:
+        """Go back to the default keywords"""
+        with self._lock:
+            self._conn.execute("DELETE FROM guild_keywords WHERE guild_id = ?", (guild_id,))
+        self._keywords.pop(guild_id, None)
+        self._matchers.pop(guild_id, None)
+
+    def match(self, guild_id: Optional[int], content: str) -> Optional[str]:
+        """First keyword found in a message, or None"""
+        matcher = self._matchers[guild_id] if guild_id in self._matchers else self._default
+        if matcher is None:
+            return None
+        content = content.casefold()
+        for keyword in matcher:
+            if keyword in content:
+                self.matches += 1
+                return keyword
+        return None
+
+    def allow(self, channel_id: int) -> bool:
+        """Take a reply token for a channel, False while the channel is cooling down"""
+        bucket = self._buckets.get(channel_id)
+        if bucket is None:
+            bucket = self._buckets[channel_id] = TokenBucket(self.burst, 1.0 / max(self.cooldown, 0.001))
+            # Buckets of quiet channels refill completely anyway, the least recently used can go
+            while len(self._buckets) > self.max_channels:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(channel_id)
+
+        if bucket.take():
+            self.allowed += 1
+            return True
+        self.throttled += 1
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Guilds with their own keywords, matches and replies allowed or held back"""
+        return {
+            'custom_guilds': len(self._keywords),
+            'channels': len(self._buckets),
+            'matches': self.matches,
+            'allowed': self.allowed,
+            'throttled': self.throttled,
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()